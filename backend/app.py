@@ -1,9 +1,11 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
 from flask_migrate import Migrate
 from dotenv import load_dotenv
+import os
 
 from database import db, init_app  # <-- init_app ajouté
 
@@ -19,19 +21,40 @@ from routes.paiement_route import paiement_bp
 from routes.statistiques_routes import statistiques_bp
 from routes.Presence_route import presence_bp
 from routes.depense_routes import depense_bp
+from routes.bulletin_routes import bulletin_bp
+from routes.systeme_routes import systeme_bp
+from routes.assiduite_routes import assiduite_bp
+from routes.tarif_routes import tarif_bp
+from routes.rapport_routes import rapport_bp
+
+import models.statistique  # noqa: F401  (table statistiques_compteurs)
+import services.statistiques  # noqa: F401  (écouteurs de mise à jour des compteurs)
+from services.revocation import jeton_revoque
+from services.authentification import exiger_changement_mot_de_passe
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
 
+# 🌐 Derrière un reverse proxy (nginx...) : request.remote_addr lu dans X-Forwarded-For.
+# PROXIES_DE_CONFIANCE = nombre de proxies devant l'application (0 : accès direct) ; seuls
+# ces derniers sauts sont crus, un X-Forwarded-For fourni par le client est ignoré au-delà.
+# Sans cela, tous les clients partagent l'adresse du proxy (et son seau de connexions).
+proxies_de_confiance = int(os.getenv("PROXIES_DE_CONFIANCE", 0))
+if proxies_de_confiance:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies_de_confiance, x_proto=proxies_de_confiance)
+
 init_app(app)  # Initialise MySQL depuis .env
 migrate = Migrate(app, db)  # 💡 Flask-Migrate activé
 
 
-# Token JWT
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=12)
+# Token JWT : jeton d'accès court, renouvelé via /api/auth/refresh
+app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", 15)))
+app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=int(os.getenv("JWT_REFRESH_JOURS", 7)))
 jwt = JWTManager(app)
+jwt.token_in_blocklist_loader(jeton_revoque)  # 🚫 jetons révoqués à la déconnexion
+app.before_request(exiger_changement_mot_de_passe)  # 🔑 mot de passe provisoire à changer d'abord
 
 # Routes
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -46,6 +69,11 @@ app.register_blueprint(paiement_bp, url_prefix="/api")
 app.register_blueprint(statistiques_bp, url_prefix="/api")
 app.register_blueprint(presence_bp, url_prefix="/api")
 app.register_blueprint(depense_bp, url_prefix="/api")
+app.register_blueprint(bulletin_bp, url_prefix="/api")
+app.register_blueprint(systeme_bp, url_prefix="/api")
+app.register_blueprint(assiduite_bp, url_prefix="/api")
+app.register_blueprint(tarif_bp, url_prefix="/api")
+app.register_blueprint(rapport_bp, url_prefix="/api")
 
 @app.route('/')
 def hello():
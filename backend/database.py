@@ -1,12 +1,134 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask import Flask
+from flask_sqlalchemy.session import Session as SessionFlask
+from flask import Flask, current_app, g, has_request_context, request
 from dotenv import load_dotenv
+from functools import wraps
+from itertools import count
+from sqlalchemy import event
 import os
+import threading
+import time
 
 # Charger les variables d'environnement
 load_dotenv()
 
-db = SQLAlchemy()
+METHODES_LECTURE = ("GET", "HEAD")
+PREFIXE_REPLIQUE = "replique"
+
+_tourniquet = count()
+_collants = {}   # utilisateur_id -> instant (monotonic) jusqu'auquel il lit sur la principale
+_verrou_collants = threading.Lock()
+
+
+def _env_bool(nom, defaut):
+    return os.getenv(nom, str(defaut)).lower() in ("1", "true", "oui", "yes")
+
+
+def _utilisateur_courant():
+    """Identité JWT de la requête en cours, si un jeton a été vérifié."""
+    jeton = g.get("_jwt_extended_jwt") if has_request_context() else None
+    return jeton.get("sub") if jeton else None
+
+
+def _est_collant(utilisateur_id):
+    limite = _collants.get(utilisateur_id)
+    if limite is None:
+        return False
+    if limite > time.monotonic():
+        return True
+    with _verrou_collants:
+        _collants.pop(utilisateur_id, None)
+    return False
+
+
+def _rendre_collant(utilisateur_id):
+    maintenant = time.monotonic()
+    with _verrou_collants:
+        _collants[utilisateur_id] = maintenant + float(os.getenv("DB_STICKY_SECONDS", 5))
+        if len(_collants) > 10_000:
+            for cle in [c for c, limite in _collants.items() if limite <= maintenant]:
+                del _collants[cle]
+
+
+def lecture_primaire(fonction):
+    """Force la lecture sur la base principale pour un endpoint GET qui exige des données fraîches."""
+    @wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        g.lecture_primaire = True
+        return fonction(*args, **kwargs)
+    return enveloppe
+
+
+class SessionRoutee(SessionFlask):
+    """Envoie les requêtes des endpoints GET sur une réplique (si configurée) ;
+    tout le reste va sur la base principale.
+
+    Restent sur la principale : les requêtes d'une session qui a déjà écrit,
+    les endpoints marqués @lecture_primaire et, pendant DB_STICKY_SECONDS après
+    une écriture, toutes les lectures de l'utilisateur qui a écrit (il relit
+    ainsi ses propres écritures malgré le retard de réplication)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            replique = self._replique()
+            if replique is not None:
+                return replique
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replique(self):
+        if not has_request_context() or request.method not in METHODES_LECTURE:
+            return None
+        repliques = current_app.config.get("DB_REPLIQUES")
+        if not repliques or g.get("lecture_primaire"):
+            return None
+        if self._flushing or self.new or self.dirty or self.deleted or self.info.get("ecriture"):
+            return None
+        utilisateur_id = _utilisateur_courant()
+        if utilisateur_id is not None and _est_collant(utilisateur_id):
+            return None
+
+        # Une seule réplique par requête (tourniquet) pour des lectures cohérentes entre elles
+        nom = self.info.get("replique")
+        if nom is None:
+            nom = self.info["replique"] = repliques[next(_tourniquet) % len(repliques)]
+        return self._db.engines[nom]
+
+
+db = SQLAlchemy(session_options={"class_": SessionRoutee})
+
+
+@event.listens_for(SessionRoutee, "after_flush")
+def _marquer_ecriture(session, contexte):
+    # Une fois qu'une écriture a eu lieu, la suite de la requête lit sur la principale
+    session.info["ecriture"] = True
+
+
+@event.listens_for(SessionRoutee, "after_commit")
+def _lire_ses_ecritures(session):
+    if session.info.get("ecriture"):
+        utilisateur_id = _utilisateur_courant()
+        if utilisateur_id is not None:
+            _rendre_collant(utilisateur_id)
+
+
+def options_moteur(uri):
+    """Options du pool de connexions, réglables par variables d'environnement."""
+    if uri.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        # Inférieur au wait_timeout MySQL : évite les "MySQL server has gone away"
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 280)),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "connect_args": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 10)),
+            "read_timeout": int(os.getenv("DB_READ_TIMEOUT", 60)),
+            "write_timeout": int(os.getenv("DB_WRITE_TIMEOUT", 60)),
+        },
+    }
+
 
 def init_app(app: Flask):
     app.config['SECRET_KEY'] = os.getenv("SECRET_KEY", "default_secret")
@@ -18,7 +140,31 @@ def init_app(app: Flask):
     DB_PORT = os.getenv("DB_PORT", "3306")
     DB_NAME = os.getenv("DB_NAME")
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = (f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+    uri = os.getenv("DATABASE_URL") or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options_moteur(uri)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Répliques en lecture optionnelles pour les endpoints GET (URIs séparées par des virgules)
+    uris_repliques = [u.strip() for u in os.getenv("DB_REPLICA_URIS", os.getenv("DB_REPLICA_URI", "")).split(",") if u.strip()]
+    binds = {
+        f"{PREFIXE_REPLIQUE}_{i}": {"url": uri_replique, **options_moteur(uri_replique)}
+        for i, uri_replique in enumerate(uris_repliques)
+    }
+    app.config['SQLALCHEMY_BINDS'] = binds
+    app.config['DB_REPLIQUES'] = list(binds)
+
     db.init_app(app)
+
+
+def statistiques_pools():
+    """État des pools de connexions de chaque moteur (à appeler dans un contexte d'application)."""
+    etats = {}
+    for nom, moteur in db.engines.items():
+        pool = moteur.pool
+        etat = {"type": type(pool).__name__, "statut": pool.status()}
+        for mesure in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, mesure):
+                etat[mesure] = getattr(pool, mesure)()
+        etats[nom or "principale"] = etat
+    return etats
@@ -0,0 +1,30 @@
+"""mot de passe provisoire
+
+Revision ID: 2c7dfa97b205
+Revises: 3480276377f9
+Create Date: 2026-10-18 12:14:48.646438
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c7dfa97b205'
+down_revision = '3480276377f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('utilisateurs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mot_de_passe_provisoire', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # Comptes créés avec un mot de passe par défaut et jamais modifiés
+    op.execute(sa.text("UPDATE utilisateurs SET mot_de_passe_provisoire = :vrai WHERE mot_de_passe LIKE 'defaut$%'")
+               .bindparams(vrai=True))
+
+
+def downgrade():
+    with op.batch_alter_table('utilisateurs', schema=None) as batch_op:
+        batch_op.drop_column('mot_de_passe_provisoire')
@@ -0,0 +1,47 @@
+"""dates non nulles
+
+Revision ID: 3480276377f9
+Revises: 53963bf1525b
+Create Date: 2026-10-18 12:11:21.195430
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3480276377f9'
+down_revision = '53963bf1525b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Les listes paginées par curseur trient sur ces dates : une ligne à date NULL
+    # n'apparaîtrait dans aucune page. La date d'origine étant inconnue, on prend
+    # celle de la migration (les agrégats se reconstruisent ensuite par
+    # POST /api/assiduite/recalculer et POST /api/stats/recalculer).
+    op.execute(sa.text("UPDATE presences SET date = CURRENT_DATE WHERE date IS NULL"))
+    op.execute(sa.text("UPDATE depenses SET date = CURRENT_DATE WHERE date IS NULL"))
+
+    with op.batch_alter_table('depenses', schema=None) as batch_op:
+        batch_op.alter_column('date',
+               existing_type=sa.DATE(),
+               nullable=False)
+
+    with op.batch_alter_table('presences', schema=None) as batch_op:
+        batch_op.alter_column('date',
+               existing_type=sa.DATE(),
+               nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('presences', schema=None) as batch_op:
+        batch_op.alter_column('date',
+               existing_type=sa.DATE(),
+               nullable=True)
+
+    with op.batch_alter_table('depenses', schema=None) as batch_op:
+        batch_op.alter_column('date',
+               existing_type=sa.DATE(),
+               nullable=True)
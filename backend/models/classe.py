@@ -10,7 +10,7 @@ class Classe(db.Model):
     annee_scolaire = db.Column(db.String(20), nullable=False)
 
     # Clé étrangère vers Enseignant (et non Utilisateur)
-    enseignant_principal_id = db.Column(db.Integer, db.ForeignKey('enseignants.id'), nullable=True)
+    enseignant_principal_id = db.Column(db.Integer, db.ForeignKey('enseignants.id'), nullable=True, index=True)
     enseignant_principal = db.relationship('Enseignant', backref='classes_dirigees')
 
     def to_dict(self):
@@ -22,3 +22,11 @@ class Classe(db.Model):
             "annee_scolaire": self.annee_scolaire,
             "enseignant_principal": self.enseignant_principal.to_dict() if self.enseignant_principal else None
         }
+
+    def to_dict_compact(self):
+        return {
+            "id": self.id,
+            "nom": self.nom,
+            "salle": self.salle,
+            "niveau": self.niveau
+        }
@@ -3,13 +3,17 @@ from datetime import datetime
 
 class Depense(db.Model):
     __tablename__ = 'depenses'
+    __table_args__ = (
+        db.Index('ix_depenses_date', 'date'),
+        db.Index('ix_depenses_type_date', 'type', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     libelle = db.Column(db.String(100), nullable=False)
     montant = db.Column(db.Float, nullable=False)
     type = db.Column(db.String(50), nullable=False)  # Ex: "salaire", "fourniture", "transport"
     description = db.Column(db.Text, nullable=True)
-    date = db.Column(db.Date, default=datetime.utcnow)
+    date = db.Column(db.Date, default=datetime.utcnow, nullable=False)
 
     def to_dict(self):
         return {
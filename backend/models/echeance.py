@@ -0,0 +1,26 @@
+from database import db
+
+class Echeance(db.Model):
+    """Ligne du compte d'un élève pour un mois : montant dû (tarifs), payé (paiements) et solde restant."""
+    __tablename__ = 'echeances'
+    __table_args__ = (
+        db.UniqueConstraint('eleve_id', 'mois', name='uq_echeances_eleve_mois'),
+        db.Index('ix_echeances_solde_mois', 'solde', 'mois'),
+        db.Index('ix_echeances_mois', 'mois'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    eleve_id = db.Column(db.Integer, db.ForeignKey('eleves.id', ondelete='CASCADE'), nullable=False)
+    mois = db.Column(db.String(7), nullable=False)   # "AAAA-MM"
+    du = db.Column(db.Float, nullable=False, default=0)
+    paye = db.Column(db.Float, nullable=False, default=0)
+    solde = db.Column(db.Float, nullable=False, default=0)   # du - paye (négatif : avance)
+
+    def to_dict(self):
+        return {
+            "eleve_id": self.eleve_id,
+            "mois": self.mois,
+            "du": self.du,
+            "paye": self.paye,
+            "solde": self.solde
+        }
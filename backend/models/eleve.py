@@ -2,6 +2,21 @@ from database import db
 
 class Eleve(db.Model):
     __tablename__ = 'eleves'
+    __table_args__ = (
+        db.Index('ix_eleves_classe_id', 'classe_id'),
+        db.Index('ix_eleves_parent_id', 'parent_id'),
+        db.Index('ix_eleves_utilisateur_id', 'utilisateur_id'),
+        # Recherche par préfixe et tri
+        db.Index('ix_eleves_nom_prenom', 'nom', 'prenom'),
+        db.Index('ix_eleves_prenom', 'prenom'),
+        db.Index('ix_eleves_classe_id_nom', 'classe_id', 'nom'),
+        db.Index('ix_eleves_sexe_nom', 'sexe', 'nom'),
+        # Recherche plein texte MySQL (parseur n-gram : préfixes et sous-chaînes)
+        db.Index(
+            'ft_eleves_recherche', 'nom', 'prenom', 'matricule',
+            mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+        ).ddl_if(dialect='mysql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nom = db.Column(db.String(100), nullable=False)
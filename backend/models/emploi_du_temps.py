@@ -4,6 +4,11 @@ from sqlalchemy import Time
 
 class EmploiDuTemps(db.Model):
     __tablename__ = 'emplois_du_temps'
+    __table_args__ = (
+        db.Index('ix_emplois_du_temps_classe_id_jour', 'classe_id', 'jour'),
+        db.Index('ix_emplois_du_temps_enseignant_id_jour', 'enseignant_id', 'jour'),
+        db.Index('ix_emplois_du_temps_matiere_id', 'matiere_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     jour = db.Column(db.String(20), nullable=False)  # Exemple : "Lundi"
@@ -29,3 +34,15 @@ class EmploiDuTemps(db.Model):
             "enseignant": self.enseignant.to_dict() if self.enseignant else None,
             "matiere": self.matiere.to_dict() if self.matiere else None
         }
+
+    # Version compacte : références par identifiant (tables de correspondance à part)
+    def to_dict_compact(self):
+        return {
+            "id": self.id,
+            "jour": self.jour,
+            "heure_debut": self.heure_debut.strftime("%H:%M"),
+            "heure_fin": self.heure_fin.strftime("%H:%M"),
+            "classe_id": self.classe_id,
+            "enseignant_id": self.enseignant_id,
+            "matiere_id": self.matiere_id
+        }
@@ -3,7 +3,9 @@ from database import db
 enseignant_matiere = db.Table(
     'enseignant_matiere',
     db.Column('enseignant_id', db.Integer, db.ForeignKey('enseignants.id')),
-    db.Column('matiere_id', db.Integer, db.ForeignKey('matieres.id'))
+    db.Column('matiere_id', db.Integer, db.ForeignKey('matieres.id')),
+    db.Index('ix_enseignant_matiere_enseignant_id_matiere_id', 'enseignant_id', 'matiere_id'),
+    db.Index('ix_enseignant_matiere_matiere_id', 'matiere_id')
 )
 
 class Enseignant(db.Model):
@@ -14,7 +16,7 @@ class Enseignant(db.Model):
     prenom = db.Column(db.String(100), nullable=False)
     telephone = db.Column(db.String(20), nullable=True)
     matricule = db.Column(db.String(50), unique=True, nullable=False)
-    utilisateur_id = db.Column(db.Integer, db.ForeignKey('utilisateurs.id'), nullable=False)
+    utilisateur_id = db.Column(db.Integer, db.ForeignKey('utilisateurs.id'), nullable=False, index=True)
 
     utilisateur = db.relationship('Utilisateur', backref=db.backref('enseignant', uselist=False))
     matieres = db.relationship('Matiere', secondary=enseignant_matiere, backref='enseignants')
@@ -29,3 +31,10 @@ class Enseignant(db.Model):
             "utilisateur": self.utilisateur.to_dict() if self.utilisateur else None,
             "matieres": [m.to_dict() for m in self.matieres]
         }
+
+    def to_dict_compact(self):
+        return {
+            "id": self.id,
+            "nom": self.nom,
+            "prenom": self.prenom
+        }
@@ -0,0 +1,17 @@
+from database import db
+
+class JetonRevoque(db.Model):
+    __tablename__ = 'jetons_revoques'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    utilisateur_id = db.Column(db.Integer, nullable=True)
+    expiration = db.Column(db.DateTime, nullable=False, index=True)        # UTC, fin de validité du jeton
+    date_revocation = db.Column(db.DateTime, nullable=False, index=True)   # UTC, sert à la synchronisation
+
+    def to_dict(self):
+        return {
+            "jti": self.jti,
+            "utilisateur_id": self.utilisateur_id,
+            "expiration": self.expiration.isoformat(),
+            "date_revocation": self.date_revocation.isoformat()
+        }
@@ -2,6 +2,13 @@ from database import db
 
 class Note(db.Model):
     __tablename__ = 'notes'
+    __table_args__ = (
+        # Clé de la saisie groupée (upsert) : une note par élève, matière, type et période
+        db.UniqueConstraint('eleve_id', 'matiere_id', 'type', 'periode', name='uq_notes_eleve_matiere_type_periode'),
+        db.Index('ix_notes_eleve_id_matiere_id_periode', 'eleve_id', 'matiere_id', 'periode'),
+        db.Index('ix_notes_matiere_id_periode', 'matiere_id', 'periode'),
+        db.Index('ix_notes_enseignant_id', 'enseignant_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     valeur = db.Column(db.Float, nullable=False)
@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Paiement(db.Model):
     __tablename__ = 'paiements'
+    __table_args__ = (
+        db.Index('ix_paiements_eleve_id_periode', 'eleve_id', 'periode'),
+        db.Index('ix_paiements_periode_statut', 'periode', 'statut'),
+        db.Index('ix_paiements_statut', 'statut'),
+        db.Index('ix_paiements_date_paiement', 'date_paiement'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     eleve_id = db.Column(db.Integer, db.ForeignKey('eleves.id'), nullable=False)
@@ -3,13 +3,21 @@ from datetime import date
 
 class Presence(db.Model):
     __tablename__ = 'presences'
+    __table_args__ = (
+        # Une seule présence par élève, classe et jour : un appel renvoyé met à jour au lieu de dupliquer
+        db.UniqueConstraint('eleve_id', 'classe_id', 'date', name='uq_presences_eleve_classe_date'),
+        db.Index('ix_presences_classe_id_date', 'classe_id', 'date'),
+        db.Index('ix_presences_eleve_id_date', 'eleve_id', 'date'),
+        db.Index('ix_presences_professeur_id_date', 'professeur_id', 'date'),
+        db.Index('ix_presences_date', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     eleve_id = db.Column(db.Integer, db.ForeignKey('eleves.id'), nullable=False)
     classe_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
     professeur_id = db.Column(db.Integer, db.ForeignKey('enseignants.id'), nullable=False)
     
-    date = db.Column(db.Date, default=date.today)
+    date = db.Column(db.Date, default=date.today, nullable=False)
     statut = db.Column(db.String(10), nullable=False)  # 'present' ou 'absent'
     justifiee = db.Column(db.Boolean, default=False)
     motif = db.Column(db.String(255), nullable=True)
@@ -0,0 +1,35 @@
+from database import db
+
+class PresenceJournaliere(db.Model):
+    """Agrégat quotidien des présences par (date, classe, professeur), tenu à jour par services.assiduite."""
+    __tablename__ = 'presences_journalieres'
+    __table_args__ = (
+        db.UniqueConstraint('date', 'classe_id', 'professeur_id', name='uq_presences_journalieres_date_classe_prof'),
+        db.Index('ix_presences_journalieres_classe_id_date', 'classe_id', 'date'),
+        db.Index('ix_presences_journalieres_professeur_id_date', 'professeur_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    classe_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    professeur_id = db.Column(db.Integer, db.ForeignKey('enseignants.id'), nullable=False)
+
+    total = db.Column(db.Integer, nullable=False, default=0)
+    presents = db.Column(db.Integer, nullable=False, default=0)
+    absents = db.Column(db.Integer, nullable=False, default=0)
+    absences_justifiees = db.Column(db.Integer, nullable=False, default=0)
+    retards = db.Column(db.Integer, nullable=False, default=0)
+    renvois = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "date": self.date.isoformat(),
+            "classe_id": self.classe_id,
+            "professeur_id": self.professeur_id,
+            "total": self.total,
+            "presents": self.presents,
+            "absents": self.absents,
+            "absences_justifiees": self.absences_justifiees,
+            "retards": self.retards,
+            "renvois": self.renvois
+        }
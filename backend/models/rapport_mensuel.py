@@ -0,0 +1,24 @@
+from database import db
+
+class RapportMensuel(db.Model):
+    """Agrégats financiers d'un mois clos, calculés une fois puis relus (services.rapports)."""
+    __tablename__ = 'rapports_mensuels'
+    __table_args__ = (
+        db.UniqueConstraint('mois', 'categorie', 'cle', name='uq_rapports_mensuels_mois_categorie_cle'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    mois = db.Column(db.String(7), nullable=False)         # "AAAA-MM"
+    categorie = db.Column(db.String(50), nullable=False)   # ex : "recettes_methode", "depenses_type"
+    cle = db.Column(db.String(100), nullable=False)        # ex : "Orange Money", "salaire"
+    nombre = db.Column(db.Integer, nullable=False, default=0)
+    montant = db.Column(db.Float, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "mois": self.mois,
+            "categorie": self.categorie,
+            "cle": self.cle,
+            "nombre": self.nombre,
+            "montant": self.montant
+        }
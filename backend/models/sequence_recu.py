@@ -0,0 +1,16 @@
+from database import db
+
+class SequenceRecu(db.Model):
+    """Prochain numéro de reçu non encore réservé, par préfixe et par année."""
+    __tablename__ = 'sequences_recus'
+
+    prefixe = db.Column(db.String(20), primary_key=True)
+    annee = db.Column(db.Integer, primary_key=True)
+    prochain = db.Column(db.Integer, nullable=False, default=1)
+
+    def to_dict(self):
+        return {
+            "prefixe": self.prefixe,
+            "annee": self.annee,
+            "prochain": self.prochain
+        }
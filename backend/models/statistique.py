@@ -0,0 +1,21 @@
+from database import db
+
+class StatistiqueCompteur(db.Model):
+    __tablename__ = 'statistiques_compteurs'
+    __table_args__ = (
+        db.UniqueConstraint('categorie', 'cle', name='uq_statistiques_compteurs_categorie_cle'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    categorie = db.Column(db.String(50), nullable=False)  # ex : "eleves_sexe", "paiements_methode"
+    cle = db.Column(db.String(100), nullable=False)       # ex : "F", "Orange Money", "2024-10"
+    nombre = db.Column(db.Integer, nullable=False, default=0)
+    montant = db.Column(db.Float, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "categorie": self.categorie,
+            "cle": self.cle,
+            "nombre": self.nombre,
+            "montant": self.montant
+        }
@@ -0,0 +1,25 @@
+from database import db
+
+class Tarif(db.Model):
+    """Frais de scolarité dus pour un mois donné par les élèves d'un niveau et d'une année scolaire."""
+    __tablename__ = 'tarifs'
+    __table_args__ = (
+        db.UniqueConstraint('niveau', 'annee_scolaire', 'mois', name='uq_tarifs_niveau_annee_mois'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    niveau = db.Column(db.String(50), nullable=False)
+    annee_scolaire = db.Column(db.String(20), nullable=False)
+    mois = db.Column(db.String(7), nullable=False)       # "AAAA-MM"
+    montant = db.Column(db.Float, nullable=False)
+    libelle = db.Column(db.String(100), nullable=True)   # ex : "Mensualité", "Inscription"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "niveau": self.niveau,
+            "annee_scolaire": self.annee_scolaire,
+            "mois": self.mois,
+            "montant": self.montant,
+            "libelle": self.libelle
+        }
@@ -1,6 +1,60 @@
+import os
+from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 from database import db
 from models.enums import RoleUtilisateur
+
+# Mots de passe par défaut des comptes créés par l'administration.
+# Ils sont publics (communiqués aux familles / enseignants) : les hacher à la
+# création coûterait un hachage lent par compte sans rien protéger. On stocke
+# un marqueur "defaut$<profil>", haché à la première connexion (hachage
+# différé). Ces mots de passe restent provisoires : le compte n'a accès qu'au
+# changement de mot de passe, et ils expirent AUTH_PROVISOIRE_JOURS jours
+# après la création du compte.
+PREFIXE_MOT_DE_PASSE_PAR_DEFAUT = "defaut$"
+MOTS_DE_PASSE_PAR_DEFAUT = {
+    "eleve": "eleve1234",
+    "parent": "parent123",
+    "enseignant": "test1234",
+}
+
+
+_hachages_par_defaut = {}
+
+
+def hachage_par_defaut(profil):
+    """Hachage du mot de passe par défaut du profil, calculé une fois par processus."""
+    hachage = _hachages_par_defaut.get(profil)
+    if hachage is None:
+        hachage = _hachages_par_defaut[profil] = generate_password_hash(MOTS_DE_PASSE_PAR_DEFAUT[profil])
+    return hachage
+
+
+def verifier_mot_de_passe(mot_de_passe_stocke, mot_de_passe):
+    """Vérifie un mot de passe contre la valeur stockée (hachage ou marqueur par défaut).
+
+    Le marqueur est vérifié contre le hachage du mot de passe par défaut, pas par
+    simple comparaison : tous les comptes coûtent le même hachage lent, et le
+    temps de réponse ne révèle pas ceux qui ont encore leur mot de passe par défaut."""
+    if not mot_de_passe or not mot_de_passe_stocke:
+        return False
+    if mot_de_passe_stocke.startswith(PREFIXE_MOT_DE_PASSE_PAR_DEFAUT):
+        profil = mot_de_passe_stocke[len(PREFIXE_MOT_DE_PASSE_PAR_DEFAUT):]
+        if profil not in MOTS_DE_PASSE_PAR_DEFAUT:
+            # Marqueur inconnu : même coût, toujours refusé
+            check_password_hash(hachage_par_defaut("eleve"), mot_de_passe)
+            return False
+        mot_de_passe_stocke = hachage_par_defaut(profil)
+    return check_password_hash(mot_de_passe_stocke, mot_de_passe)
+
+
+def mot_de_passe_par_defaut(profil):
+    """Valeur à stocker dans mot_de_passe pour un compte au mot de passe par défaut."""
+    if profil not in MOTS_DE_PASSE_PAR_DEFAUT:
+        raise ValueError(f"Profil sans mot de passe par défaut : {profil}")
+    return PREFIXE_MOT_DE_PASSE_PAR_DEFAUT + profil
+
+
 class Utilisateur(db.Model):
     __tablename__ = 'utilisateurs'
 
@@ -10,18 +64,44 @@ class Utilisateur(db.Model):
     nom = db.Column(db.String(100), nullable=False)
     prenom = db.Column(db.String(100), nullable=False)  # Facultatif mais utile
     telephone = db.Column(db.String(20), nullable=True)
-    role = db.Column(db.Enum(RoleUtilisateur), nullable=False)
+    role = db.Column(db.Enum(RoleUtilisateur), nullable=False, index=True)
+    # Mot de passe par défaut pas encore remplacé par l'utilisateur
+    mot_de_passe_provisoire = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
     # Dates pour audit
     date_creation = db.Column(db.DateTime, server_default=db.func.now())
     date_mise_a_jour = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
 
     # 🔐 Méthodes de sécurité
-    def set_password(self, mot_de_passe):
-        self.mot_de_passe = generate_password_hash(mot_de_passe)
+    def set_password(self, mot_de_passe, provisoire=False):
+        self.set_password_hash(generate_password_hash(mot_de_passe), provisoire)
+
+    def set_password_hash(self, hachage, provisoire=False):
+        self.mot_de_passe = hachage
+        self.mot_de_passe_provisoire = provisoire
+
+    def set_default_password(self, profil):
+        self.mot_de_passe = mot_de_passe_par_defaut(profil)
+        self.mot_de_passe_provisoire = True
+
+    @property
+    def a_mot_de_passe_non_hache(self):
+        """Marqueur par défaut encore en place : à hacher à la première connexion."""
+        return bool(self.mot_de_passe) and self.mot_de_passe.startswith(PREFIXE_MOT_DE_PASSE_PAR_DEFAUT)
+
+    @property
+    def a_mot_de_passe_par_defaut(self):
+        return bool(self.mot_de_passe_provisoire) or self.a_mot_de_passe_non_hache
+
+    @property
+    def mot_de_passe_provisoire_expire(self):
+        if not self.a_mot_de_passe_par_defaut or self.date_creation is None:
+            return False
+        validite = timedelta(days=float(os.getenv("AUTH_PROVISOIRE_JOURS", 30)))
+        return datetime.utcnow() > self.date_creation + validite
 
     def check_password(self, mot_de_passe):
-        return check_password_hash(self.mot_de_passe, mot_de_passe)
+        return verifier_mot_de_passe(self.mot_de_passe, mot_de_passe)
 
     def to_dict(self):
         return {
@@ -30,5 +110,6 @@ class Utilisateur(db.Model):
             'nom': self.nom,
             'prenom': self.prenom,
             'telephone': self.telephone,
-            'role': self.role.value
+            'role': self.role.value,
+            'mot_de_passe_par_defaut': self.a_mot_de_passe_par_defaut
         }
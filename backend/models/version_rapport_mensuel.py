@@ -0,0 +1,14 @@
+from database import db
+
+class VersionRapportMensuel(db.Model):
+    """Compteur d'écritures financières d'un mois, incrémenté à chaque invalidation du cache (services.rapports)."""
+    __tablename__ = 'versions_rapports_mensuels'
+
+    mois = db.Column(db.String(7), primary_key=True)       # "AAAA-MM"
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            "mois": self.mois,
+            "version": self.version
+        }
@@ -1,14 +1,32 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from datetime import datetime
+from collections import Counter
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from database import db
 from models.presence import Presence
 from models.eleve import Eleve
 from models.classe import Classe
 from models.enseignant import Enseignant
+from models.enums import StatutPresence
+from utils.serialisation import avec_relations
+from utils.pagination import paginer_par_curseur, parametres_curseur, CurseurInvalide
+from utils.streaming import streaming_demande, reponse_streamee
+from services.assiduite import appliquer_presences
 
 presence_bp = Blueprint('presence', __name__)
 
+STATUTS_APPEL = {"present"} | {statut.value for statut in StatutPresence}
+
+
+def _liste_parametre(nom, conversion=str):
+    """Valeurs multiples : ?nom=1&nom=2 ou ?nom=1,2"""
+    valeurs = []
+    for brut in request.args.getlist(nom):
+        valeurs += [conversion(v.strip()) for v in brut.split(',') if v.strip()]
+    return valeurs
+
 # ➕ Ajouter une présence
 @presence_bp.route('/presences', methods=['POST'])
 @jwt_required()
@@ -57,10 +75,131 @@ def ajouter_presence():
 
         return jsonify({"message": "Présence ajoutée", "presence": presence.to_dict()}), 201
 
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Présence déjà saisie pour cet élève dans cette classe à cette date"}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Erreur : {str(e)}"}), 500
 
+# 📝 Appel d'une classe entière en une seule requête
+# Corps : {"classe_id", "professeur_id", "date" (optionnelle),
+#          "presences": [{"eleve_id", "statut", "justifiee"?, "motif"?, "commentaire"?}, ...]}
+# Une présence déjà saisie pour (élève, classe, date) est mise à jour au lieu d'être dupliquée.
+@presence_bp.route('/presences/appel', methods=['POST'])
+@jwt_required()
+def faire_appel():
+    try:
+        data = request.get_json()
+
+        date_str = data.get('date')
+        lignes = data.get('presences')
+
+        try:
+            classe_id = int(data.get('classe_id'))
+            professeur_id = int(data.get('professeur_id'))
+        except (TypeError, ValueError):
+            classe_id = professeur_id = None
+        if not all([classe_id, professeur_id]) or not isinstance(lignes, list) or not lignes:
+            return jsonify({'error': 'Champs requis : classe_id, professeur_id, presences (liste non vide)'}), 400
+
+        try:
+            date_presence = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else datetime.today().date()
+        except (TypeError, ValueError):
+            return jsonify({"error": "Format de date incorrect (attendu: AAAA-MM-JJ)"}), 400
+
+        # Validation des lignes ; eleve_id peut arriver en texte ("12") : normalisé en entier
+        par_eleve = {}
+        for ligne in lignes:
+            try:
+                eleve_id = int(ligne.get('eleve_id'))
+            except (AttributeError, TypeError, ValueError):
+                eleve_id = None
+            statut = ligne.get('statut') if isinstance(ligne, dict) else None
+            if not eleve_id or not isinstance(statut, str) or statut not in STATUTS_APPEL:
+                return jsonify({
+                    "error": f"Ligne invalide : eleve_id entier et statut ({', '.join(sorted(STATUTS_APPEL))}) requis",
+                    "ligne": ligne
+                }), 400
+            if eleve_id in par_eleve:
+                return jsonify({"error": f"Élève {eleve_id} présent plusieurs fois dans l'appel"}), 400
+            par_eleve[eleve_id] = ligne
+
+        if not db.session.get(Classe, classe_id):
+            return jsonify({"error": "Classe introuvable"}), 404
+        if not db.session.get(Enseignant, professeur_id):
+            return jsonify({"error": "Professeur introuvable"}), 404
+
+        # Appartenance à la classe : une seule requête pour tous les élèves
+        inscrits = {
+            eleve_id for (eleve_id,) in
+            db.session.query(Eleve.id).filter(Eleve.classe_id == classe_id, Eleve.id.in_(par_eleve.keys()))
+        }
+        hors_classe = sorted(set(par_eleve) - inscrits)
+        if hors_classe:
+            return jsonify({"error": "Élèves introuvables dans cette classe", "eleve_ids": hors_classe}), 400
+
+        try:
+            crees = _enregistrer_appel(classe_id, professeur_id, date_presence, par_eleve)
+        except IntegrityError:
+            # Même appel renvoyé en parallèle (contrainte unique élève / classe / date) :
+            # ses lignes existent désormais, le second passage les met à jour
+            db.session.rollback()
+            crees = _enregistrer_appel(classe_id, professeur_id, date_presence, par_eleve)
+
+        return jsonify({
+            "message": "Appel enregistré",
+            "classe_id": classe_id,
+            "date": date_presence.isoformat(),
+            "crees": crees,
+            "mis_a_jour": len(par_eleve) - crees,
+            "par_statut": dict(Counter(ligne['statut'] for ligne in par_eleve.values()))
+        }), 201 if crees else 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de l'appel : {str(e)}"}), 500
+
+
+def _enregistrer_appel(classe_id, professeur_id, date_presence, par_eleve):
+    """Met à jour les présences déjà saisies, insère les autres et valide ; retourne le nombre de créations."""
+    existantes = {
+        presence.eleve_id: presence for presence in Presence.query.filter(
+            Presence.classe_id == classe_id,
+            Presence.date == date_presence,
+            Presence.eleve_id.in_(par_eleve.keys())
+        )
+    }
+
+    nouvelles = []
+    for eleve_id, ligne in par_eleve.items():
+        presence = existantes.get(eleve_id)
+        if presence is None:
+            nouvelles.append({
+                "eleve_id": eleve_id,
+                "classe_id": classe_id,
+                "professeur_id": professeur_id,
+                "date": date_presence,
+                "statut": ligne['statut'],
+                "justifiee": bool(ligne.get('justifiee', False)),
+                "motif": ligne.get('motif'),
+                "commentaire": ligne.get('commentaire') or None
+            })
+            continue
+        presence.professeur_id = professeur_id
+        presence.statut = ligne['statut']
+        presence.justifiee = bool(ligne.get('justifiee', presence.justifiee or False))
+        presence.motif = ligne.get('motif', presence.motif)
+        presence.commentaire = ligne.get('commentaire', presence.commentaire) or None
+
+    # Nouvelles lignes : une seule insertion groupée (executemany)
+    if nouvelles:
+        db.session.execute(insert(Presence), nouvelles)
+        # Insertion hors flush : agrégat quotidien mis à jour explicitement
+        appliquer_presences(db.session.connection(), [(presence, 1) for presence in nouvelles])
+    db.session.commit()
+    return len(nouvelles)
+
 # ✏️ Modifier une présence
 @presence_bp.route('/presences/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -89,6 +228,9 @@ def modifier_presence(id):
         db.session.commit()
         return jsonify({"message": "Présence modifiée", "presence": presence.to_dict()}), 200
 
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Présence déjà saisie pour cet élève dans cette classe à cette date"}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Erreur : {str(e)}'}), 500
@@ -110,31 +252,70 @@ def supprimer_presence(id):
         db.session.rollback()
         return jsonify({'error': f'Erreur lors de la suppression : {str(e)}'}), 500
 
-# 📋 Lister toutes les présences (optionnel: filtrer par classe, élève ou date)
+# 📋 Lister toutes les présences
+# Filtres : ?classe_id=, ?eleve_id=, ?professeur_id=, ?statut= (valeurs multiples : 1,2 ou paramètre répété),
+#           ?justifiee=true|false, ?date= (jour exact), ?date_debut= / ?date_fin= (bornes incluses)
+# Pagination par curseur sur (date, id), plus récentes d'abord
+# Export complet en streaming : ?stream=1 (tableau JSON) ou Accept: application/x-ndjson
 @presence_bp.route('/presences', methods=['GET'])
 @jwt_required()
 def lister_presences():
     try:
-        eleve_id = request.args.get('eleve_id')
-        classe_id = request.args.get('classe_id')
-        date_str = request.args.get('date')
-
+        curseur, limite = parametres_curseur()
         query = Presence.query
 
-        if eleve_id:
-            query = query.filter_by(eleve_id=eleve_id)
-        if classe_id:
-            query = query.filter_by(classe_id=classe_id)
-        if date_str:
-            try:
-                date_filter = datetime.strptime(date_str, '%Y-%m-%d').date()
-                query = query.filter_by(date=date_filter)
-            except ValueError:
-                return jsonify({"error": "Format de date incorrect (attendu: AAAA-MM-JJ)"}), 400
+        try:
+            eleve_ids = _liste_parametre('eleve_id', int)
+            classe_ids = _liste_parametre('classe_id', int)
+            professeur_ids = _liste_parametre('professeur_id', int)
+        except ValueError:
+            return jsonify({"error": "eleve_id, classe_id et professeur_id doivent être des entiers"}), 400
+
+        statuts = _liste_parametre('statut')
+        if set(statuts) - STATUTS_APPEL:
+            return jsonify({"error": f"Statut invalide, valeurs possibles : {', '.join(sorted(STATUTS_APPEL))}"}), 400
+
+        # Égalité ou IN sur classe_id puis intervalle sur date : parcours de l'index (classe_id, date)
+        if classe_ids:
+            query = query.filter(Presence.classe_id.in_(classe_ids))
+        if eleve_ids:
+            query = query.filter(Presence.eleve_id.in_(eleve_ids))
+        if professeur_ids:
+            query = query.filter(Presence.professeur_id.in_(professeur_ids))
+        if statuts:
+            query = query.filter(Presence.statut.in_(statuts))
 
-        presences = query.all()
-        return jsonify([p.to_dict() for p in presences]), 200
+        justifiee = request.args.get('justifiee')
+        if justifiee is not None:
+            query = query.filter(Presence.justifiee.is_(justifiee.lower() in ('1', 'true', 'oui')))
+
+        try:
+            date_str = request.args.get('date')
+            if date_str:
+                query = query.filter(Presence.date == datetime.strptime(date_str, '%Y-%m-%d').date())
+            date_debut = request.args.get('date_debut')
+            if date_debut:
+                query = query.filter(Presence.date >= datetime.strptime(date_debut, '%Y-%m-%d').date())
+            date_fin = request.args.get('date_fin')
+            if date_fin:
+                query = query.filter(Presence.date <= datetime.strptime(date_fin, '%Y-%m-%d').date())
+        except ValueError:
+            return jsonify({"error": "Format de date incorrect (attendu: AAAA-MM-JJ)"}), 400
+
+        if streaming_demande():
+            return reponse_streamee(avec_relations(query, "presence").order_by(Presence.date.desc(), Presence.id.desc()))
+
+        presences, next_cursor = paginer_par_curseur(
+            avec_relations(query, "presence"), Presence.date, Presence.id, curseur, limite
+        )
+        return jsonify({
+            "presences": [p.to_dict() for p in presences],
+            "next_cursor": next_cursor,
+            "limite": limite
+        }), 200
 
+    except CurseurInvalide as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération : {str(e)}'}), 500
 
@@ -0,0 +1,114 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from datetime import datetime
+from database import db
+from models.eleve import Eleve
+from models.enums import RoleUtilisateur
+from services.authentification import role_required
+from services import assiduite
+
+assiduite_bp = Blueprint('assiduite', __name__)
+
+
+def _periode():
+    """?date_debut= et ?date_fin= (AAAA-MM-JJ) ; par défaut les 30 derniers jours."""
+    def lire(nom):
+        valeur = request.args.get(nom)
+        return datetime.strptime(valeur, '%Y-%m-%d').date() if valeur else None
+
+    date_debut, date_fin = assiduite.periode_par_defaut(lire('date_debut'), lire('date_fin'))
+    if date_debut > date_fin:
+        raise ValueError("date_debut postérieure à date_fin")
+    return date_debut, date_fin
+
+
+def _reponse_periode(date_debut, date_fin, **contenu):
+    return jsonify({"date_debut": date_debut.isoformat(), "date_fin": date_fin.isoformat(), **contenu}), 200
+
+
+# 👤 Assiduité d'un élève : taux, absences justifiées / non justifiées, séries d'absences
+@assiduite_bp.route('/assiduite/eleves/<int:eleve_id>', methods=['GET'])
+@jwt_required()
+def assiduite_eleve(eleve_id):
+    try:
+        date_debut, date_fin = _periode()
+        eleve = db.session.get(Eleve, eleve_id)
+        if not eleve:
+            return jsonify({"error": "Élève introuvable"}), 404
+
+        taux = assiduite.taux_par_eleve(date_debut, date_fin, eleve_ids=[eleve_id]).get(eleve_id)
+        series = assiduite.series_absences(date_debut, date_fin, seuil=request.args.get('seuil_jours', 2, type=int), eleve_ids=[eleve_id])
+        return _reponse_periode(
+            date_debut, date_fin,
+            eleve={"id": eleve.id, "nom": eleve.nom, "prenom": eleve.prenom, "classe_id": eleve.classe_id},
+            taux=taux or assiduite._taux({nom: 0 for nom in assiduite.COMPTEURS}),
+            series=series
+        )
+
+    except ValueError as e:
+        return jsonify({"error": f"Période invalide : {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul de l'assiduité : {str(e)}"}), 500
+
+
+# 🏫 Taux par classe (classes les moins assidues en premier) ; ?classe_id=1,2 pour restreindre
+@assiduite_bp.route('/assiduite/classes', methods=['GET'])
+@jwt_required()
+def assiduite_classes():
+    try:
+        date_debut, date_fin = _periode()
+        classe_ids = [int(i) for i in request.args.get('classe_id', '').split(',') if i.strip()]
+        return _reponse_periode(date_debut, date_fin, classes=assiduite.taux_par_classe(date_debut, date_fin, classe_ids))
+
+    except ValueError as e:
+        return jsonify({"error": f"Paramètres invalides : {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul de l'assiduité : {str(e)}"}), 500
+
+
+# 👨‍🏫 Taux par professeur (présences relevées par chaque professeur)
+@assiduite_bp.route('/assiduite/enseignants', methods=['GET'])
+@jwt_required()
+def assiduite_enseignants():
+    try:
+        date_debut, date_fin = _periode()
+        professeur_id = request.args.get('professeur_id', type=int)
+        return _reponse_periode(date_debut, date_fin, enseignants=assiduite.taux_par_enseignant(date_debut, date_fin, professeur_id))
+
+    except ValueError as e:
+        return jsonify({"error": f"Période invalide : {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul de l'assiduité : {str(e)}"}), 500
+
+
+# 🚨 Alertes : séries d'absences consécutives (?seuil_jours=3) ou taux d'absence non justifiée (?seuil_taux=0.2)
+@assiduite_bp.route('/assiduite/alertes', methods=['GET'])
+@jwt_required()
+def alertes_assiduite():
+    try:
+        date_debut, date_fin = _periode()
+        resultats = assiduite.alertes(
+            date_debut, date_fin,
+            seuil_jours=request.args.get('seuil_jours', 3, type=int),
+            seuil_taux=request.args.get('seuil_taux', 0.2, type=float),
+            classe_id=request.args.get('classe_id', type=int)
+        )
+        return _reponse_periode(date_debut, date_fin, alertes=resultats)
+
+    except ValueError as e:
+        return jsonify({"error": f"Période invalide : {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul des alertes : {str(e)}"}), 500
+
+
+# 🔁 Reconstruction de l'agrégat quotidien (ADMIN uniquement)
+@assiduite_bp.route('/assiduite/recalculer', methods=['POST'])
+@role_required(RoleUtilisateur.ADMIN)
+def recalculer_assiduite():
+    try:
+        assiduite.recalculer_agregat()
+        return jsonify({"message": "Agrégat des présences recalculé"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors du recalcul : {str(e)}"}), 500
@@ -1,11 +1,30 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from database import db
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt, get_jwt_identity
+)
+from database import db, lecture_primaire
 from models.utilisateur import Utilisateur
 from models.enums import RoleUtilisateur
+from services.authentification import (
+    ServiceSature, claims_utilisateur, limiteur_compte, limiteur_ip, metriques,
+    role_required, utilisateur_depuis_claims, verificateur
+)
+from services.revocation import registre_revocations
 
 auth_bp = Blueprint('auth', __name__)
 
+def _trop_de_tentatives(attente):
+    reponse = jsonify({"error": "Trop de tentatives de connexion, réessayez plus tard"})
+    reponse.headers["Retry-After"] = str(max(1, int(attente + 0.999)))
+    return reponse, 429
+
+
+def _service_sature(erreur):
+    reponse = jsonify({"error": str(erreur)})
+    reponse.headers["Retry-After"] = "1"
+    return reponse, 503
+
+
 # 🔐 Connexion
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -17,12 +36,43 @@ def login():
         if not all([email, mot_de_passe]):
             return jsonify({"error": "Email et mot de passe requis"}), 400
 
+        autorise, attente = limiteur_ip.autoriser(request.remote_addr or "inconnue")
+        if not autorise:
+            metriques.incrementer("refus_limite_ip")
+            return _trop_de_tentatives(attente)
+        autorise, attente = limiteur_compte.autoriser(email)
+        if not autorise:
+            metriques.incrementer("refus_limite_compte")
+            return _trop_de_tentatives(attente)
+
         utilisateur = Utilisateur.query.filter_by(email=email).first()
-        if utilisateur and utilisateur.check_password(mot_de_passe):
-            access_token = create_access_token(identity=str(utilisateur.id))
+        # Email inconnu : vérification contre un hachage factice, même coût
+        try:
+            valide = verificateur.verifier(utilisateur.mot_de_passe if utilisateur else None, mot_de_passe)
+        except ServiceSature as e:
+            return _service_sature(e)
+
+        if utilisateur and valide:
+            if utilisateur.mot_de_passe_provisoire_expire:
+                return jsonify({"error": "Mot de passe provisoire expiré, contactez l'administration"}), 403
+
+            # Première connexion avec le mot de passe par défaut : hachage différé
+            if utilisateur.a_mot_de_passe_non_hache:
+                try:
+                    utilisateur.set_password_hash(verificateur.hacher(mot_de_passe), provisoire=True)
+                except ServiceSature as e:
+                    return _service_sature(e)
+                db.session.commit()
+
+            access_token = create_access_token(
+                identity=str(utilisateur.id),
+                additional_claims=claims_utilisateur(utilisateur)
+            )
+            refresh_token = create_refresh_token(identity=str(utilisateur.id))
             return jsonify({
                 "message": "Connexion réussie",
                 "access_token": access_token,
+                "refresh_token": refresh_token,
                 "utilisateur": utilisateur.to_dict()
             }), 200
 
@@ -32,6 +82,13 @@ def login():
         return jsonify({"error": f"Erreur serveur : {str(e)}"}), 500
 
 
+# 📈 Métriques de connexion (ADMIN uniquement)
+@auth_bp.route('/metriques', methods=['GET'])
+@role_required(RoleUtilisateur.ADMIN)
+def metriques_connexion():
+    return jsonify(metriques.to_dict()), 200
+
+
 # 🧾 Inscription
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
@@ -71,11 +128,17 @@ def signup():
 # 🧾 Mes Infos
 @auth_bp.route('/moi', methods=['GET'])
 @jwt_required()
+@lecture_primaire
 def utilisateur_actuel():
     try:
-        utilisateur_id =get_jwt_identity()
-        utilisateur = Utilisateur.query.get(utilisateur_id)
-        
+        # Répond depuis les claims du jeton ; anciens jetons sans claims : lecture en base
+        if "role" in get_jwt():
+            return jsonify({
+                "message": "Connexion réussie",
+                "utilisateur": utilisateur_depuis_claims()
+            }), 200
+
+        utilisateur = Utilisateur.query.get(get_jwt_identity())
         if not utilisateur:
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
 
@@ -86,11 +149,49 @@ def utilisateur_actuel():
     except Exception as e:
         return jsonify({'error': str(e)}),500
 
-# 🚪 Déconnexion fictive
+# 🔄 Renouvellement du jeton d'accès
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def rafraichir():
+    try:
+        # Relu en base : un compte supprimé ou un rôle modifié est pris en compte ici
+        utilisateur = Utilisateur.query.get(get_jwt_identity())
+        if not utilisateur:
+            return jsonify({"error": "Utilisateur non trouvé"}), 401
+
+        access_token = create_access_token(
+            identity=str(utilisateur.id),
+            additional_claims=claims_utilisateur(utilisateur)
+        )
+        return jsonify({"access_token": access_token}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur serveur : {str(e)}"}), 500
+
+
+# 🚪 Déconnexion : révoque le jeton d'accès (et le jeton de rafraîchissement s'il est fourni)
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    return jsonify({"message": "Déconnexion réussie (token à supprimer côté client)"}), 200
+    try:
+        jeton = get_jwt()
+        utilisateur_id = int(get_jwt_identity())
+        registre_revocations.revoquer(jeton["jti"], jeton["exp"], utilisateur_id)
+
+        refresh_token = (request.get_json(silent=True) or {}).get("refresh_token")
+        if refresh_token:
+            try:
+                rafraichissement = decode_token(refresh_token)
+            except Exception:
+                return jsonify({"error": "Jeton de rafraîchissement invalide"}), 400
+            if rafraichissement.get("sub") != jeton["sub"]:
+                return jsonify({"error": "Jeton de rafraîchissement invalide"}), 400
+            registre_revocations.revoquer(rafraichissement["jti"], rafraichissement["exp"], utilisateur_id)
+
+        return jsonify({"message": "Déconnexion réussie"}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la déconnexion : {str(e)}"}), 500
 
 
 # 📄 Liste des utilisateurs
@@ -162,15 +263,9 @@ def supprimer_utilisateur(id):
 
 # 🔑 Modifier le mot de passe d’un utilisateur (ADMIN uniquement)
 @auth_bp.route('/utilisateurs/<int:id>/motdepasse', methods=['PUT'])
-@jwt_required()
+@role_required(RoleUtilisateur.ADMIN)
 def modifier_mot_de_passe(id):
     try:
-        admin_id = get_jwt_identity()
-        admin = Utilisateur.query.get(admin_id)
-
-        if not admin or admin.role != RoleUtilisateur.ADMIN:
-            return jsonify({"error": "Accès réservé aux administrateurs"}), 403
-
         utilisateur = Utilisateur.query.get(id)
         if not utilisateur:
             return jsonify({"error": "Utilisateur non trouvé"}), 404
@@ -208,11 +303,20 @@ def changer_son_mot_de_passe():
 
         if not utilisateur.check_password(ancien):
             return jsonify({"error": "Ancien mot de passe incorrect"}), 403
+        if nouveau == ancien:
+            return jsonify({"error": "Le nouveau mot de passe doit être différent de l'ancien"}), 400
 
         utilisateur.set_password(nouveau)
         db.session.commit()
 
-        return jsonify({"message": "Mot de passe modifié avec succès"}), 200
+        # Nouveau jeton : l'ancien porte encore mot_de_passe_par_defaut
+        return jsonify({
+            "message": "Mot de passe modifié avec succès",
+            "access_token": create_access_token(
+                identity=str(utilisateur.id),
+                additional_claims=claims_utilisateur(utilisateur)
+            )
+        }), 200
 
     except Exception as e:
         db.session.rollback()
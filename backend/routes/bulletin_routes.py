@@ -0,0 +1,27 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from database import db
+from models.classe import Classe
+from services.bulletins import calculer_bulletins
+
+bulletin_bp = Blueprint('bulletin', __name__)
+
+# 📑 Bulletins d'une classe pour une période (optionnel : ?eleve_id= pour un seul élève)
+@bulletin_bp.route('/classes/<int:classe_id>/bulletins', methods=['GET'])
+@jwt_required()
+def bulletins_classe(classe_id):
+    try:
+        periode = request.args.get('periode')
+        eleve_id = request.args.get('eleve_id', type=int)
+
+        if not periode:
+            return jsonify({"error": "Paramètre requis : periode"}), 400
+
+        classe = db.session.get(Classe, classe_id)
+        if not classe:
+            return jsonify({"error": "Classe introuvable"}), 404
+
+        return jsonify(calculer_bulletins(classe, periode, eleve_id)), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul des bulletins : {str(e)}"}), 500
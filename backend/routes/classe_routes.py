@@ -4,6 +4,8 @@ from database import db
 from models.classe import Classe
 from sqlalchemy.exc import SQLAlchemyError
 from models.enseignant import Enseignant
+from utils.serialisation import serialiser
+from services.cache_reponses import reponse_en_cache
 classe_bp = Blueprint('classe', __name__)
 
 # 🔹 Ajouter une nouvelle classe
@@ -49,10 +51,10 @@ def ajouter_classe():
 # 🔹 Récupérer la liste de toutes les classes
 @classe_bp.route('/classes', methods=['GET'])
 @jwt_required()
+@reponse_en_cache("classes")
 def lister_classes():
     try:
-        classes = Classe.query.all()
-        return jsonify([classe.to_dict() for classe in classes]), 200
+        return jsonify(serialiser(Classe.query, "classe")), 200
     except SQLAlchemyError as e:
         return jsonify({"error": f"Erreur lors de la récupération des classes : {str(e)}"}), 500
 
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required
 from datetime import datetime
 from database import db
 from models.depense import Depense
+from utils.pagination import paginer_par_curseur, parametres_curseur, CurseurInvalide
+from utils.streaming import streaming_demande, reponse_streamee
 
 depense_bp = Blueprint('depense', __name__)
 
@@ -90,13 +92,24 @@ def supprimer_depense(id):
         return jsonify({"error": f"Erreur lors de la suppression : {str(e)}"}), 500
 
 
-# 📋 Liste des dépenses
+# 📋 Liste des dépenses (pagination par curseur sur (date, id), plus récentes d'abord)
+# Export complet en streaming : ?stream=1 (tableau JSON) ou Accept: application/x-ndjson
 @depense_bp.route('/depenses', methods=['GET'])
 @jwt_required()
 def lister_depenses():
     try:
-        depenses = Depense.query.order_by(Depense.date.desc()).all()
-        return jsonify([d.to_dict() for d in depenses]), 200
+        if streaming_demande():
+            return reponse_streamee(Depense.query.order_by(Depense.date.desc(), Depense.id.desc()))
+
+        curseur, limite = parametres_curseur()
+        depenses, next_cursor = paginer_par_curseur(Depense.query, Depense.date, Depense.id, curseur, limite)
+        return jsonify({
+            "depenses": [d.to_dict() for d in depenses],
+            "next_cursor": next_cursor,
+            "limite": limite
+        }), 200
+    except CurseurInvalide as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des dépenses : {str(e)}"}), 500
 
@@ -5,7 +5,11 @@ from models.eleve import Eleve
 from models.utilisateur import Utilisateur
 from models.classe import Classe
 from models.enums import RoleUtilisateur
+from utils.serialisation import avec_relations
+from utils.pagination import paginer_par_curseur, parametres_curseur, CurseurInvalide
+from services.import_eleves import importer_eleves, lire_csv
 from datetime import datetime
+from sqlalchemy import and_, or_, select, text
 
 eleve_bp = Blueprint('eleve', __name__)
 
@@ -56,7 +60,7 @@ def ajouter_eleve():
                 telephone=parent_telephone,
                 role=RoleUtilisateur.PARENT
             )
-            parent_utilisateur.set_password("parent123")
+            parent_utilisateur.set_default_password("parent")
             db.session.add(parent_utilisateur)
             db.session.flush()
 
@@ -71,7 +75,7 @@ def ajouter_eleve():
             prenom=prenom,
             role=RoleUtilisateur.ELEVE
         )
-        eleve_utilisateur.set_password("eleve1234")
+        eleve_utilisateur.set_default_password("eleve")
         db.session.add(eleve_utilisateur)
         db.session.flush()
 
@@ -96,6 +100,35 @@ def ajouter_eleve():
         return jsonify({"error": f"Erreur lors de l'ajout de l'élève : {str(e)}"}), 500
 
 
+# 📥 Import en masse d'élèves (CSV ou tableau JSON)
+# - CSV : fichier multipart "fichier" ou corps text/csv, avec en-tête
+#   nom,prenom,sexe,matricule,date_naissance,adresse,classe_id,parent_nom,parent_prenom,parent_telephone
+# - JSON : tableau d'objets avec les mêmes champs que POST /eleves (ou {"eleves": [...]})
+# Les lignes valides sont importées dans une seule transaction, les autres sont rapportées.
+@eleve_bp.route('/eleves/import', methods=['POST'])
+@jwt_required()
+def importer_eleves_route():
+    try:
+        if 'fichier' in request.files:
+            lignes = lire_csv(request.files['fichier'].read())
+        elif request.mimetype in ('text/csv', 'text/plain'):
+            lignes = lire_csv(request.get_data())
+        else:
+            data = request.get_json(silent=True)
+            lignes = data.get('eleves') if isinstance(data, dict) else data
+
+        if not isinstance(lignes, list) or not lignes:
+            return jsonify({"error": "Aucune ligne à importer (CSV ou tableau JSON attendu)"}), 400
+
+        rapport = importer_eleves(lignes)
+        code = 201 if rapport["importes"] else 400
+        return jsonify({"message": f"{rapport['importes']} élève(s) importé(s)", **rapport}), code
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de l'import des élèves : {str(e)}"}), 500
+
+
 # 🔄 Modifier un élève
 @eleve_bp.route('/eleves/<int:eleve_id>', methods=['PUT'])
 @jwt_required()
@@ -192,25 +225,107 @@ def supprimer_eleve(eleve_id):
         return jsonify({"error": f"Erreur lors de la suppression : {str(e)}"}), 500
     
 
-    # 📋 Lister tous les élèves
+TRIS_ELEVES = {
+    "id": Eleve.id,
+    "nom": Eleve.nom,
+    "prenom": Eleve.prenom,
+    "matricule": Eleve.matricule,
+}
+TAILLE_NGRAM = 2  # ngram_token_size par défaut de MySQL
+
+
+def _echapper_like(mot):
+    return mot.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _condition_recherche(q):
+    """Chaque mot de ?q doit préfixer le nom, le prénom ou le matricule.
+    Sous MySQL, index FULLTEXT n-gram (le mot peut aussi apparaître au milieu)."""
+    mots = q.split()
+    if db.engine.dialect.name == "mysql" and all(len(mot) >= TAILLE_NGRAM for mot in mots):
+        termes = " ".join(f'+"{mot.replace(chr(34), "")}"' for mot in mots)
+        return text("MATCH (eleves.nom, eleves.prenom, eleves.matricule) AGAINST (:termes IN BOOLEAN MODE)").bindparams(termes=termes)
+
+    return and_(*[
+        or_(*[
+            colonne.like(f"{_echapper_like(mot)}%", escape="\\")
+            for colonne in (Eleve.nom, Eleve.prenom, Eleve.matricule)
+        ])
+        for mot in mots
+    ])
+
+
+def _filtrer_eleves(query):
+    """?q, ?classe_id, ?sexe, ?niveau, ?annee_scolaire"""
+    q = request.args.get('q', '').strip()
+    if q:
+        query = query.filter(_condition_recherche(q))
+
+    classe_id = request.args.get('classe_id', type=int)
+    if classe_id:
+        query = query.filter(Eleve.classe_id == classe_id)
+
+    sexe = request.args.get('sexe')
+    if sexe:
+        query = query.filter(Eleve.sexe == sexe.upper())
+
+    niveau = request.args.get('niveau')
+    annee_scolaire = request.args.get('annee_scolaire')
+    if niveau or annee_scolaire:
+        classes = select(Classe.id)
+        if niveau:
+            classes = classes.where(Classe.niveau == niveau)
+        if annee_scolaire:
+            classes = classes.where(Classe.annee_scolaire == annee_scolaire)
+        query = query.filter(Eleve.classe_id.in_(classes))
+
+    return query
+
+
+# 📋 Lister tous les élèves
+# Recherche : ?q=  (préfixe du nom, du prénom ou du matricule, plusieurs mots possibles)
+# Filtres : ?classe_id= ?sexe= ?niveau= ?annee_scolaire=
+# Tri : ?tri=id|nom|prenom|matricule  ?ordre=asc|desc
 @eleve_bp.route('/eleves', methods=['GET'])
 @jwt_required()
 def lister_eleves():
     try:
-        # Optionnel : pagination (page & per_page)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-
-        pagination = Eleve.query.paginate(page=page, per_page=per_page, error_out=False)
-        eleves = pagination.items
+        tri = request.args.get('tri', 'id')
+        if tri not in TRIS_ELEVES:
+            return jsonify({"error": f"Tri invalide, valeurs possibles : {', '.join(TRIS_ELEVES)}"}), 400
+        descendant = request.args.get('ordre', 'asc').lower() == 'desc'
+
+        query = _filtrer_eleves(avec_relations(Eleve.query, "eleve"))
+
+        # Ancienne pagination par numéro de page (OFFSET), conservée si ?page= est fourni
+        if 'page' in request.args:
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 20, type=int)
+
+            colonne = TRIS_ELEVES[tri]
+            ordre = [colonne.desc(), Eleve.id.desc()] if descendant else [colonne.asc(), Eleve.id.asc()]
+            pagination = query.order_by(*ordre).paginate(page=page, per_page=per_page, error_out=False)
+            eleves = pagination.items
+
+            return jsonify({
+                "eleves": [eleve.to_dict() for eleve in eleves],
+                "total": pagination.total,
+                "pages": pagination.pages,
+                "page": pagination.page,
+                "per_page": pagination.per_page
+            }), 200
+
+        # Pagination par curseur (?curseur=...&limite=...)
+        curseur, limite = parametres_curseur()
+        eleves, next_cursor = paginer_par_curseur(query, TRIS_ELEVES[tri], Eleve.id, curseur, limite, descendant=descendant)
 
         return jsonify({
             "eleves": [eleve.to_dict() for eleve in eleves],
-            "total": pagination.total,
-            "pages": pagination.pages,
-            "page": pagination.page,
-            "per_page": pagination.per_page
+            "next_cursor": next_cursor,
+            "limite": limite
         }), 200
 
+    except CurseurInvalide as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des élèves : {str(e)}"}), 500
@@ -6,9 +6,74 @@ from models.emploi_du_temps import EmploiDuTemps
 from models.classe import Classe
 from models.enseignant import Enseignant
 from models.matiere import Matiere
+from utils.serialisation import serialiser
+from services.conflits_emplois import index_creneaux, verifier_semaine
+from services import generateur_emplois
+from services.cache_reponses import reponse_en_cache
 
 emploi_bp = Blueprint('emploi_du_temps', __name__)
 
+
+def _creneau(emploi, salle):
+    return {
+        "jour": emploi.jour,
+        "heure_debut": emploi.heure_debut,
+        "heure_fin": emploi.heure_fin,
+        "classe_id": emploi.classe_id,
+        "enseignant_id": emploi.enseignant_id,
+        "salle": salle
+    }
+
+
+JOURS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+
+
+def _references(emplois):
+    """Tables de correspondance dédoublonnées : une requête IN par type d'entité."""
+    def table(modele, ids):
+        if not ids:
+            return {}
+        return {str(objet.id): objet.to_dict_compact() if hasattr(objet, 'to_dict_compact') else objet.to_dict()
+                for objet in modele.query.filter(modele.id.in_(ids))}
+
+    return {
+        "classes": table(Classe, {e.classe_id for e in emplois}),
+        "enseignants": table(Enseignant, {e.enseignant_id for e in emplois}),
+        "matieres": table(Matiere, {e.matiere_id for e in emplois})
+    }
+
+
+def _vue_normalisee(query):
+    emplois = query.all()
+    return {"creneaux": [e.to_dict_compact() for e in emplois], **_references(emplois)}
+
+
+def _ordre_jour(jour):
+    jour = jour.strip().lower()
+    return JOURS.index(jour) if jour in JOURS else len(JOURS)
+
+
+def _vue_grille(query):
+    """Créneaux regroupés par jour (ordre de la semaine) puis triés par heure."""
+    emplois = query.all()
+    grille = []
+    for emploi in sorted(emplois, key=lambda e: (_ordre_jour(e.jour), e.jour, e.heure_debut)):
+        if not grille or grille[-1]["jour"] != emploi.jour:
+            grille.append({"jour": emploi.jour, "creneaux": []})
+        grille[-1]["creneaux"].append(emploi.to_dict_compact())
+    return {"jours": grille, **_references(emplois)}
+
+
+def _reponse_liste(query):
+    """Liste complète par défaut, ?format=normalise pour la vue compacte."""
+    if request.args.get('format') == 'normalise':
+        return jsonify(_vue_normalisee(query)), 200
+    return jsonify(serialiser(query, "emploi")), 200
+
+
+def _reponse_conflits(conflits):
+    return jsonify({"error": "Conflit d'emploi du temps", "conflits": conflits}), 409
+
 # 🔹 Ajouter un créneau à l'emploi du temps
 @emploi_bp.route('/emplois', methods=['POST'])
 @jwt_required()
@@ -27,7 +92,8 @@ def ajouter_emploi():
             return jsonify({"error": "Tous les champs sont requis"}), 400
 
         # Vérification des entités existantes
-        if not Classe.query.get(classe_id):
+        classe = Classe.query.get(classe_id)
+        if not classe:
             return jsonify({"error": "Classe introuvable"}), 404
         if not Enseignant.query.get(enseignant_id):
             return jsonify({"error": "Enseignant introuvable"}), 404
@@ -38,10 +104,18 @@ def ajouter_emploi():
             jour=jour,
             heure_debut=datetime.strptime(heure_debut, "%H:%M").time(),
             heure_fin=datetime.strptime(heure_fin, "%H:%M").time(),
-            classe_id=classe_id,
-            enseignant_id=enseignant_id,
+            classe_id=classe.id,
+            enseignant_id=int(enseignant_id),
             matiere_id=matiere_id
         )
+        if emploi.heure_debut >= emploi.heure_fin:
+            return jsonify({"error": "L'heure de début doit précéder l'heure de fin"}), 400
+
+        # Classe, enseignant et salle déjà occupés sur ce créneau ?
+        conflits = index_creneaux.conflits_en_base(_creneau(emploi, classe.salle))
+        if conflits:
+            return _reponse_conflits(conflits)
+
         db.session.add(emploi)
         db.session.commit()
         return jsonify({"message": "Créneau ajouté", "emploi": emploi.to_dict()}), 201
@@ -50,13 +124,143 @@ def ajouter_emploi():
         return jsonify({"error": f"Erreur serveur : {str(e)}"}), 500
 
 
-# 📋 Lister tout l'emploi du temps
+# 🧮 Vérifier une semaine proposée (sans rien enregistrer)
+# Corps : {"creneaux": [{"jour", "heure_debut", "heure_fin", "classe_id", "enseignant_id", "id"?}, ...],
+#          "remplacer": false}
+# - "id" : créneau existant que l'on déplace (ignoré dans l'existant)
+# - "remplacer": true : la proposition remplace tout l'emploi du temps des classes concernées
+@emploi_bp.route('/emplois/verifier', methods=['POST'])
+@jwt_required()
+def verifier_emplois():
+    try:
+        data = request.get_json()
+        proposes = data.get('creneaux')
+        if not isinstance(proposes, list) or not proposes:
+            return jsonify({"error": "Champ requis : creneaux (liste non vide)"}), 400
+
+        classe_ids = set()
+        for creneau in proposes:
+            try:
+                classe_ids.add(int(creneau['classe_id']))
+            except (KeyError, TypeError, ValueError):
+                return jsonify({"error": "Créneau invalide : classe_id requis", "creneau": creneau}), 400
+        salles = dict(db.session.query(Classe.id, Classe.salle).filter(Classe.id.in_(classe_ids)))
+
+        creneaux = []
+        ignorer = set()
+        for position, creneau in enumerate(proposes):
+            try:
+                classe_id = int(creneau['classe_id'])
+                if classe_id not in salles:
+                    return jsonify({"error": "Classe introuvable", "creneau": position}), 404
+                if not isinstance(creneau['jour'], str) or not creneau['jour'].strip():
+                    raise ValueError
+                # Créneau existant déplacé : "id" peut arriver en texte ("11")
+                if creneau.get('id') is not None:
+                    ignorer.add(int(creneau['id']))
+                valide = {
+                    "jour": creneau['jour'],
+                    "heure_debut": datetime.strptime(creneau['heure_debut'], "%H:%M").time(),
+                    "heure_fin": datetime.strptime(creneau['heure_fin'], "%H:%M").time(),
+                    "classe_id": classe_id,
+                    "enseignant_id": int(creneau['enseignant_id']),
+                    "salle": salles[classe_id]
+                }
+            except (KeyError, TypeError, ValueError):
+                return jsonify({
+                    "error": "Créneau invalide : jour (texte), heure_debut, heure_fin (HH:MM), classe_id, "
+                             "enseignant_id requis, id entier",
+                    "creneau": position
+                }), 400
+            if valide["heure_debut"] >= valide["heure_fin"]:
+                return jsonify({"error": "L'heure de début doit précéder l'heure de fin", "creneau": position}), 400
+            creneaux.append(valide)
+
+        if data.get('remplacer'):
+            ignorer |= index_creneaux.ids_des_classes(classe_ids)
+
+        conflits = verifier_semaine(creneaux, ignorer=ignorer)
+        return jsonify({"valide": not conflits, "conflits": conflits}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur serveur : {str(e)}"}), 500
+
+
+# 🤖 Générer automatiquement l'emploi du temps d'une ou plusieurs classes
+# Corps : {"classes": [{"classe_id": 1, "besoins": {"<matiere_id>": heures_hebdo, ...}}, ...],
+#          "jours": [...]?, "plages": [["08:00", "09:00"], ...]?, "duree_max": 20?, "enregistrer": false}
+# Les enseignants sont choisis parmi ceux qualifiés pour la matière (enseignant_matiere) ;
+# les créneaux des autres classes sont respectés. Avec "enregistrer": true, une semaine
+# complète remplace l'emploi du temps existant des classes concernées.
+@emploi_bp.route('/emplois/generer', methods=['POST'])
+@jwt_required()
+def generer_emplois():
+    try:
+        data = request.get_json()
+        classes = data.get('classes')
+        if not isinstance(classes, list) or not classes:
+            return jsonify({"error": "Champ requis : classes (liste non vide)"}), 400
+
+        besoins_classes = {}
+        try:
+            for entree in classes:
+                besoins_classes[int(entree['classe_id'])] = {
+                    int(matiere_id): float(heures) for matiere_id, heures in entree['besoins'].items()
+                }
+            plages = [(debut, fin) for debut, fin in data['plages']] if data.get('plages') else None
+            bornes = sorted(
+                (datetime.strptime(debut, "%H:%M"), datetime.strptime(fin, "%H:%M")) for debut, fin in plages or []
+            )
+            if any(debut >= fin for debut, fin in bornes):
+                raise ValueError
+            jours = data.get('jours')
+            if jours is not None and not (
+                isinstance(jours, list) and jours and all(isinstance(jour, str) and jour.strip() for jour in jours)
+            ):
+                raise ValueError
+            duree_max = float(data.get('duree_max', 20))
+            if not 0 < duree_max < float("inf"):
+                raise ValueError
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return jsonify({"error": "Format invalide : classes[].classe_id, classes[].besoins {matiere_id: heures}, "
+                                     "plages [[HH:MM, HH:MM]], jours [texte], duree_max (secondes)"}), 400
+
+        # Le solveur traite chaque plage comme une ressource distincte : deux plages qui se
+        # chevauchent placeraient la même classe (ou le même enseignant) deux fois à la même heure
+        chevauchements = [
+            f"{debut:%H:%M}-{fin:%H:%M} / {debut_suivante:%H:%M}-{fin_suivante:%H:%M}"
+            for (debut, fin), (debut_suivante, fin_suivante) in zip(bornes, bornes[1:]) if debut_suivante < fin
+        ]
+        if chevauchements:
+            return jsonify({"error": "Plages horaires qui se chevauchent", "plages": chevauchements}), 400
+
+        resultat = generateur_emplois.generer(besoins_classes, jours=jours, plages=plages, duree_max=duree_max)
+
+        resultat["enregistre"] = False
+        if data.get('enregistrer') and resultat["complet"]:
+            generateur_emplois.enregistrer(list(besoins_classes), resultat["creneaux"])
+            resultat["enregistre"] = True
+
+        return jsonify(resultat), 201 if resultat["enregistre"] else 200
+
+    except generateur_emplois.ClassesIntrouvables as e:
+        return jsonify({"error": str(e)}), 404
+    except generateur_emplois.GenerateurSature as e:
+        reponse = jsonify({"error": str(e)})
+        reponse.headers["Retry-After"] = "5"
+        return reponse, 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de la génération : {str(e)}"}), 500
+
+
+# 📋 Lister tout l'emploi du temps (?format=normalise : créneaux + tables de correspondance)
 @emploi_bp.route('/emplois', methods=['GET'])
 @jwt_required()
+@reponse_en_cache("emplois")
 def lister_emplois():
     try:
-        emplois = EmploiDuTemps.query.all()
-        return jsonify([emploi.to_dict() for emploi in emplois]), 200
+        return _reponse_liste(EmploiDuTemps.query)
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération : {str(e)}"}), 500
 
@@ -64,10 +268,47 @@ def lister_emplois():
 # 📘 Lister l'emploi du temps par classe
 @emploi_bp.route('/emplois/classe/<int:classe_id>', methods=['GET'])
 @jwt_required()
+@reponse_en_cache("emplois")
 def emploi_par_classe(classe_id):
     try:
-        emplois = EmploiDuTemps.query.filter_by(classe_id=classe_id).all()
-        return jsonify([e.to_dict() for e in emplois]), 200
+        return _reponse_liste(EmploiDuTemps.query.filter_by(classe_id=classe_id))
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération : {str(e)}"}), 500
+
+
+# 🗓 Grille hebdomadaire d'une classe
+@emploi_bp.route('/emplois/classe/<int:classe_id>/grille', methods=['GET'])
+@jwt_required()
+@reponse_en_cache("emplois")
+def grille_classe(classe_id):
+    try:
+        if not Classe.query.get(classe_id):
+            return jsonify({"error": "Classe introuvable"}), 404
+        return jsonify(_vue_grille(EmploiDuTemps.query.filter_by(classe_id=classe_id))), 200
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération : {str(e)}"}), 500
+
+
+# 👨‍🏫 Lister l'emploi du temps d'un enseignant
+@emploi_bp.route('/emplois/enseignant/<int:enseignant_id>', methods=['GET'])
+@jwt_required()
+@reponse_en_cache("emplois")
+def emploi_par_enseignant(enseignant_id):
+    try:
+        return _reponse_liste(EmploiDuTemps.query.filter_by(enseignant_id=enseignant_id))
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération : {str(e)}"}), 500
+
+
+# 🗓 Grille hebdomadaire d'un enseignant
+@emploi_bp.route('/emplois/enseignant/<int:enseignant_id>/grille', methods=['GET'])
+@jwt_required()
+@reponse_en_cache("emplois")
+def grille_enseignant(enseignant_id):
+    try:
+        if not Enseignant.query.get(enseignant_id):
+            return jsonify({"error": "Enseignant introuvable"}), 404
+        return jsonify(_vue_grille(EmploiDuTemps.query.filter_by(enseignant_id=enseignant_id))), 200
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération : {str(e)}"}), 500
 
@@ -89,18 +330,28 @@ def modifier_emploi(id):
         if 'classe_id' in data:
             if not Classe.query.get(data['classe_id']):
                 return jsonify({"error": "Classe introuvable"}), 404
-            emploi.classe_id = data['classe_id']
+            emploi.classe_id = int(data['classe_id'])
 
         if 'enseignant_id' in data:
             if not Enseignant.query.get(data['enseignant_id']):
                 return jsonify({"error": "Enseignant introuvable"}), 404
-            emploi.enseignant_id = data['enseignant_id']
+            emploi.enseignant_id = int(data['enseignant_id'])
 
         if 'matiere_id' in data:
             if not Matiere.query.get(data['matiere_id']):
                 return jsonify({"error": "Matière introuvable"}), 404
             emploi.matiere_id = data['matiere_id']
 
+        if emploi.heure_debut >= emploi.heure_fin:
+            db.session.rollback()
+            return jsonify({"error": "L'heure de début doit précéder l'heure de fin"}), 400
+
+        classe = db.session.get(Classe, emploi.classe_id)
+        conflits = index_creneaux.conflits_en_base(_creneau(emploi, classe.salle), ignorer={emploi.id})
+        if conflits:
+            db.session.rollback()
+            return _reponse_conflits(conflits)
+
         db.session.commit()
         return jsonify({"message": "Créneau mis à jour", "emploi": emploi.to_dict()}), 200
 
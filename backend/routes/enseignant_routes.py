@@ -5,6 +5,8 @@ from models.enseignant import Enseignant
 from models.utilisateur import Utilisateur
 from models.matiere import Matiere
 from models.enums import RoleUtilisateur
+from utils.serialisation import serialiser
+from services.cache_reponses import reponse_en_cache
 
 enseignant_bp = Blueprint('enseignant', __name__)
 
@@ -17,7 +19,6 @@ def ajouter_enseignant():
 
         # Champs utilisateur
         email = data.get('email')
-        mot_de_passe = 'test1234' #le mot de passe par defaut
 
         # Champs enseignant
         nom = data.get('nom')
@@ -44,7 +45,7 @@ def ajouter_enseignant():
             telephone=telephone,
             role=RoleUtilisateur.ENSEIGNANT
         )
-        utilisateur.set_password(mot_de_passe)
+        utilisateur.set_default_password("enseignant")  # mot de passe par défaut, haché à la première connexion
         db.session.add(utilisateur)
         db.session.flush()  # Pour obtenir l'ID avant le commit
 
@@ -141,10 +142,10 @@ def supprimer_enseignant(enseignant_id):
 # 📋 Lister tous les enseignants
 @enseignant_bp.route('/enseignants', methods=['GET'])
 @jwt_required()
+@reponse_en_cache("enseignants")
 def lister_enseignants():
     try:
-        enseignants = Enseignant.query.all()
-        return jsonify([ens.to_dict() for ens in enseignants]), 200
+        return jsonify(serialiser(Enseignant.query, "enseignant")), 200
     except Exception as e:
         return jsonify({'error': f'Erreur : {str(e)}'}), 500
 
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required
 from models.matiere import Matiere
 from database import db
 from sqlalchemy.exc import IntegrityError
+from services.cache_reponses import reponse_en_cache
 
 matiere_bp = Blueprint('matiere', __name__)
 
@@ -43,6 +44,7 @@ def ajouter_matiere():
 # 📄 Liste des matières
 @matiere_bp.route('/matieres', methods=['GET'])
 @jwt_required()
+@reponse_en_cache("matieres")
 def liste_matieres():
     try:
         matieres = Matiere.query.all()
@@ -1,10 +1,18 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+import math
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from models.note import Note
+from models.classe import Classe
 from models.eleve import Eleve
 from models.matiere import Matiere
 from models.enseignant import Enseignant
 from database import db
+from utils.serialisation import avec_relations
+from utils.pagination import paginer_par_curseur, parametres_curseur, CurseurInvalide
+from utils.streaming import streaming_demande, reponse_streamee
+from utils.upsert import inserer_ou_mettre_a_jour
 
 note_bp = Blueprint('note', __name__)
 
@@ -36,6 +44,106 @@ def ajouter_note():
         db.session.commit()
 
         return jsonify({"message": "Note ajoutée avec succès", "note": nouvelle_note.to_dict()}), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Une note existe déjà pour cet élève, cette matière, ce type et cette période"}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur : {str(e)}"}), 500
+
+# 📚 Saisie groupée des notes d'une classe pour une matière, un type et une période
+# Corps : {"classe_id", "matiere_id", "type", "periode", "enseignant_id"?,
+#          "notes": [{"eleve_id", "valeur"}, ...]}
+# Idempotent : une note existante pour (élève, matière, type, période) est mise à jour
+# (clé unique en base, upsert en une instruction) : un renvoi de la même saisie, même
+# concurrent (réseau instable), ne crée donc pas de doublon.
+# Pour plusieurs devoirs d'une même période, distinguer le type ("devoir 1", "devoir 2"...).
+@note_bp.route('/notes/batch', methods=['POST'])
+@jwt_required()
+def ajouter_notes_groupees():
+    try:
+        data = request.get_json()
+        classe_id = data.get('classe_id')
+        matiere_id = data.get('matiere_id')
+        type_note = data.get('type')
+        periode = data.get('periode')
+        enseignant_id = data.get('enseignant_id')
+        lignes = data.get('notes')
+
+        if not all([classe_id, matiere_id, type_note, periode]) or not isinstance(lignes, list) or not lignes:
+            return jsonify({"error": "Champs requis : classe_id, matiere_id, type, periode, notes (liste non vide)"}), 400
+
+        valeurs = {}
+        for ligne in lignes:
+            # eleve_id peut arriver en texte ("12") depuis un formulaire : normalisé en entier
+            try:
+                eleve_id = int(ligne.get('eleve_id'))
+                valeur = float(ligne.get('valeur'))
+            except (AttributeError, TypeError, ValueError):
+                eleve_id = valeur = None
+            # float() accepte "nan" et "inf"
+            if not eleve_id or valeur is None or not math.isfinite(valeur):
+                return jsonify({"error": "Ligne invalide : eleve_id entier et valeur numérique requis", "ligne": ligne}), 400
+            if eleve_id in valeurs:
+                return jsonify({"error": f"Élève {eleve_id} présent plusieurs fois dans la saisie"}), 400
+            valeurs[eleve_id] = valeur
+
+        if not db.session.get(Classe, classe_id):
+            return jsonify({"error": "Classe introuvable"}), 404
+        if not db.session.get(Matiere, matiere_id):
+            return jsonify({"error": "Matière introuvable"}), 404
+        if enseignant_id and not db.session.get(Enseignant, enseignant_id):
+            return jsonify({"error": "Enseignant introuvable"}), 404
+
+        # Appartenance à la classe : une seule requête
+        inscrits = {
+            eleve_id for (eleve_id,) in
+            db.session.query(Eleve.id).filter(Eleve.classe_id == classe_id, Eleve.id.in_(valeurs.keys()))
+        }
+        hors_classe = sorted(set(valeurs) - inscrits)
+        if hors_classe:
+            return jsonify({"error": "Élèves introuvables dans cette classe", "eleve_ids": hors_classe}), 400
+
+        # Notes déjà saisies : seulement pour distinguer créations et mises à jour dans la réponse
+        deja_saisis = set(db.session.scalars(
+            select(Note.eleve_id).where(
+                Note.eleve_id.in_(valeurs.keys()),
+                Note.matiere_id == matiere_id,
+                Note.type == type_note,
+                Note.periode == periode
+            )
+        ))
+
+        notes = Note.__table__
+        inserer_ou_mettre_a_jour(
+            db.session.connection(), notes,
+            [
+                {
+                    "valeur": valeur,
+                    "type": type_note,
+                    "periode": periode,
+                    "eleve_id": eleve_id,
+                    "matiere_id": matiere_id,
+                    "enseignant_id": enseignant_id
+                }
+                for eleve_id, valeur in valeurs.items()
+            ],
+            cles=("eleve_id", "matiere_id", "type", "periode"),
+            mise_a_jour=lambda proposee: {
+                "valeur": proposee.valeur,
+                # Sans enseignant_id dans la saisie, l'enseignant déjà enregistré est conservé
+                "enseignant_id": func.coalesce(proposee.enseignant_id, notes.c.enseignant_id),
+            }
+        )
+        db.session.commit()
+        creees = len(valeurs) - len(deja_saisis)
+
+        return jsonify({
+            "message": "Notes enregistrées",
+            "creees": creees,
+            "mises_a_jour": len(deja_saisis)
+        }), 201 if creees else 200
+
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Erreur : {str(e)}"}), 500
@@ -58,6 +166,9 @@ def modifier_note(id):
 
         db.session.commit()
         return jsonify({"message": "Note modifiée avec succès", "note": note.to_dict()}), 200
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Une note existe déjà pour cet élève, cette matière, ce type et cette période"}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Erreur : {str(e)}"}), 500
@@ -77,12 +188,26 @@ def supprimer_note(id):
         db.session.rollback()
         return jsonify({"error": f"Erreur : {str(e)}"}), 500
 
-# 📋 Liste des notes
+# 📋 Liste des notes (pagination par curseur : ?curseur=...&limite=...)
+# Export complet en streaming : ?stream=1 (tableau JSON) ou Accept: application/x-ndjson
 @note_bp.route('/notes', methods=['GET'])
 @jwt_required()
 def lister_notes():
-    notes = Note.query.all()
-    return jsonify([note.to_dict() for note in notes]), 200
+    try:
+        if streaming_demande():
+            return reponse_streamee(avec_relations(Note.query, "note").order_by(Note.id))
+
+        curseur, limite = parametres_curseur()
+        notes, next_cursor = paginer_par_curseur(
+            avec_relations(Note.query, "note"), Note.id, Note.id, curseur, limite
+        )
+        return jsonify({
+            "notes": [note.to_dict() for note in notes],
+            "next_cursor": next_cursor,
+            "limite": limite
+        }), 200
+    except CurseurInvalide as e:
+        return jsonify({"error": str(e)}), 400
 
 # 🔍 Détail d’une note
 @note_bp.route('/notes/<int:id>', methods=['GET'])
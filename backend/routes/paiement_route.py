@@ -4,11 +4,19 @@ from sqlalchemy.exc import SQLAlchemyError
 from database import db
 from models.paiement import Paiement
 from models.eleve import Eleve
+from utils.serialisation import avec_relations
+from utils.pagination import paginer_par_curseur, parametres_curseur, CurseurInvalide
+from utils.streaming import streaming_demande, reponse_streamee
+from services.recus import NumerotationIndisponible, allocateur_recus, numero_reserve
 from datetime import datetime
 
 paiement_bp = Blueprint('paiement', __name__)
 
+_RECU_RESERVE = "Numéro de reçu réservé à la numérotation automatique : laissez « recu » vide"
+
 # ➕ Ajouter un paiement
+# "recu" est facultatif : sans numéro fourni, le serveur attribue le suivant (REC-AAAA-000123).
+# Un numéro fourni ne peut pas avoir cette forme, réservée à la séquence du serveur.
 @paiement_bp.route('/paiements', methods=['POST'])
 @jwt_required()
 def ajouter_paiement():
@@ -21,13 +29,18 @@ def ajouter_paiement():
         statut = data.get('statut', 'réglé')
         recu = data.get('recu')
 
-        if not all([eleve_id, montant, periode, recu]):
-            return jsonify({"error": "Champs requis : eleve_id, montant, periode, recu"}), 400
+        if not all([eleve_id, montant, periode]):
+            return jsonify({"error": "Champs requis : eleve_id, montant, periode"}), 400
 
         eleve = Eleve.query.get(eleve_id)
         if not eleve:
             return jsonify({"error": "Élève introuvable"}), 404
 
+        if numero_reserve(recu):
+            return jsonify({"error": _RECU_RESERVE}), 400
+        if not recu:
+            recu = allocateur_recus.suivant()
+
         paiement = Paiement(
             eleve_id=eleve_id,
             montant=montant,
@@ -41,18 +54,38 @@ def ajouter_paiement():
 
         return jsonify({"message": "Paiement enregistré", "paiement": paiement.to_dict()}), 201
 
+    except NumerotationIndisponible as e:
+        db.session.rollback()
+        reponse = jsonify({"error": str(e)})
+        reponse.headers["Retry-After"] = "1"
+        return reponse, 503
     except SQLAlchemyError as e:
         db.session.rollback()
         return jsonify({"error": f"Erreur lors de l'ajout : {str(e)}"}), 500
 
 
-# 📋 Lister tous les paiements
+# 📋 Lister tous les paiements (pagination par curseur sur (date_paiement, id))
+# Export complet en streaming : ?stream=1 (tableau JSON) ou Accept: application/x-ndjson
 @paiement_bp.route('/paiements', methods=['GET'])
 @jwt_required()
 def lister_paiements():
     try:
-        paiements = Paiement.query.all()
-        return jsonify([p.to_dict() for p in paiements]), 200
+        if streaming_demande():
+            return reponse_streamee(
+                avec_relations(Paiement.query, "paiement").order_by(Paiement.date_paiement.desc(), Paiement.id.desc())
+            )
+
+        curseur, limite = parametres_curseur()
+        paiements, next_cursor = paginer_par_curseur(
+            avec_relations(Paiement.query, "paiement"), Paiement.date_paiement, Paiement.id, curseur, limite
+        )
+        return jsonify({
+            "paiements": [p.to_dict() for p in paiements],
+            "next_cursor": next_cursor,
+            "limite": limite
+        }), 200
+    except CurseurInvalide as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération : {str(e)}"}), 500
 
@@ -77,6 +110,9 @@ def modifier_paiement(id):
             return jsonify({"error": "Paiement non trouvé"}), 404
 
         data = request.get_json()
+        if data.get('recu', paiement.recu) != paiement.recu and numero_reserve(data['recu']):
+            return jsonify({"error": _RECU_RESERVE}), 400
+
         paiement.montant = data.get('montant', paiement.montant)
         paiement.periode = data.get('periode', paiement.periode)
         paiement.methode = data.get('methode', paiement.methode)
@@ -2,6 +2,9 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from models.utilisateur import Utilisateur
 from models.enums import RoleUtilisateur
+from models.eleve import Eleve
+from utils.serialisation import serialiser
+from utils.pagination import paginer_par_curseur, parametres_curseur, CurseurInvalide
 
 parent_bp = Blueprint('parent', __name__)
 
@@ -9,21 +12,36 @@ parent_bp = Blueprint('parent', __name__)
 @jwt_required()
 def lister_parents():
     try:
-        # Pagination optionnelle
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        query = Utilisateur.query.filter_by(role=RoleUtilisateur.PARENT)
 
-        pagination = Utilisateur.query.filter_by(role=RoleUtilisateur.PARENT).paginate(page=page, per_page=per_page, error_out=False)
-        parents = pagination.items
+        # Ancienne pagination par numéro de page (OFFSET), conservée si ?page= est fourni
+        if 'page' in request.args:
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 20, type=int)
+
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            parents = pagination.items
+
+            return jsonify({
+                "parents": [parent.to_dict() for parent in parents],
+                "total": pagination.total,
+                "pages": pagination.pages,
+                "page": pagination.page,
+                "per_page": pagination.per_page
+            }), 200
+
+        # Pagination par curseur (?curseur=...&limite=...)
+        curseur, limite = parametres_curseur()
+        parents, next_cursor = paginer_par_curseur(query, Utilisateur.id, Utilisateur.id, curseur, limite, descendant=False)
 
         return jsonify({
             "parents": [parent.to_dict() for parent in parents],
-            "total": pagination.total,
-            "pages": pagination.pages,
-            "page": pagination.page,
-            "per_page": pagination.per_page
+            "next_cursor": next_cursor,
+            "limite": limite
         }), 200
 
+    except CurseurInvalide as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération des parents : {str(e)}"}), 500
 
@@ -35,12 +53,12 @@ def get_enfants_du_parent(parent_id):
         if not parent:
             return jsonify({"error": "Parent non trouvé"}), 404
 
-        # .enfants est la liste des élèves liés à ce parent
-        enfants = parent.enfants
+        # Élèves liés à ce parent, relations préchargées
+        enfants = serialiser(Eleve.query.filter_by(parent_id=parent.id), "eleve")
 
         return jsonify({
             "parent": parent.to_dict(),
-            "enfants": [enfant.to_dict() for enfant in enfants]
+            "enfants": enfants
         }), 200
 
     except Exception as e:
@@ -0,0 +1,36 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from datetime import date, datetime
+from database import db
+from services.rapports import rapport_financier, synthese
+
+rapport_bp = Blueprint('rapport', __name__)
+
+
+# 💰 Rapport financier sur une plage de dates (bornes incluses)
+# ?date_debut=AAAA-MM-JJ (défaut : 1er janvier de l'année en cours) ?date_fin=AAAA-MM-JJ (défaut : aujourd'hui)
+# Recettes par mois, période, méthode et classe ; dépenses par type et par mois ; solde net
+@rapport_bp.route('/rapports/finances', methods=['GET'])
+@jwt_required()
+def rapport_finances():
+    try:
+        try:
+            aujourd_hui = date.today()
+            debut = request.args.get('date_debut')
+            fin = request.args.get('date_fin')
+            debut = datetime.strptime(debut, '%Y-%m-%d').date() if debut else aujourd_hui.replace(month=1, day=1)
+            fin = datetime.strptime(fin, '%Y-%m-%d').date() if fin else aujourd_hui
+        except ValueError:
+            return jsonify({"error": "Format de date incorrect (attendu: AAAA-MM-JJ)"}), 400
+        if debut > fin:
+            return jsonify({"error": "date_debut postérieure à date_fin"}), 400
+
+        return jsonify({
+            "date_debut": debut.isoformat(),
+            "date_fin": fin.isoformat(),
+            **synthese(rapport_financier(debut, fin))
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors du calcul du rapport : {str(e)}"}), 500
@@ -1,32 +1,62 @@
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required
 from database import db
-from models.eleve import Eleve
-from models.paiement import Paiement
-from sqlalchemy import func
+from models.enums import RoleUtilisateur
+from services.authentification import role_required
+from services.statistiques import lire_statistiques, recalculer_statistiques, TOTAL
 
 statistiques_bp = Blueprint('statistiques', __name__)
 
+
+def _compteur(stats, categorie, cle=TOTAL):
+    return stats.get(categorie, {}).get(cle, {"nombre": 0, "montant": 0})
+
+
+def _nombres(stats, categorie):
+    return {cle: valeur["nombre"] for cle, valeur in stats.get(categorie, {}).items() if valeur["nombre"]}
+
+
+def _montants(stats, categorie):
+    return {cle: valeur["montant"] for cle, valeur in stats.get(categorie, {}).items() if valeur["nombre"]}
+
+
+# 📊 Tableau de bord : lecture des compteurs pré-agrégés (une seule requête)
 @statistiques_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def statistiques():
     try:
-        total_eleves = Eleve.query.count()
-
-        # Filtrage par sexe commenté (à activer après ajout du champ 'sexe' dans Eleve)
-        # total_garcons = Eleve.query.filter(Eleve.sexe == 'M').count()
-        # total_filles = Eleve.query.filter(Eleve.sexe == 'F').count()
-
-        total_paiements = db.session.query(func.coalesce(func.sum(Paiement.montant), 0)).scalar()
-        paiements_en_retard = Paiement.query.filter(Paiement.est_paye == False).count()
+        stats = lire_statistiques()
+        en_attente = _compteur(stats, "paiements_en_attente")
 
         return jsonify({
-            "total_eleves": total_eleves,
-            # "total_garcons": total_garcons,
-            # "total_filles": total_filles,
-            "total_paiements": total_paiements,
-            "paiements_en_retard": paiements_en_retard
+            "total_eleves": _compteur(stats, "eleves")["nombre"],
+            "total_garcons": _compteur(stats, "eleves_sexe", "M")["nombre"],
+            "total_filles": _compteur(stats, "eleves_sexe", "F")["nombre"],
+            "total_paiements": _compteur(stats, "paiements")["montant"],
+            "paiements_en_retard": en_attente["nombre"],
+            "montant_en_retard": en_attente["montant"],
+            "total_depenses": _compteur(stats, "depenses")["montant"],
+            "eleves_par_classe": _nombres(stats, "eleves_classe"),
+            "eleves_par_niveau": _nombres(stats, "eleves_niveau"),
+            "paiements_par_periode": _montants(stats, "paiements_periode"),
+            "paiements_par_methode": _montants(stats, "paiements_methode"),
+            "paiements_par_statut": _montants(stats, "paiements_statut"),
+            "depenses_par_type": _montants(stats, "depenses_type"),
+            "depenses_par_mois": _montants(stats, "depenses_mois")
         })
 
     except Exception as e:
         return jsonify({"error": f"Erreur lors du calcul des statistiques : {str(e)}"}), 500
+
+
+# 🔁 Recalcul complet des compteurs (ADMIN uniquement)
+@statistiques_bp.route('/stats/recalculer', methods=['POST'])
+@role_required(RoleUtilisateur.ADMIN)
+def recalculer():
+    try:
+        recalculer_statistiques()
+        return jsonify({"message": "Statistiques recalculées"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors du recalcul des statistiques : {str(e)}"}), 500
@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+from database import statistiques_pools
+from models.enums import RoleUtilisateur
+from services.authentification import role_required
+
+systeme_bp = Blueprint('systeme', __name__)
+
+
+# 🩺 État des pools de connexions (ADMIN uniquement)
+@systeme_bp.route('/systeme/pools', methods=['GET'])
+@role_required(RoleUtilisateur.ADMIN)
+def etat_pools():
+    try:
+        return jsonify(statistiques_pools()), 200
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la lecture des pools : {str(e)}"}), 500
@@ -0,0 +1,177 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.tarif import Tarif
+from models.eleve import Eleve
+from models.enums import RoleUtilisateur
+from services.authentification import role_required
+from services import echeances
+
+tarif_bp = Blueprint('tarif', __name__)
+
+
+def _mois_valide(mois):
+    return echeances.normaliser_periode(mois) if mois else None
+
+
+# ➕ Ajouter des tarifs
+# Corps : {"niveau", "annee_scolaire", "montant", "mois": "2024-10" ou ["2024-10", "2024-11", ...], "libelle"?}
+# Les échéances des élèves du niveau sont créées / mises à jour dans la même transaction.
+@tarif_bp.route('/tarifs', methods=['POST'])
+@role_required(RoleUtilisateur.ADMIN, RoleUtilisateur.COMPTABLE)
+def ajouter_tarifs():
+    try:
+        data = request.get_json()
+        niveau = data.get('niveau')
+        annee_scolaire = data.get('annee_scolaire')
+        montant = data.get('montant')
+        liste_mois = data.get('mois')
+        liste_mois = liste_mois if isinstance(liste_mois, list) else [liste_mois]
+
+        if not all([niveau, annee_scolaire, montant is not None]) or not all(liste_mois):
+            return jsonify({"error": "Champs requis : niveau, annee_scolaire, montant, mois"}), 400
+
+        mois_normalises = [_mois_valide(m) for m in liste_mois]
+        if None in mois_normalises:
+            return jsonify({"error": "Mois invalide (attendu : AAAA-MM ou « Octobre 2024 »)"}), 400
+
+        tarifs = [
+            Tarif(niveau=niveau, annee_scolaire=annee_scolaire, mois=mois, montant=float(montant), libelle=data.get('libelle'))
+            for mois in sorted(set(mois_normalises))
+        ]
+        db.session.add_all(tarifs)
+        db.session.commit()
+
+        return jsonify({"message": "Tarifs enregistrés", "tarifs": [t.to_dict() for t in tarifs]}), 201
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Un tarif existe déjà pour ce niveau, cette année et ce mois"}), 409
+    except (TypeError, ValueError):
+        db.session.rollback()
+        return jsonify({"error": "Montant invalide"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de l'ajout des tarifs : {str(e)}"}), 500
+
+
+# 📋 Lister les tarifs (?niveau= ?annee_scolaire=)
+@tarif_bp.route('/tarifs', methods=['GET'])
+@jwt_required()
+def lister_tarifs():
+    try:
+        query = Tarif.query
+        if request.args.get('niveau'):
+            query = query.filter_by(niveau=request.args['niveau'])
+        if request.args.get('annee_scolaire'):
+            query = query.filter_by(annee_scolaire=request.args['annee_scolaire'])
+        tarifs = query.order_by(Tarif.annee_scolaire, Tarif.niveau, Tarif.mois).all()
+        return jsonify([t.to_dict() for t in tarifs]), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération des tarifs : {str(e)}"}), 500
+
+
+# 🔄 Modifier un tarif
+@tarif_bp.route('/tarifs/<int:id>', methods=['PUT'])
+@role_required(RoleUtilisateur.ADMIN, RoleUtilisateur.COMPTABLE)
+def modifier_tarif(id):
+    try:
+        tarif = db.session.get(Tarif, id)
+        if not tarif:
+            return jsonify({"error": "Tarif introuvable"}), 404
+
+        data = request.get_json()
+        if 'mois' in data:
+            mois = _mois_valide(data['mois'])
+            if not mois:
+                return jsonify({"error": "Mois invalide (attendu : AAAA-MM ou « Octobre 2024 »)"}), 400
+            tarif.mois = mois
+        tarif.niveau = data.get('niveau', tarif.niveau)
+        tarif.annee_scolaire = data.get('annee_scolaire', tarif.annee_scolaire)
+        tarif.montant = float(data.get('montant', tarif.montant))
+        tarif.libelle = data.get('libelle', tarif.libelle)
+
+        db.session.commit()
+        return jsonify({"message": "Tarif mis à jour", "tarif": tarif.to_dict()}), 200
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Un tarif existe déjà pour ce niveau, cette année et ce mois"}), 409
+    except (TypeError, ValueError):
+        db.session.rollback()
+        return jsonify({"error": "Montant invalide"}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de la modification du tarif : {str(e)}"}), 500
+
+
+# ❌ Supprimer un tarif
+@tarif_bp.route('/tarifs/<int:id>', methods=['DELETE'])
+@role_required(RoleUtilisateur.ADMIN, RoleUtilisateur.COMPTABLE)
+def supprimer_tarif(id):
+    try:
+        tarif = db.session.get(Tarif, id)
+        if not tarif:
+            return jsonify({"error": "Tarif introuvable"}), 404
+
+        db.session.delete(tarif)
+        db.session.commit()
+        return jsonify({"message": "Tarif supprimé"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de la suppression du tarif : {str(e)}"}), 500
+
+
+# 📒 Compte d'un élève : échéances mois par mois et solde cumulé
+@tarif_bp.route('/eleves/<int:eleve_id>/compte', methods=['GET'])
+@jwt_required()
+def compte_eleve(eleve_id):
+    try:
+        if not db.session.get(Eleve, eleve_id):
+            return jsonify({"error": "Élève introuvable"}), 404
+
+        lignes = echeances.compte_eleve(eleve_id)
+        return jsonify({
+            "eleve_id": eleve_id,
+            "echeances": lignes,
+            "solde": lignes[-1]["solde_cumule"] if lignes else 0
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de la récupération du compte : {str(e)}"}), 500
+
+
+# ⏰ Paiements en retard : élèves avec un solde dû sur les mois échus (?mois=AAAA-MM, ?classe_id=)
+@tarif_bp.route('/paiements/retards', methods=['GET'])
+@jwt_required()
+def paiements_en_retard():
+    try:
+        mois = request.args.get('mois')
+        if mois and not _mois_valide(mois):
+            return jsonify({"error": "Mois invalide (attendu : AAAA-MM)"}), 400
+
+        retards = echeances.impayes(_mois_valide(mois), request.args.get('classe_id', type=int))
+        return jsonify({
+            "mois": _mois_valide(mois) or echeances.mois_courant(),
+            "retards": retards,
+            "total_du": sum(r["montant_du"] for r in retards)
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors du calcul des retards : {str(e)}"}), 500
+
+
+# 🔁 Reconstruction des échéances (ADMIN uniquement)
+@tarif_bp.route('/echeances/recalculer', methods=['POST'])
+@role_required(RoleUtilisateur.ADMIN)
+def recalculer_echeances():
+    try:
+        echeances.recalculer_echeances()
+        return jsonify({"message": "Échéances recalculées"}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors du recalcul des échéances : {str(e)}"}), 500
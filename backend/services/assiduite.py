@@ -0,0 +1,310 @@
+"""
+Analyse de l'assiduité : taux d'absence et de retard, séries d'absences
+consécutives et alertes.
+
+Les taux par classe et par professeur sont lus dans la table
+presences_journalieres (un agrégat par date, classe et professeur), tenue à
+jour dans la même transaction que les présences par un écouteur after_flush ;
+les insertions groupées (appel d'une classe) appellent
+appliquer_presences() explicitement. Une requête sur un mois lit donc
+quelques centaines de lignes agrégées au lieu de toutes les présences.
+
+Les analyses par élève lisent la table brute via l'index (eleve_id, date).
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, distinct, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.classe import Classe
+from models.eleve import Eleve
+from models.enseignant import Enseignant
+from models.presence import Presence
+from models.presence_journaliere import PresenceJournaliere
+from utils.upsert import inserer_ou_mettre_a_jour
+
+CHAMPS_PRESENCE = ("date", "classe_id", "professeur_id", "statut", "justifiee")
+COMPTEURS = ("total", "presents", "absents", "absences_justifiees", "retards", "renvois")
+STATUT_ABSENT = "absent"
+
+journalier = PresenceJournaliere.__table__
+
+
+# ---------------------------------------------------------------------------
+# Maintenance de l'agrégat quotidien
+# ---------------------------------------------------------------------------
+
+def _vecteur(etat):
+    statut = etat["statut"]
+    return (
+        1,
+        int(statut == "present"),
+        int(statut == STATUT_ABSENT),
+        int(statut == STATUT_ABSENT and bool(etat["justifiee"])),
+        int(statut == "retard"),
+        int(statut == "renvoi"),
+    )
+
+
+def appliquer_presences(connexion, etats_signes):
+    """etats_signes : [(dict(date, classe_id, professeur_id, statut, justifiee), +1 ou -1)]."""
+    cumul = defaultdict(lambda: [0] * len(COMPTEURS))
+    for etat, signe in etats_signes:
+        cle = (etat["date"], int(etat["classe_id"]), int(etat["professeur_id"]))
+        for i, valeur in enumerate(_vecteur(etat)):
+            cumul[cle][i] += signe * valeur
+
+    lignes = [
+        {"date": jour, "classe_id": classe_id, "professeur_id": professeur_id, **dict(zip(COMPTEURS, valeurs))}
+        for (jour, classe_id, professeur_id), valeurs in cumul.items() if any(valeurs)
+    ]
+    if lignes:
+        # Upsert : deux premiers appels simultanés pour la même clé ne peuvent pas insérer deux fois
+        inserer_ou_mettre_a_jour(
+            connexion, journalier, lignes,
+            cles=("date", "classe_id", "professeur_id"),
+            mise_a_jour=lambda proposee: {nom: journalier.c[nom] + proposee[nom] for nom in COMPTEURS}
+        )
+
+
+def _etat_actuel(objet):
+    etat = {champ: getattr(objet, champ) for champ in CHAMPS_PRESENCE}
+    # default=date.today n'est appliqué qu'à l'INSERT : la valeur réelle est alors en base
+    if etat["date"] is None:
+        etat["date"] = date.today()
+    return etat
+
+
+def _etat_precedent(objet):
+    etat = inspect(objet)
+    valeurs = {}
+    for champ in CHAMPS_PRESENCE:
+        historique = etat.attrs[champ].history
+        valeurs[champ] = historique.deleted[0] if historique.deleted else getattr(objet, champ)
+    return valeurs
+
+
+@event.listens_for(Session, "after_flush")
+def _mettre_a_jour_agregat(session, flush_context):
+    etats = []
+    for objet in session.new:
+        if isinstance(objet, Presence):
+            etats.append((_etat_actuel(objet), 1))
+    for objet in session.deleted:
+        if isinstance(objet, Presence):
+            etats.append((_etat_precedent(objet), -1))
+    for objet in session.dirty:
+        if isinstance(objet, Presence):
+            etat = inspect(objet)
+            if any(etat.attrs[champ].history.has_changes() for champ in CHAMPS_PRESENCE):
+                etats.append((_etat_precedent(objet), -1))
+                etats.append((_etat_actuel(objet), 1))
+
+    if etats:
+        appliquer_presences(session.connection(), etats)
+
+
+def recalculer_agregat():
+    """Reconstruit presences_journalieres depuis la table presences (initialisation ou réparation)."""
+    session = db.session
+    session.execute(journalier.delete())
+    lignes = session.execute(
+        select(
+            Presence.date, Presence.classe_id, Presence.professeur_id,
+            func.count(Presence.id),
+            func.sum(case((Presence.statut == "present", 1), else_=0)),
+            func.sum(case((Presence.statut == STATUT_ABSENT, 1), else_=0)),
+            func.sum(case((and_(Presence.statut == STATUT_ABSENT, Presence.justifiee.is_(True)), 1), else_=0)),
+            func.sum(case((Presence.statut == "retard", 1), else_=0)),
+            func.sum(case((Presence.statut == "renvoi", 1), else_=0)),
+        ).group_by(Presence.date, Presence.classe_id, Presence.professeur_id)
+    ).all()
+    if lignes:
+        session.execute(journalier.insert(), [
+            {"date": jour, "classe_id": classe_id, "professeur_id": professeur_id, **dict(zip(COMPTEURS, valeurs))}
+            for jour, classe_id, professeur_id, *valeurs in lignes
+        ])
+    session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Lectures
+# ---------------------------------------------------------------------------
+
+def periode_par_defaut(date_debut=None, date_fin=None, jours=30):
+    date_fin = date_fin or date.today()
+    return date_debut or date_fin - timedelta(days=jours - 1), date_fin
+
+
+def _taux(valeurs):
+    """valeurs : dict des COMPTEURS sommés."""
+    total = valeurs["total"] or 0
+    absents = valeurs["absents"] or 0
+    justifiees = valeurs["absences_justifiees"] or 0
+
+    def ratio(n):
+        return round(n / total, 4) if total else 0.0
+
+    return {
+        **{nom: int(valeurs[nom] or 0) for nom in COMPTEURS},
+        "absences_non_justifiees": absents - justifiees,
+        "taux_absence": ratio(absents),
+        "taux_absence_non_justifiee": ratio(absents - justifiees),
+        "taux_retard": ratio(valeurs["retards"] or 0),
+    }
+
+
+def _sommes():
+    return [func.sum(journalier.c[nom]).label(nom) for nom in COMPTEURS]
+
+
+def taux_par_classe(date_debut, date_fin, classe_ids=None):
+    """Taux par classe sur la période, classes les moins assidues en premier."""
+    requete = (
+        select(Classe.id, Classe.nom, *_sommes())
+        .join(Classe, Classe.id == journalier.c.classe_id)
+        .where(journalier.c.date.between(date_debut, date_fin))
+        .group_by(Classe.id, Classe.nom)
+    )
+    if classe_ids:
+        requete = requete.where(journalier.c.classe_id.in_(classe_ids))
+
+    resultats = [
+        {"classe_id": ligne.id, "classe": ligne.nom, **_taux(ligne._mapping)}
+        for ligne in db.session.execute(requete)
+    ]
+    return sorted(resultats, key=lambda r: r["taux_absence"], reverse=True)
+
+
+def taux_par_enseignant(date_debut, date_fin, professeur_id=None):
+    requete = (
+        select(Enseignant.id, Enseignant.nom, Enseignant.prenom, *_sommes())
+        .join(Enseignant, Enseignant.id == journalier.c.professeur_id)
+        .where(journalier.c.date.between(date_debut, date_fin))
+        .group_by(Enseignant.id, Enseignant.nom, Enseignant.prenom)
+    )
+    if professeur_id:
+        requete = requete.where(journalier.c.professeur_id == professeur_id)
+
+    resultats = [
+        {"professeur_id": ligne.id, "nom": ligne.nom, "prenom": ligne.prenom, **_taux(ligne._mapping)}
+        for ligne in db.session.execute(requete)
+    ]
+    return sorted(resultats, key=lambda r: r["taux_absence"], reverse=True)
+
+
+def _sommes_brutes():
+    return [
+        func.count(Presence.id).label("total"),
+        func.sum(case((Presence.statut == "present", 1), else_=0)).label("presents"),
+        func.sum(case((Presence.statut == STATUT_ABSENT, 1), else_=0)).label("absents"),
+        func.sum(case((and_(Presence.statut == STATUT_ABSENT, Presence.justifiee.is_(True)), 1), else_=0)).label("absences_justifiees"),
+        func.sum(case((Presence.statut == "retard", 1), else_=0)).label("retards"),
+        func.sum(case((Presence.statut == "renvoi", 1), else_=0)).label("renvois"),
+    ]
+
+
+def taux_par_eleve(date_debut, date_fin, eleve_ids=None, classe_id=None):
+    """{eleve_id: taux} calculés sur la table brute (une requête groupée)."""
+    requete = (
+        select(Presence.eleve_id, *_sommes_brutes())
+        .where(Presence.date.between(date_debut, date_fin))
+        .group_by(Presence.eleve_id)
+    )
+    if eleve_ids:
+        requete = requete.where(Presence.eleve_id.in_(eleve_ids))
+    if classe_id:
+        requete = requete.where(Presence.classe_id == classe_id)
+    return {ligne.eleve_id: _taux(ligne._mapping) for ligne in db.session.execute(requete)}
+
+
+def series_absences(date_debut, date_fin, seuil=2, eleve_ids=None, classe_id=None):
+    """
+    Séries d'absences consécutives (dans l'ordre des jours d'appel de
+    l'élève) d'au moins `seuil` jours : îlots détectés en SQL par la
+    différence de deux ROW_NUMBER.
+
+    Plusieurs séances le même jour comptent pour un seul jour, absent si
+    l'élève a été noté absent à l'une d'elles.
+    """
+    conditions = [Presence.date.between(date_debut, date_fin)]
+    if eleve_ids:
+        conditions.append(Presence.eleve_id.in_(eleve_ids))
+    if classe_id:
+        conditions.append(Presence.classe_id == classe_id)
+
+    jours = (
+        select(
+            Presence.eleve_id,
+            Presence.date,
+            func.max(case((Presence.statut == STATUT_ABSENT, 1), else_=0)).label("absent"),
+        )
+        .where(*conditions)
+        .group_by(Presence.eleve_id, Presence.date)
+        .subquery()
+    )
+
+    sequence = select(
+        jours.c.eleve_id,
+        jours.c.date,
+        jours.c.absent,
+        (
+            func.row_number().over(partition_by=jours.c.eleve_id, order_by=jours.c.date)
+            - func.row_number().over(partition_by=(jours.c.eleve_id, jours.c.absent), order_by=jours.c.date)
+        ).label("ilot"),
+    ).subquery()
+
+    nombre_jours = func.count(distinct(sequence.c.date))
+    requete = (
+        select(
+            sequence.c.eleve_id,
+            func.min(sequence.c.date).label("debut"),
+            func.max(sequence.c.date).label("fin"),
+            nombre_jours.label("jours"),
+        )
+        .where(sequence.c.absent == 1)
+        .group_by(sequence.c.eleve_id, sequence.c.ilot)
+        .having(nombre_jours >= seuil)
+        .order_by(sequence.c.eleve_id, func.min(sequence.c.date))
+    )
+    return [
+        {"eleve_id": ligne.eleve_id, "debut": ligne.debut.isoformat(), "fin": ligne.fin.isoformat(), "jours": ligne.jours}
+        for ligne in db.session.execute(requete)
+    ]
+
+
+def alertes(date_debut, date_fin, seuil_jours=3, seuil_taux=0.2, classe_id=None):
+    """Élèves avec une série d'au moins `seuil_jours` absences ou un taux d'absence non justifiée ≥ `seuil_taux`."""
+    series = defaultdict(list)
+    for serie in series_absences(date_debut, date_fin, seuil_jours, classe_id=classe_id):
+        series[serie["eleve_id"]].append(serie)
+    taux = taux_par_eleve(date_debut, date_fin, classe_id=classe_id)
+
+    concernes = set(series) | {eleve_id for eleve_id, t in taux.items() if t["taux_absence_non_justifiee"] >= seuil_taux}
+    if not concernes:
+        return []
+
+    eleves = {
+        eleve.id: eleve for eleve in
+        db.session.query(Eleve.id, Eleve.nom, Eleve.prenom, Eleve.classe_id).filter(Eleve.id.in_(concernes))
+    }
+    resultats = []
+    for eleve_id in concernes:
+        eleve = eleves.get(eleve_id)
+        motifs = []
+        if series.get(eleve_id):
+            motifs.append("absences_consecutives")
+        if taux.get(eleve_id, {}).get("taux_absence_non_justifiee", 0) >= seuil_taux:
+            motifs.append("taux_absence")
+        resultats.append({
+            "eleve_id": eleve_id,
+            "nom": eleve.nom if eleve else None,
+            "prenom": eleve.prenom if eleve else None,
+            "classe_id": eleve.classe_id if eleve else None,
+            "motifs": motifs,
+            "series": series.get(eleve_id, []),
+            "taux": taux.get(eleve_id),
+        })
+    return sorted(resultats, key=lambda r: (-max((s["jours"] for s in r["series"]), default=0), r["eleve_id"]))
@@ -0,0 +1,360 @@
+"""
+Protection du chemin de connexion.
+
+- Limiteur à seaux de jetons par adresse IP et par compte (email), en mémoire
+  du processus par défaut ; AUTH_LIMITEUR_REDIS_URL permet de partager les
+  seaux entre workers (dépendance optionnelle `redis`). L'adresse IP est
+  celle du client seulement si PROXIES_DE_CONFIANCE est réglé derrière un
+  reverse proxy (app.py). Une école derrière un NAT partage une seule adresse :
+  le seau IP (60 tentatives, 2 par seconde par défaut, soit 120 connexions par
+  minute en régime établi) absorbe l'afflux du matin, la protection d'un
+  compte donné reste assurée par le seau par compte ; augmenter
+  AUTH_LIMITE_IP_CAPACITE / AUTH_LIMITE_IP_DEBIT pour un établissement plus grand.
+- Vérification des mots de passe dans un pool de threads borné : les
+  hachages lents (scrypt / pbkdf2 libèrent le GIL) ne peuvent pas occuper plus
+  de AUTH_HACHAGE_WORKERS cœurs, et au-delà de AUTH_HACHAGE_FILE demandes en
+  attente la connexion est refusée (503) au lieu d'affamer les autres routes.
+- Coût constant : un email inconnu déclenche quand même une vérification
+  contre un hachage factice, et un compte au mot de passe par défaut est
+  vérifié contre le hachage de ce mot de passe ; le temps de réponse ne
+  révèle ni l'existence des comptes ni ceux restés au mot de passe par défaut.
+- Métriques de latence des hachages.
+- Mots de passe par défaut : hachés à la première connexion (dans le même
+  pool borné) et provisoires ; exiger_changement_mot_de_passe (before_request)
+  n'ouvre que le changement de mot de passe à ces comptes.
+- Autorisation par rôle à partir des claims du JWT (@role_required), avec un
+  petit cache à durée de vie (AUTH_CACHE_ROLES_TTL) pour détecter les
+  changements de rôle et les suppressions de comptes sans requête par appel.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import wraps
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required, verify_jwt_in_request
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from werkzeug.security import generate_password_hash
+
+from database import db
+from models.enums import RoleUtilisateur
+from models.utilisateur import MOTS_DE_PASSE_PAR_DEFAUT, Utilisateur, hachage_par_defaut, verifier_mot_de_passe
+
+
+def _env_float(nom, defaut):
+    return float(os.getenv(nom, defaut))
+
+
+# ---------------------------------------------------------------------------
+# Seaux de jetons
+# ---------------------------------------------------------------------------
+
+class StockageMemoire:
+    """Seaux de jetons dans la mémoire du processus."""
+
+    def __init__(self, max_cles=100_000):
+        self._seaux = {}   # cle -> (jetons, horodatage)
+        self._verrou = threading.Lock()
+        self._max_cles = max_cles
+
+    def prendre(self, cle, capacite, debit, maintenant):
+        """Consomme un jeton si possible. Retourne (autorise, secondes_avant_prochain_jeton)."""
+        with self._verrou:
+            jetons, dernier = self._seaux.get(cle, (capacite, maintenant))
+            jetons = min(capacite, jetons + (maintenant - dernier) * debit)
+            if jetons >= 1:
+                self._seaux[cle] = (jetons - 1, maintenant)
+                autorise, attente = True, 0.0
+            else:
+                self._seaux[cle] = (jetons, maintenant)
+                autorise, attente = False, (1 - jetons) / debit
+            if len(self._seaux) > self._max_cles:
+                self._purger(capacite, debit, maintenant)
+            return autorise, attente
+
+    def _purger(self, capacite, debit, maintenant):
+        # Un seau redevenu plein équivaut à un seau absent
+        pleins = [c for c, (j, t) in self._seaux.items() if j + (maintenant - t) * debit >= capacite]
+        for cle in pleins:
+            del self._seaux[cle]
+
+
+class StockageRedis:
+    """Seaux partagés entre workers (script Lua atomique)."""
+
+    SCRIPT = """
+local etat = redis.call('HMGET', KEYS[1], 'jetons', 'horodatage')
+local capacite, debit, maintenant = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local jetons = tonumber(etat[1]) or capacite
+local dernier = tonumber(etat[2]) or maintenant
+jetons = math.min(capacite, jetons + (maintenant - dernier) * debit)
+local autorise = 0
+if jetons >= 1 then jetons = jetons - 1 autorise = 1 end
+redis.call('HSET', KEYS[1], 'jetons', jetons, 'horodatage', maintenant)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacite / debit) + 1)
+return {autorise, tostring(jetons)}
+"""
+
+    def __init__(self, url):
+        import redis  # dépendance optionnelle
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def prendre(self, cle, capacite, debit, maintenant):
+        autorise, jetons = self._script(keys=[f"limiteur:{cle}"], args=[capacite, debit, maintenant])
+        if autorise:
+            return True, 0.0
+        return False, (1 - float(jetons)) / debit
+
+
+def _stockage_par_defaut():
+    url = os.getenv("AUTH_LIMITEUR_REDIS_URL")
+    return StockageRedis(url) if url else StockageMemoire()
+
+
+class LimiteurJetons:
+    def __init__(self, nom, capacite, debit, stockage):
+        self.nom = nom
+        self.capacite = capacite
+        self.debit = debit   # jetons rechargés par seconde
+        self.stockage = stockage
+
+    def autoriser(self, cle):
+        return self.stockage.prendre(f"{self.nom}:{cle}", self.capacite, self.debit, time.time())
+
+
+# ---------------------------------------------------------------------------
+# Pool borné de vérification des mots de passe
+# ---------------------------------------------------------------------------
+
+class ServiceSature(Exception):
+    pass
+
+
+class Metriques:
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.verifications = 0
+        self.duree_totale = 0.0
+        self.duree_max = 0.0
+        self.refus_limite_ip = 0
+        self.refus_limite_compte = 0
+        self.refus_sature = 0
+
+    def enregistrer_hachage(self, duree):
+        with self._verrou:
+            self.verifications += 1
+            self.duree_totale += duree
+            self.duree_max = max(self.duree_max, duree)
+
+    def incrementer(self, compteur):
+        with self._verrou:
+            setattr(self, compteur, getattr(self, compteur) + 1)
+
+    def to_dict(self):
+        with self._verrou:
+            return {
+                "verifications": self.verifications,
+                "hachage_ms_moyen": round(self.duree_totale / self.verifications * 1000, 2) if self.verifications else 0,
+                "hachage_ms_max": round(self.duree_max * 1000, 2),
+                "refus_limite_ip": self.refus_limite_ip,
+                "refus_limite_compte": self.refus_limite_compte,
+                "refus_sature": self.refus_sature,
+                "en_attente": verificateur.en_attente,
+            }
+
+
+class VerificateurMotsDePasse:
+    def __init__(self, workers, file_max, delai):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hachage")
+        self._places = threading.BoundedSemaphore(workers + file_max)
+        self._capacite = workers + file_max
+        self._delai = delai
+        # Hachage de référence pour les emails inconnus (même algorithme, même coût)
+        self._hachage_factice = generate_password_hash("compte-inexistant")
+        # Hachages des mots de passe par défaut : calculés ici plutôt qu'à la première connexion
+        for profil in MOTS_DE_PASSE_PAR_DEFAUT:
+            hachage_par_defaut(profil)
+
+    @property
+    def en_attente(self):
+        return self._capacite - self._places._value
+
+    def _mesurer(self, fonction, *args):
+        debut = time.perf_counter()
+        try:
+            return fonction(*args)
+        finally:
+            metriques.enregistrer_hachage(time.perf_counter() - debut)
+            self._places.release()
+
+    def _executer(self, fonction, *args):
+        """Exécute un hachage dans le pool ; lève ServiceSature si trop de hachages sont en cours."""
+        if not self._places.acquire(blocking=False):
+            metriques.incrementer("refus_sature")
+            raise ServiceSature("Trop de connexions simultanées, réessayez dans un instant")
+        try:
+            future = self._pool.submit(self._mesurer, fonction, *args)
+        except Exception:
+            self._places.release()
+            raise
+        try:
+            return future.result(timeout=self._delai)
+        except FutureTimeout:
+            metriques.incrementer("refus_sature")
+            raise ServiceSature("Vérification du mot de passe trop lente, réessayez dans un instant")
+
+    def verifier(self, mot_de_passe_stocke, mot_de_passe):
+        stocke = mot_de_passe_stocke if mot_de_passe_stocke is not None else self._hachage_factice
+        return self._executer(verifier_mot_de_passe, stocke, mot_de_passe) and mot_de_passe_stocke is not None
+
+    def hacher(self, mot_de_passe):
+        """Hachage différé d'un mot de passe par défaut, borné comme les vérifications."""
+        return self._executer(generate_password_hash, mot_de_passe)
+
+
+stockage = _stockage_par_defaut()
+limiteur_ip = LimiteurJetons(
+    "ip", _env_float("AUTH_LIMITE_IP_CAPACITE", 60), _env_float("AUTH_LIMITE_IP_DEBIT", 2), stockage
+)
+limiteur_compte = LimiteurJetons(
+    "compte", _env_float("AUTH_LIMITE_COMPTE_CAPACITE", 5), _env_float("AUTH_LIMITE_COMPTE_DEBIT", 1 / 60), stockage
+)
+metriques = Metriques()
+verificateur = VerificateurMotsDePasse(
+    workers=int(os.getenv("AUTH_HACHAGE_WORKERS", 4)),
+    file_max=int(os.getenv("AUTH_HACHAGE_FILE", 32)),
+    delai=_env_float("AUTH_HACHAGE_TIMEOUT", 10),
+)
+
+
+# ---------------------------------------------------------------------------
+# Autorisation par claims
+# ---------------------------------------------------------------------------
+
+def claims_utilisateur(utilisateur):
+    """Claims additionnels embarqués dans le jeton émis à la connexion."""
+    return {
+        "role": utilisateur.role.value,
+        "email": utilisateur.email,
+        "nom": utilisateur.nom,
+        "prenom": utilisateur.prenom,
+        "telephone": utilisateur.telephone,
+        "mot_de_passe_par_defaut": utilisateur.a_mot_de_passe_par_defaut,
+    }
+
+
+# Seules routes accessibles avec un mot de passe provisoire
+ENDPOINTS_MOT_DE_PASSE_PROVISOIRE = {
+    "auth.login", "auth.refresh", "auth.logout", "auth.utilisateur_actuel", "auth.changer_son_mot_de_passe",
+}
+
+
+def exiger_changement_mot_de_passe():
+    """before_request : tant que le mot de passe par défaut n'est pas changé, tout le reste est refusé."""
+    if request.method == "OPTIONS" or request.endpoint in ENDPOINTS_MOT_DE_PASSE_PROVISOIRE:
+        return None
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return None   # jeton invalide ou expiré : la route applique ses propres règles
+    if get_jwt().get("mot_de_passe_par_defaut"):
+        return jsonify({
+            "error": "Mot de passe provisoire : changez-le via PUT /api/auth/utilisateurs/motdepasse"
+        }), 403
+    return None
+
+
+def utilisateur_depuis_claims():
+    """Équivalent de Utilisateur.to_dict() reconstruit depuis le jeton courant."""
+    claims = get_jwt()
+    return {
+        "id": int(get_jwt_identity()),
+        **{cle: claims.get(cle) for cle in (
+            "email", "nom", "prenom", "telephone", "role", "mot_de_passe_par_defaut"
+        )},
+    }
+
+
+class CacheRoles:
+    """Rôle courant par utilisateur (None si supprimé), relu au plus toutes les `ttl` secondes."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._roles = {}   # utilisateur_id -> (role, expiration)
+        self._verrou = threading.Lock()
+
+    def role(self, utilisateur_id):
+        maintenant = time.monotonic()
+        entree = self._roles.get(utilisateur_id)
+        if entree and entree[1] > maintenant:
+            return entree[0]
+
+        # Toujours sur la base principale : une réplique en retard refuserait un rôle tout juste modifié
+        role = db.session.execute(
+            select(Utilisateur.role).where(Utilisateur.id == utilisateur_id),
+            bind_arguments={"bind": db.engine}
+        ).scalar()
+        role = role.value if role else None
+        with self._verrou:
+            self._roles[utilisateur_id] = (role, maintenant + self.ttl)
+        return role
+
+    def invalider(self, utilisateur_ids=None):
+        with self._verrou:
+            if utilisateur_ids is None:
+                self._roles.clear()
+            for utilisateur_id in utilisateur_ids or ():
+                self._roles.pop(utilisateur_id, None)
+
+
+cache_roles = CacheRoles(_env_float("AUTH_CACHE_ROLES_TTL", 60))
+
+
+def role_required(*roles):
+    """Restreint une route aux rôles donnés, sans recharger l'utilisateur à chaque appel."""
+    autorises = {r.value if isinstance(r, RoleUtilisateur) else r for r in roles}
+
+    def decorateur(fonction):
+        @wraps(fonction)
+        @jwt_required()
+        def enveloppe(*args, **kwargs):
+            role = get_jwt().get("role")
+            if role is None:
+                return jsonify({"error": "Jeton obsolète, veuillez vous reconnecter"}), 401
+            if role not in autorises:
+                return jsonify({"error": "Accès refusé pour ce rôle"}), 403
+            # Rôle modifié ou compte supprimé depuis l'émission du jeton
+            if cache_roles.role(int(get_jwt_identity())) != role:
+                return jsonify({"error": "Droits modifiés, veuillez vous reconnecter"}), 401
+            return fonction(*args, **kwargs)
+
+        return enveloppe
+
+    return decorateur
+
+
+@event.listens_for(Session, "after_flush")
+def _noter_roles_modifies(session, contexte):
+    modifies = session.info.setdefault("roles_modifies", set())
+    for obj in session.dirty:
+        if isinstance(obj, Utilisateur) and db.inspect(obj).attrs.role.history.has_changes():
+            modifies.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Utilisateur):
+            modifies.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalider_roles(session):
+    modifies = session.info.pop("roles_modifies", None)
+    if modifies:
+        cache_roles.invalider(modifies)
+
+
+@event.listens_for(Session, "after_rollback")
+def _oublier_roles(session):
+    session.info.pop("roles_modifies", None)
@@ -0,0 +1,129 @@
+"""
+Calcul des bulletins d'une classe pour une période, entièrement en SQL :
+moyennes par matière (GROUP BY), moyenne générale, rangs et moyennes de
+classe (fonctions de fenêtre) en une seule requête pour toute la classe.
+"""
+from sqlalchemy import func, select
+
+from database import db
+from models.eleve import Eleve
+from models.matiere import Matiere
+from models.note import Note
+
+
+def _arrondi(valeur):
+    return round(float(valeur), 2) if valeur is not None else None
+
+
+def requete_bulletins(classe_id, periode):
+    # 1. Moyenne de chaque élève dans chaque matière
+    par_matiere = (
+        select(
+            Note.eleve_id,
+            Note.matiere_id,
+            func.avg(Note.valeur).label("moyenne"),
+            func.count(Note.id).label("nombre_notes"),
+        )
+        .join(Eleve, Eleve.id == Note.eleve_id)
+        .where(Eleve.classe_id == classe_id, Note.periode == periode)
+        .group_by(Note.eleve_id, Note.matiere_id)
+        .subquery("par_matiere")
+    )
+
+    # 2. Rang et statistiques de classe par matière
+    fenetre_matiere = dict(partition_by=par_matiere.c.matiere_id)
+    matieres = select(
+        par_matiere,
+        func.rank().over(order_by=par_matiere.c.moyenne.desc(), **fenetre_matiere).label("rang_matiere"),
+        func.avg(par_matiere.c.moyenne).over(**fenetre_matiere).label("moyenne_classe_matiere"),
+        func.min(par_matiere.c.moyenne).over(**fenetre_matiere).label("min_matiere"),
+        func.max(par_matiere.c.moyenne).over(**fenetre_matiere).label("max_matiere"),
+    ).subquery("matieres")
+
+    # 3. Moyenne générale (moyenne des moyennes par matière), rang et moyenne de classe
+    moyenne_generale = func.avg(par_matiere.c.moyenne)
+    generale = (
+        select(
+            par_matiere.c.eleve_id,
+            moyenne_generale.label("moyenne_generale"),
+            func.rank().over(order_by=moyenne_generale.desc()).label("rang"),
+            func.avg(moyenne_generale).over().label("moyenne_classe"),
+        )
+        .group_by(par_matiere.c.eleve_id)
+        .subquery("generale")
+    )
+
+    return (
+        select(
+            matieres.c.eleve_id,
+            matieres.c.matiere_id,
+            Matiere.nom.label("matiere"),
+            matieres.c.moyenne,
+            matieres.c.nombre_notes,
+            matieres.c.rang_matiere,
+            matieres.c.moyenne_classe_matiere,
+            matieres.c.min_matiere,
+            matieres.c.max_matiere,
+            generale.c.moyenne_generale,
+            generale.c.rang,
+            generale.c.moyenne_classe,
+        )
+        .join(generale, generale.c.eleve_id == matieres.c.eleve_id)
+        .join(Matiere, Matiere.id == matieres.c.matiere_id)
+        .order_by(generale.c.rang, matieres.c.eleve_id, Matiere.nom)
+    )
+
+
+def calculer_bulletins(classe, periode, eleve_id=None):
+    """Bulletins de toute la classe (ou d'un élève, rangs calculés sur la classe)."""
+    eleves = {
+        eleve.id: eleve for eleve in
+        db.session.query(Eleve.id, Eleve.nom, Eleve.prenom, Eleve.matricule).filter(Eleve.classe_id == classe.id)
+    }
+
+    bulletins = {}
+    moyennes_matieres = {}
+    moyenne_classe = None
+
+    for ligne in db.session.execute(requete_bulletins(classe.id, periode)):
+        moyenne_classe = ligne.moyenne_classe
+        moyennes_matieres[ligne.matiere_id] = {
+            "matiere_id": ligne.matiere_id,
+            "matiere": ligne.matiere,
+            "moyenne_classe": _arrondi(ligne.moyenne_classe_matiere),
+            "moyenne_min": _arrondi(ligne.min_matiere),
+            "moyenne_max": _arrondi(ligne.max_matiere),
+        }
+        bulletin = bulletins.setdefault(ligne.eleve_id, {
+            "moyenne_generale": _arrondi(ligne.moyenne_generale),
+            "rang": ligne.rang,
+            "matieres": [],
+        })
+        bulletin["matieres"].append({
+            "matiere_id": ligne.matiere_id,
+            "matiere": ligne.matiere,
+            "moyenne": _arrondi(ligne.moyenne),
+            "nombre_notes": ligne.nombre_notes,
+            "rang": ligne.rang_matiere,
+            "moyenne_classe": _arrondi(ligne.moyenne_classe_matiere),
+        })
+
+    resultat = []
+    for identifiant, eleve in eleves.items():
+        if eleve_id and identifiant != eleve_id:
+            continue
+        bulletin = bulletins.get(identifiant, {"moyenne_generale": None, "rang": None, "matieres": []})
+        resultat.append({
+            "eleve": {"id": eleve.id, "nom": eleve.nom, "prenom": eleve.prenom, "matricule": eleve.matricule},
+            **bulletin,
+        })
+    resultat.sort(key=lambda b: (b["rang"] is None, b["rang"] or 0, b["eleve"]["nom"], b["eleve"]["prenom"]))
+
+    return {
+        "classe": {"id": classe.id, "nom": classe.nom, "niveau": classe.niveau, "annee_scolaire": classe.annee_scolaire},
+        "periode": periode,
+        "effectif": len(eleves),
+        "moyenne_classe": _arrondi(moyenne_classe),
+        "moyennes_matieres": sorted(moyennes_matieres.values(), key=lambda m: m["matiere"]),
+        "bulletins": resultat,
+    }
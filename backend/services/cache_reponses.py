@@ -0,0 +1,149 @@
+"""
+Cache des réponses GET des données de référence (classes, matières,
+enseignants, emplois du temps) avec ETag fort et réponses 304.
+
+Chaque domaine a un numéro de génération, incrémenté après chaque commit qui
+touche un des modèles dont dépend sa sérialisation. Une réponse en cache
+n'est resservie que si elle a été produite à la génération courante.
+L'ETag est l'empreinte SHA-256 du corps : un client qui renvoie
+If-None-Match reçoit 304 tant que le contenu n'a pas changé, même après
+recalcul.
+
+Les générations sont propres au processus : les commits faits par d'autres
+workers sont pris en compte au plus tard après CACHE_REFERENCES_TTL secondes
+(30 par défaut), durée de vie maximale d'une entrée.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, g, make_response, request
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models.classe import Classe
+from models.emploi_du_temps import EmploiDuTemps
+from models.enseignant import Enseignant
+from models.enums import RoleUtilisateur
+from models.matiere import Matiere
+from models.utilisateur import Utilisateur
+
+TTL_CACHE = float(os.getenv("CACHE_REFERENCES_TTL", "30"))
+TAILLE_MAX = int(os.getenv("CACHE_REFERENCES_TAILLE", "256"))
+CLE_SESSION = "domaines_modifies"
+
+# Modèle -> domaines dont la réponse sérialisée l'inclut
+DEPENDANCES = {
+    Matiere: ("matieres", "enseignants", "classes", "emplois"),
+    Enseignant: ("enseignants", "classes", "emplois"),
+    Utilisateur: ("enseignants", "classes", "emplois"),  # via Enseignant.utilisateur
+    Classe: ("classes", "emplois"),
+    EmploiDuTemps: ("emplois",),
+}
+
+
+class CacheReponses:
+    def __init__(self, ttl, taille_max):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._generations = {}
+        self._entrees = OrderedDict()   # (domaine, chemin) -> (generation, etag, corps, mimetype, horodatage)
+        self._verrou = threading.Lock()
+
+    def generation(self, domaine):
+        return self._generations.get(domaine, 0)
+
+    def invalider(self, domaines):
+        with self._verrou:
+            for domaine in domaines:
+                self._generations[domaine] = self.generation(domaine) + 1
+
+    def lire(self, cle, generation):
+        entree = self._entrees.get(cle)
+        if not entree or entree[0] != generation or time.monotonic() - entree[4] > self.ttl:
+            return None
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+        return entree
+
+    def ecrire(self, cle, entree):
+        with self._verrou:
+            self._entrees[cle] = entree
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+
+cache_reponses = CacheReponses(TTL_CACHE, TAILLE_MAX)
+
+
+def _reponse(entree, statut=200):
+    _, etag, corps, mimetype, _ = entree
+    reponse = Response(b"" if statut == 304 else corps, status=statut, mimetype=mimetype)
+    reponse.set_etag(etag)
+    # Le client peut garder la réponse mais doit la revalider (If-None-Match) à chaque usage
+    reponse.headers["Cache-Control"] = "private, no-cache"
+    return reponse
+
+
+def reponse_en_cache(domaine):
+    """Met en cache la réponse 200 d'un endpoint GET du domaine et gère If-None-Match."""
+    def decorateur(fonction):
+        @wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            cle = (domaine, request.full_path)
+            generation = cache_reponses.generation(domaine)
+            entree = cache_reponses.lire(cle, generation)
+
+            if entree is None:
+                # Recalcul sur la base principale : une réplique en retard
+                # mettrait en cache un contenu antérieur à la génération courante
+                g.lecture_primaire = True
+                reponse = make_response(fonction(*args, **kwargs))
+                if reponse.status_code != 200 or reponse.is_streamed:
+                    return reponse
+                corps = reponse.get_data()
+                entree = (generation, hashlib.sha256(corps).hexdigest(), corps, reponse.mimetype, time.monotonic())
+                cache_reponses.ecrire(cle, entree)
+
+            if request.if_none_match.contains(entree[1]):
+                return _reponse(entree, 304)
+            return _reponse(entree)
+
+        return enveloppe
+
+    return decorateur
+
+
+def _domaines_touches(objet):
+    domaines = DEPENDANCES.get(type(objet), ())
+    if isinstance(objet, Utilisateur) and domaines:
+        # Seuls les comptes enseignants apparaissent dans les réponses en cache
+        historique = inspect(objet).attrs.role.history
+        roles = set(historique.added or ()) | set(historique.deleted or ()) | {objet.role}
+        if RoleUtilisateur.ENSEIGNANT not in roles:
+            return ()
+    return domaines
+
+
+@event.listens_for(Session, "after_flush")
+def _noter_domaines(session, flush_context):
+    domaines = session.info.setdefault(CLE_SESSION, set())
+    for objet in list(session.new) + list(session.dirty) + list(session.deleted):
+        domaines.update(_domaines_touches(objet))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalider_apres_commit(session):
+    domaines = session.info.pop(CLE_SESSION, None)
+    if domaines:
+        cache_reponses.invalider(domaines)
+
+
+@event.listens_for(Session, "after_rollback")
+def _oublier_apres_rollback(session):
+    session.info.pop(CLE_SESSION, None)
@@ -0,0 +1,200 @@
+"""
+Détection de conflits d'emploi du temps.
+
+Index en mémoire : pour chaque (jour, ressource) — ressource = classe,
+enseignant ou salle (Classe.salle) — la liste triée des créneaux occupés.
+La vérification d'un créneau est une recherche dichotomique dans trois
+petites listes, sans requête SQL.
+
+Synchronisation : l'index est invalidé après chaque commit qui touche
+EmploiDuTemps ou Classe dans ce processus, et rechargé (une requête) au
+prochain usage. Les modifications faites par d'autres workers sont prises en
+compte au plus tard après EMPLOIS_INDEX_TTL secondes (30 par défaut).
+
+L'index suffit pour vérifier une proposition (/emplois/verifier). Avant
+d'enregistrer un créneau, conflits_en_base() fait foi : une requête SQL de
+chevauchement (index classe / enseignant), qui voit les créneaux écrits par
+les autres workers ; l'index est invalidé s'il n'a pas trouvé la même chose.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.classe import Classe
+from models.emploi_du_temps import EmploiDuTemps
+
+TTL_INDEX = float(os.getenv("EMPLOIS_INDEX_TTL", "30"))
+CLE_SESSION = "emplois_modifies"
+
+
+def normaliser_jour(jour):
+    return (jour or "").strip().lower()
+
+
+def ressources(creneau):
+    """Ressources occupées par un créneau : classe, enseignant et salle."""
+    resultat = [("classe", creneau["classe_id"]), ("enseignant", creneau["enseignant_id"])]
+    if creneau.get("salle"):
+        resultat.append(("salle", creneau["salle"].strip().lower()))
+    return resultat
+
+
+class IndexCreneaux:
+    def __init__(self):
+        self._intervalles = {}   # (jour, type, id) -> [(debut, fin, emploi_id), ...] triée
+        self._charge_a = None
+        self._verrou = threading.Lock()
+
+    def invalider(self):
+        with self._verrou:
+            self._charge_a = None
+
+    def ajouter(self, creneau, identifiant):
+        jour = normaliser_jour(creneau["jour"])
+        for type_ressource, valeur in ressources(creneau):
+            insort(
+                self._intervalles.setdefault((jour, type_ressource, valeur), []),
+                (creneau["heure_debut"], creneau["heure_fin"], identifiant)
+            )
+
+    def _charger(self):
+        lignes = db.session.query(
+            EmploiDuTemps.id, EmploiDuTemps.jour, EmploiDuTemps.heure_debut, EmploiDuTemps.heure_fin,
+            EmploiDuTemps.classe_id, EmploiDuTemps.enseignant_id, Classe.salle
+        ).join(Classe, Classe.id == EmploiDuTemps.classe_id)
+
+        self._intervalles = {}
+        for ligne in lignes:
+            self.ajouter(ligne._asdict(), ligne.id)
+        self._charge_a = time.monotonic()
+
+    def _a_jour(self):
+        with self._verrou:
+            if self._charge_a is None or time.monotonic() - self._charge_a > TTL_INDEX:
+                self._charger()
+
+    def conflits(self, creneau, ignorer=(), recharger=True):
+        """
+        Créneaux existants qui chevauchent `creneau` sur la même ressource le même jour.
+        `ignorer` : identifiants à ne pas considérer (ex. le créneau que l'on déplace).
+        """
+        if recharger:
+            self._a_jour()
+
+        debut, fin = creneau["heure_debut"], creneau["heure_fin"]
+        jour = normaliser_jour(creneau["jour"])
+        trouves = []
+        for type_ressource, valeur in ressources(creneau):
+            occupes = self._intervalles.get((jour, type_ressource, valeur), [])
+            # Candidats : créneaux qui commencent avant la fin du nouveau créneau
+            for debut_occupe, fin_occupe, identifiant in occupes[:bisect_left(occupes, (fin,))]:
+                if fin_occupe > debut and identifiant not in ignorer:
+                    trouves.append({
+                        "ressource": type_ressource,
+                        "valeur": valeur,
+                        "avec": identifiant,
+                        "heure_debut": debut_occupe.strftime("%H:%M"),
+                        "heure_fin": fin_occupe.strftime("%H:%M"),
+                    })
+        return trouves
+
+    def conflits_en_base(self, creneau, ignorer=()):
+        """
+        Comme conflits(), mais lu en base (une requête) : à utiliser avant un commit.
+        Recharge l'index au prochain usage s'il divergeait de la base.
+        """
+        debut, fin = creneau["heure_debut"], creneau["heure_fin"]
+        proposees = ressources(creneau)
+        salle = dict(proposees).get("salle")
+
+        occupe_par = [EmploiDuTemps.classe_id == creneau["classe_id"],
+                      EmploiDuTemps.enseignant_id == creneau["enseignant_id"]]
+        if salle:
+            occupe_par.append(EmploiDuTemps.classe_id.in_(
+                select(Classe.id).where(func.lower(func.trim(Classe.salle)) == salle)
+            ))
+        requete = (
+            select(EmploiDuTemps.id, EmploiDuTemps.heure_debut, EmploiDuTemps.heure_fin,
+                   EmploiDuTemps.classe_id, EmploiDuTemps.enseignant_id, Classe.salle)
+            .join(Classe, Classe.id == EmploiDuTemps.classe_id)
+            .where(
+                or_(*occupe_par),
+                func.lower(func.trim(EmploiDuTemps.jour)) == normaliser_jour(creneau["jour"]),
+                EmploiDuTemps.heure_debut < fin,
+                EmploiDuTemps.heure_fin > debut,
+            )
+        )
+        if ignorer:
+            requete = requete.where(EmploiDuTemps.id.notin_(ignorer))
+
+        trouves = []
+        for ligne in db.session.execute(requete.order_by(EmploiDuTemps.heure_debut, EmploiDuTemps.id)):
+            for type_ressource, valeur in ressources(ligne._asdict()):
+                if (type_ressource, valeur) in proposees:
+                    trouves.append({
+                        "ressource": type_ressource,
+                        "valeur": valeur,
+                        "avec": ligne.id,
+                        "heure_debut": ligne.heure_debut.strftime("%H:%M"),
+                        "heure_fin": ligne.heure_fin.strftime("%H:%M"),
+                    })
+
+        en_memoire = self.conflits(creneau, ignorer=ignorer, recharger=False) if self._charge_a else None
+        if en_memoire is not None and {c["avec"] for c in en_memoire} != {c["avec"] for c in trouves}:
+            self.invalider()
+        return trouves
+
+    def ids_des_classes(self, classe_ids):
+        """Identifiants des créneaux existants des classes données."""
+        self._a_jour()
+        ids = set()
+        for (jour, type_ressource, valeur), occupes in self._intervalles.items():
+            if type_ressource == "classe" and valeur in classe_ids:
+                ids.update(identifiant for _, _, identifiant in occupes)
+        return ids
+
+
+index_creneaux = IndexCreneaux()
+
+
+def verifier_semaine(creneaux, ignorer=()):
+    """
+    Vérifie une liste de créneaux proposés contre l'existant et entre eux.
+    Retourne la liste des conflits : {"creneau": i, "ressource", "valeur", "avec": id existant | "proposition:j"}.
+    """
+    conflits = []
+    propositions = IndexCreneaux()
+    for position, creneau in enumerate(creneaux):
+        for conflit in index_creneaux.conflits(creneau, ignorer=ignorer):
+            conflits.append({"creneau": position, **conflit})
+        for conflit in propositions.conflits(creneau, recharger=False):
+            conflits.append({"creneau": position, **conflit})
+        propositions.ajouter(creneau, f"proposition:{position}")
+    return conflits
+
+
+# Invalidation après commit des changements d'emplois du temps ou de classes
+@event.listens_for(Session, "after_flush")
+def _marquer_modifications(session, flush_context):
+    for objet in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(objet, (EmploiDuTemps, Classe)):
+            session.info[CLE_SESSION] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalider_apres_commit(session):
+    if session.info.pop(CLE_SESSION, False):
+        index_creneaux.invalider()
+
+
+# L'index a pu être rechargé avec des changements flushés puis annulés
+@event.listens_for(Session, "after_rollback")
+def _invalider_apres_rollback(session):
+    if session.info.pop(CLE_SESSION, False):
+        index_creneaux.invalider()
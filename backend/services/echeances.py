@@ -0,0 +1,300 @@
+"""
+Compte des élèves : échéances mensuelles dues (d'après les tarifs du niveau
+et de l'année scolaire de leur classe) et paiements encaissés.
+
+La table echeances contient une ligne par (élève, mois) avec le dû, le payé
+et le solde. Elle est tenue à jour dans la transaction d'écriture :
+- paiements : écouteur after_flush (deltas sur `paye` et `solde`) ;
+- tarifs, nouvel élève, changement de classe, changement de niveau ou
+  d'année d'une classe : recalcul du dû des élèves concernés en SQL.
+Les insertions groupées (import d'élèves) appellent synchroniser_du()
+explicitement.
+
+La liste des impayés est alors une seule requête groupée par élève sur les
+mois échus : les avances et trop-perçus (solde négatif) compensent les mois
+restant dus, comme dans le solde cumulé du compte de l'élève.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import and_, case, event, exists, func, inspect, literal, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.classe import Classe
+from models.echeance import Echeance
+from models.eleve import Eleve
+from models.paiement import Paiement
+from models.tarif import Tarif
+from utils.upsert import inserer_ou_mettre_a_jour
+
+MOIS = {
+    "janvier": 1, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6, "juillet": 7,
+    "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11, "decembre": 12,
+}
+STATUTS_NON_ENCAISSES = {"en attente", "en_attente"}
+CHAMPS_PAIEMENT = ("eleve_id", "montant", "periode", "statut")
+
+echeances = Echeance.__table__
+
+
+def _sans_accents(texte):
+    return "".join(c for c in unicodedata.normalize("NFD", texte) if unicodedata.category(c) != "Mn")
+
+
+def normaliser_periode(periode):
+    """'Octobre 2024', '2024-10', '10/2024' -> '2024-10' ; None si la période n'est pas un mois."""
+    if not periode:
+        return None
+    texte = _sans_accents(str(periode)).lower().strip()
+
+    correspondance = re.fullmatch(r"(\d{4})-(\d{1,2})", texte)
+    if correspondance:
+        annee, mois = int(correspondance[1]), int(correspondance[2])
+    else:
+        correspondance = re.fullmatch(r"(\d{1,2})\s*/\s*(\d{4})", texte)
+        if correspondance:
+            mois, annee = int(correspondance[1]), int(correspondance[2])
+        else:
+            correspondance = re.fullmatch(r"([a-z]+)\s+(\d{4})", texte)
+            if not correspondance or correspondance[1] not in MOIS:
+                return None
+            mois, annee = MOIS[correspondance[1]], int(correspondance[2])
+
+    return f"{annee:04d}-{mois:02d}" if 1 <= mois <= 12 else None
+
+
+def mois_courant():
+    return date.today().strftime("%Y-%m")
+
+
+def montant_encaisse(etat):
+    """Montant du paiement à imputer sur le compte (0 s'il n'est pas encore encaissé)."""
+    if (etat["statut"] or "").lower() in STATUTS_NON_ENCAISSES:
+        return 0.0
+    return float(etat["montant"] or 0)
+
+
+# ---------------------------------------------------------------------------
+# Écritures
+# ---------------------------------------------------------------------------
+
+def _du_tarif():
+    """Montant du tarif applicable à la ligne d'échéance courante (sous-requête corrélée)."""
+    return func.coalesce(
+        select(Tarif.montant)
+        .join(Classe, and_(Classe.niveau == Tarif.niveau, Classe.annee_scolaire == Tarif.annee_scolaire))
+        .join(Eleve, Eleve.classe_id == Classe.id)
+        .where(Eleve.id == echeances.c.eleve_id, Tarif.mois == echeances.c.mois)
+        .scalar_subquery(),
+        0,
+    )
+
+
+def synchroniser_du(connexion, eleves):
+    """
+    Recalcule le dû des élèves donnés (liste d'ids ou select d'ids) d'après
+    les tarifs de leur classe, et crée les échéances manquantes.
+    """
+    du = _du_tarif()
+    connexion.execute(
+        echeances.update()
+        .where(echeances.c.eleve_id.in_(eleves))
+        .values(du=du, solde=du - echeances.c.paye)
+    )
+    deja = exists().where(echeances.c.eleve_id == Eleve.id, echeances.c.mois == Tarif.mois)
+    connexion.execute(echeances.insert().from_select(
+        ["eleve_id", "mois", "du", "paye", "solde"],
+        select(Eleve.id, Tarif.mois, Tarif.montant, literal(0.0), Tarif.montant)
+        .join(Classe, Classe.id == Eleve.classe_id)
+        .join(Tarif, and_(Tarif.niveau == Classe.niveau, Tarif.annee_scolaire == Classe.annee_scolaire))
+        .where(Eleve.id.in_(eleves), ~deja)
+    ))
+
+
+def _eleves_du_niveau(niveau, annee_scolaire):
+    return (
+        select(Eleve.id)
+        .join(Classe, Classe.id == Eleve.classe_id)
+        .where(Classe.niveau == niveau, Classe.annee_scolaire == annee_scolaire)
+    )
+
+
+def appliquer_paiements(connexion, mouvements):
+    """mouvements : [(eleve_id, mois, montant signé)] ajoutés au payé des échéances."""
+    cumul = defaultdict(float)
+    for eleve_id, mois, montant in mouvements:
+        if mois and montant:
+            cumul[(int(eleve_id), mois)] += montant
+
+    if not cumul:
+        return
+
+    # Paiement d'un mois sans tarif (ou avance) : ligne créée par l'upsert, dû recalculé ensuite
+    eleve_ids = sorted({eleve_id for eleve_id, _ in cumul})
+    existantes = {
+        tuple(cle) for cle in
+        connexion.execute(select(echeances.c.eleve_id, echeances.c.mois).where(echeances.c.eleve_id.in_(eleve_ids)))
+    }
+    inserer_ou_mettre_a_jour(
+        connexion, echeances,
+        [
+            {"eleve_id": eleve_id, "mois": mois, "du": 0, "paye": montant, "solde": -montant}
+            for (eleve_id, mois), montant in cumul.items()
+        ],
+        cles=("eleve_id", "mois"),
+        mise_a_jour=lambda proposee: {
+            "paye": echeances.c.paye + proposee.paye,
+            "solde": echeances.c.solde - proposee.paye,
+        }
+    )
+    nouvelles = sorted({eleve_id for eleve_id, mois in cumul if (eleve_id, mois) not in existantes})
+    if nouvelles:
+        synchroniser_du(connexion, nouvelles)
+
+
+def _mouvement(etat, signe):
+    return (etat["eleve_id"], normaliser_periode(etat["periode"]), signe * montant_encaisse(etat))
+
+
+def _etat_actuel(objet, champs):
+    return {champ: getattr(objet, champ) for champ in champs}
+
+
+def _etat_precedent(objet, champs):
+    etat = inspect(objet)
+    valeurs = {}
+    for champ in champs:
+        historique = etat.attrs[champ].history
+        valeurs[champ] = historique.deleted[0] if historique.deleted else getattr(objet, champ)
+    return valeurs
+
+
+def _a_change(objet, champs):
+    etat = inspect(objet)
+    return any(etat.attrs[champ].history.has_changes() for champ in champs)
+
+
+@event.listens_for(Session, "after_flush")
+def _mettre_a_jour_echeances(session, flush_context):
+    mouvements = []
+    eleves_a_recalculer = set()
+    niveaux_a_recalculer = set()   # (niveau, annee_scolaire)
+    classes_a_recalculer = set()
+
+    for objet in session.new:
+        if isinstance(objet, Paiement):
+            mouvements.append(_mouvement(_etat_actuel(objet, CHAMPS_PAIEMENT), 1))
+        elif isinstance(objet, Eleve):
+            eleves_a_recalculer.add(objet.id)
+        elif isinstance(objet, Tarif):
+            niveaux_a_recalculer.add((objet.niveau, objet.annee_scolaire))
+
+    for objet in session.deleted:
+        if isinstance(objet, Paiement):
+            mouvements.append(_mouvement(_etat_precedent(objet, CHAMPS_PAIEMENT), -1))
+        elif isinstance(objet, Tarif):
+            precedent = _etat_precedent(objet, ("niveau", "annee_scolaire"))
+            niveaux_a_recalculer.add((precedent["niveau"], precedent["annee_scolaire"]))
+
+    for objet in session.dirty:
+        if isinstance(objet, Paiement) and _a_change(objet, CHAMPS_PAIEMENT):
+            mouvements.append(_mouvement(_etat_precedent(objet, CHAMPS_PAIEMENT), -1))
+            mouvements.append(_mouvement(_etat_actuel(objet, CHAMPS_PAIEMENT), 1))
+        elif isinstance(objet, Eleve) and _a_change(objet, ("classe_id",)):
+            eleves_a_recalculer.add(objet.id)
+        elif isinstance(objet, Classe) and _a_change(objet, ("niveau", "annee_scolaire")):
+            classes_a_recalculer.add(objet.id)
+        elif isinstance(objet, Tarif) and _a_change(objet, ("niveau", "annee_scolaire", "mois", "montant")):
+            precedent = _etat_precedent(objet, ("niveau", "annee_scolaire"))
+            niveaux_a_recalculer.add((precedent["niveau"], precedent["annee_scolaire"]))
+            niveaux_a_recalculer.add((objet.niveau, objet.annee_scolaire))
+
+    if not (mouvements or eleves_a_recalculer or niveaux_a_recalculer or classes_a_recalculer):
+        return
+
+    connexion = session.connection()
+    if mouvements:
+        appliquer_paiements(connexion, mouvements)
+    if eleves_a_recalculer:
+        synchroniser_du(connexion, sorted(eleves_a_recalculer))
+    if classes_a_recalculer:
+        synchroniser_du(connexion, select(Eleve.id).where(Eleve.classe_id.in_(classes_a_recalculer)))
+    for niveau, annee_scolaire in niveaux_a_recalculer:
+        synchroniser_du(connexion, _eleves_du_niveau(niveau, annee_scolaire))
+
+
+def recalculer_echeances():
+    """Reconstruit la table echeances depuis les tarifs et les paiements (initialisation ou réparation)."""
+    session = db.session
+    connexion = session.connection()
+    connexion.execute(echeances.delete())
+    synchroniser_du(connexion, select(Eleve.id))
+
+    mouvements = [
+        _mouvement({"eleve_id": eleve_id, "periode": periode, "statut": statut, "montant": montant}, 1)
+        for eleve_id, periode, statut, montant in session.execute(
+            select(Paiement.eleve_id, Paiement.periode, Paiement.statut, func.sum(Paiement.montant))
+            .group_by(Paiement.eleve_id, Paiement.periode, Paiement.statut)
+        )
+    ]
+    appliquer_paiements(connexion, mouvements)
+    session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Lectures
+# ---------------------------------------------------------------------------
+
+def compte_eleve(eleve_id):
+    """Échéances de l'élève avec le solde cumulé mois après mois."""
+    lignes = db.session.execute(
+        select(
+            echeances.c.mois, echeances.c.du, echeances.c.paye, echeances.c.solde,
+            func.sum(echeances.c.solde).over(order_by=echeances.c.mois).label("solde_cumule"),
+        )
+        .where(echeances.c.eleve_id == eleve_id)
+        .order_by(echeances.c.mois)
+    )
+    return [
+        {"mois": l.mois, "du": l.du, "paye": l.paye, "solde": l.solde, "solde_cumule": l.solde_cumule}
+        for l in lignes
+    ]
+
+
+def impayes(mois_reference=None, classe_id=None):
+    """
+    Élèves dont le solde net des mois échus (jusqu'à mois_reference inclus) est
+    positif. Une avance ou un trop-perçu sur un mois compense les autres : un
+    élève dont le solde cumulé est nul n'est pas en retard. mois_impayes et
+    depuis ne portent que sur les mois restés dus.
+    """
+    mois_reference = mois_reference or mois_courant()
+    montant_du = func.sum(echeances.c.solde)
+    mois_du = echeances.c.solde > 0
+    requete = (
+        select(
+            Eleve.id, Eleve.nom, Eleve.prenom, Eleve.matricule, Eleve.classe_id,
+            montant_du.label("montant_du"),
+            func.sum(case((mois_du, 1), else_=0)).label("mois_impayes"),
+            func.min(case((mois_du, echeances.c.mois))).label("depuis"),
+        )
+        .join(Eleve, Eleve.id == echeances.c.eleve_id)
+        .where(echeances.c.mois <= mois_reference)
+        .group_by(Eleve.id, Eleve.nom, Eleve.prenom, Eleve.matricule, Eleve.classe_id)
+        .having(montant_du > 0)
+        .order_by(montant_du.desc(), Eleve.id)
+    )
+    if classe_id:
+        requete = requete.where(Eleve.classe_id == classe_id)
+
+    return [
+        {
+            "eleve_id": l.id, "nom": l.nom, "prenom": l.prenom, "matricule": l.matricule,
+            "classe_id": l.classe_id, "montant_du": l.montant_du,
+            "mois_impayes": l.mois_impayes, "depuis": l.depuis,
+        }
+        for l in db.session.execute(requete)
+    ]
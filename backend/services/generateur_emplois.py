@@ -0,0 +1,235 @@
+"""
+Génération automatique d'emplois du temps : prépare le problème à partir de
+la base (classes, salles, enseignants qualifiés via enseignant_matiere,
+créneaux déjà occupés), lance le solveur dans un pool de processus avec un
+budget de temps, puis enregistre éventuellement la meilleure semaine trouvée.
+
+Le pool est partagé par toutes les requêtes du worker (GENERATEUR_PROCESSUS
+processus au plus, créés au premier usage) et GENERATEUR_SIMULTANES
+générations au plus s'exécutent en même temps : au-delà, GenerateurSature
+(réponse 503), comme le pool de hachage des connexions.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import time as heure
+
+from sqlalchemy import delete, insert, select
+
+from database import db
+from models.classe import Classe
+from models.emploi_du_temps import EmploiDuTemps
+from models.enseignant import enseignant_matiere
+from services.cache_reponses import cache_reponses
+from services.conflits_emplois import index_creneaux
+from services.solveur_emplois import resoudre
+
+JOURS_PAR_DEFAUT = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi"]
+PLAGES_PAR_DEFAUT = [
+    ("08:00", "09:00"), ("09:00", "10:00"), ("10:00", "11:00"), ("11:00", "12:00"), ("12:00", "13:00"),
+    ("15:00", "16:00"), ("16:00", "17:00"),
+]
+DUREE_MAX_SECONDES = 55
+PROCESSUS = int(os.getenv("GENERATEUR_PROCESSUS", os.cpu_count() or 1))
+SIMULTANES = int(os.getenv("GENERATEUR_SIMULTANES", "2"))
+DUREE_TOUR = 2.0   # secondes par tour de recherche dans chaque processus
+
+
+class ClassesIntrouvables(LookupError):
+    pass
+
+
+class GenerateurSature(Exception):
+    pass
+
+
+_places = threading.BoundedSemaphore(max(1, SIMULTANES))
+_verrou_pool = threading.Lock()
+_pool = None
+
+
+def _pool_partage():
+    global _pool
+    with _verrou_pool:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PROCESSUS)
+        return _pool
+
+
+def _abandonner_pool(pool):
+    """Pool cassé (processus tué) : le suivant en recrée un."""
+    global _pool
+    with _verrou_pool:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _minutes(texte):
+    heures, minutes = texte.split(":")
+    return int(heures) * 60 + int(minutes)
+
+
+def _texte(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def preparer_probleme(besoins_classes, jours, plages):
+    """
+    besoins_classes : {classe_id: {matiere_id: heures_hebdomadaires}}
+    plages : [("08:00", "09:00"), ...]
+    """
+    classe_ids = set(besoins_classes)
+    matiere_ids = {m for besoins in besoins_classes.values() for m in besoins}
+    plages_minutes = sorted((_minutes(debut), _minutes(fin)) for debut, fin in plages)
+
+    salles = dict(db.session.execute(select(Classe.id, Classe.salle).where(Classe.id.in_(classe_ids))).all())
+    introuvables = classe_ids - set(salles)
+    if introuvables:
+        raise ClassesIntrouvables(f"Classes introuvables : {sorted(introuvables)}")
+
+    qualifies = {}
+    for enseignant_id, matiere_id in db.session.execute(
+        select(enseignant_matiere.c.enseignant_id, enseignant_matiere.c.matiere_id)
+        .where(enseignant_matiere.c.matiere_id.in_(matiere_ids))
+    ):
+        qualifies.setdefault(matiere_id, []).append(enseignant_id)
+
+    # Créneaux des autres classes : enseignants et salles déjà pris
+    index_jours = {jour.strip().lower(): i for i, jour in enumerate(jours)}
+    occupes = []
+    existants = db.session.execute(
+        select(EmploiDuTemps.jour, EmploiDuTemps.heure_debut, EmploiDuTemps.heure_fin,
+               EmploiDuTemps.enseignant_id, Classe.salle)
+        .join(Classe, Classe.id == EmploiDuTemps.classe_id)
+        .where(EmploiDuTemps.classe_id.notin_(classe_ids))
+    )
+    for jour, debut, fin, enseignant_id, salle in existants:
+        j = index_jours.get(jour.strip().lower())
+        if j is None:
+            continue
+        debut, fin = debut.hour * 60 + debut.minute, fin.hour * 60 + fin.minute
+        for p, (debut_plage, fin_plage) in enumerate(plages_minutes):
+            if debut < fin_plage and debut_plage < fin:
+                occupes.append((j, p, "enseignant", enseignant_id))
+                occupes.append((j, p, "salle", salle.strip().lower()))
+
+    return {
+        "jours": list(jours),
+        "plages": plages_minutes,
+        "besoins": [
+            (classe_id, matiere_id, int(round(float(heures) * 60)))
+            for classe_id, besoins in besoins_classes.items()
+            for matiere_id, heures in besoins.items() if float(heures) > 0
+        ],
+        "qualifies": qualifies,
+        "salles": {classe_id: salle.strip().lower() for classe_id, salle in salles.items()},
+        "occupes": occupes,
+    }
+
+
+def chercher(probleme, duree_max, processus=PROCESSUS):
+    """Recherche parallèle par tours courts jusqu'à la solution complète ou l'échéance."""
+    echeance = time.time() + duree_max
+    meilleure = None
+    essais = 0
+    graine = 0
+    # Minutes impossibles à placer quoi qu'il arrive (matière sans enseignant qualifié)
+    incompressible = sum(
+        minutes for _, matiere_id, minutes in probleme["besoins"] if not probleme["qualifies"].get(matiere_id)
+    )
+
+    def continuer():
+        return meilleure is None or (meilleure[0] > incompressible and time.time() < echeance)
+
+    def retenir(resultat):
+        nonlocal meilleure, essais
+        creneaux, non_places, n = resultat
+        essais += n
+        manque = sum(minutes for _, _, minutes, _ in non_places)
+        if meilleure is None or manque < meilleure[0]:
+            meilleure = (manque, creneaux, non_places)
+
+    if processus <= 1:
+        while continuer():
+            graine += 1
+            retenir(resoudre(probleme, graine, min(echeance, time.time() + DUREE_TOUR)))
+        return meilleure[1], meilleure[2], essais
+
+    pool = _pool_partage()
+    try:
+        while continuer():
+            fin_tour = min(echeance, time.time() + DUREE_TOUR)
+            futures = []
+            for _ in range(processus):
+                graine += 1
+                futures.append(pool.submit(resoudre, probleme, graine, fin_tour))
+            termines, _ = wait(futures)
+            for future in termines:
+                retenir(future.result())
+    except BrokenProcessPool:
+        _abandonner_pool(pool)
+        raise
+
+    return meilleure[1], meilleure[2], essais
+
+
+def generer(besoins_classes, jours=None, plages=None, duree_max=20):
+    jours = jours or JOURS_PAR_DEFAUT
+    plages = plages or PLAGES_PAR_DEFAUT
+    duree_max = max(1, min(float(duree_max), DUREE_MAX_SECONDES))
+
+    debut = time.time()
+    probleme = preparer_probleme(besoins_classes, jours, plages)
+    if not _places.acquire(blocking=False):
+        raise GenerateurSature("Trop de générations d'emploi du temps en cours, réessayez dans un instant")
+    try:
+        creneaux, non_places, essais = chercher(probleme, duree_max)
+    finally:
+        _places.release()
+
+    return {
+        "complet": not non_places,
+        "creneaux": [
+            {
+                "jour": probleme["jours"][j],
+                "heure_debut": _texte(probleme["plages"][p][0]),
+                "heure_fin": _texte(probleme["plages"][p][1]),
+                "classe_id": classe_id,
+                "enseignant_id": enseignant_id,
+                "matiere_id": matiere_id,
+            }
+            for j, p, classe_id, enseignant_id, matiere_id in sorted(creneaux, key=lambda c: (c[2], c[0], c[1]))
+        ],
+        "non_places": [
+            {
+                "classe_id": classe_id,
+                "matiere_id": matiere_id,
+                "minutes_restantes": minutes,
+                "raison": "pas de créneau libre" if a_enseignant else "aucun enseignant qualifié",
+            }
+            for classe_id, matiere_id, minutes, a_enseignant in non_places
+        ],
+        "essais": essais,
+        "duree_secondes": round(time.time() - debut, 2),
+    }
+
+
+def enregistrer(classe_ids, creneaux):
+    """Remplace l'emploi du temps des classes données par les créneaux générés."""
+    db.session.execute(delete(EmploiDuTemps).where(EmploiDuTemps.classe_id.in_(classe_ids)))
+    if creneaux:
+        db.session.execute(insert(EmploiDuTemps), [
+            {
+                **creneau,
+                "heure_debut": heure.fromisoformat(creneau["heure_debut"]),
+                "heure_fin": heure.fromisoformat(creneau["heure_fin"]),
+            }
+            for creneau in creneaux
+        ])
+    db.session.commit()
+    # Écritures groupées hors flush : invalider l'index des conflits et le cache des réponses explicitement
+    index_creneaux.invalider()
+    cache_reponses.invalider(("emplois",))
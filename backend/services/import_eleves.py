@@ -0,0 +1,224 @@
+"""
+Import en masse d'élèves (début d'année) : validation de toutes les lignes,
+résolution des parents / matricules existants par requêtes IN, puis insertions
+groupées des utilisateurs et des élèves dans une seule transaction.
+"""
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+
+from database import db
+from models.classe import Classe
+from models.eleve import Eleve
+from models.enums import RoleUtilisateur
+from models.utilisateur import Utilisateur, mot_de_passe_par_defaut
+from services.echeances import synchroniser_du
+from services.statistiques import appliquer_deltas, deltas_eleve
+
+CHAMPS_REQUIS = ("nom", "prenom", "sexe", "matricule", "classe_id", "parent_nom", "parent_prenom", "parent_telephone")
+CHAMPS_CSV = CHAMPS_REQUIS + ("date_naissance", "adresse")
+
+
+def lire_csv(contenu):
+    """Lit un CSV (séparateur ',' ou ';', en-tête obligatoire) en liste de dict."""
+    if isinstance(contenu, bytes):
+        contenu = contenu.decode("utf-8-sig")
+    try:
+        dialecte = csv.Sniffer().sniff(contenu.splitlines()[0] if contenu else "", delimiters=",;")
+    except csv.Error:
+        dialecte = csv.excel
+    lecteur = csv.DictReader(io.StringIO(contenu), dialect=dialecte)
+    return [
+        {cle.strip(): (valeur.strip() if isinstance(valeur, str) else valeur) for cle, valeur in ligne.items() if cle}
+        for ligne in lecteur
+    ]
+
+
+def email_parent(telephone):
+    return f"{telephone}@parent.com".lower().strip()
+
+
+def email_eleve(matricule):
+    return f"{matricule}@eleve.com".lower().strip()
+
+
+def cle_matricule(matricule):
+    """Forme normalisée d'un matricule : deux matricules de même clé donnent le même email élève."""
+    return matricule.lower().strip()
+
+
+def _valider_ligne(data):
+    """Retourne (erreurs, ligne normalisée)."""
+    if not isinstance(data, dict):
+        return ["Ligne invalide (objet attendu)"], None
+
+    erreurs = []
+    manquants = [champ for champ in CHAMPS_REQUIS if not data.get(champ)]
+    if manquants:
+        erreurs.append(f"Champs manquants : {', '.join(manquants)}")
+
+    sexe = data.get('sexe')
+    if sexe and sexe not in ['M', 'F']:
+        erreurs.append("Le champ 'sexe' doit être 'M' ou 'F'")
+
+    classe_id = None
+    if data.get('classe_id'):
+        try:
+            classe_id = int(data['classe_id'])
+        except (TypeError, ValueError):
+            erreurs.append("classe_id invalide")
+
+    date_naissance = None
+    if data.get('date_naissance'):
+        try:
+            date_naissance = datetime.strptime(data['date_naissance'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            erreurs.append("Format de date incorrect. Utilisez AAAA-MM-JJ.")
+
+    if erreurs:
+        return erreurs, None
+
+    return [], {
+        "nom": data['nom'],
+        "prenom": data['prenom'],
+        "sexe": sexe,
+        "matricule": str(data['matricule']).strip(),
+        "date_naissance": date_naissance,
+        "adresse": data.get('adresse') or None,
+        "classe_id": classe_id,
+        "parent_nom": data['parent_nom'],
+        "parent_prenom": data['parent_prenom'],
+        "parent_telephone": str(data['parent_telephone']).strip(),
+    }
+
+
+def importer_eleves(lignes):
+    """
+    Importe les lignes valides et renvoie le rapport :
+    {"importes": n, "erreurs": [{"ligne": i, "matricule": ..., "erreurs": [...]}]}
+    Les lignes sont numérotées à partir de 1.
+    """
+    rapport = {"importes": 0, "erreurs": []}
+
+    def rejeter(numero, ligne, erreurs):
+        matricule = ligne.get('matricule') if isinstance(ligne, dict) else None
+        rapport["erreurs"].append({"ligne": numero, "matricule": matricule, "erreurs": erreurs})
+
+    # 1. Validation ligne par ligne
+    valides = []
+    for numero, data in enumerate(lignes, start=1):
+        erreurs, ligne = _valider_ligne(data)
+        if erreurs:
+            rejeter(numero, data, erreurs)
+        else:
+            valides.append((numero, ligne))
+
+    # 2. Vérifications ensemblistes : une requête IN par type de référence
+    classe_ids = {ligne["classe_id"] for _, ligne in valides}
+    niveaux = dict(
+        db.session.execute(select(Classe.id, Classe.niveau).where(Classe.id.in_(classe_ids))).all()
+    ) if classe_ids else {}
+
+    # Comparaisons sur la clé normalisée : « abc9 » et « ABC9 » donneraient le même email élève
+    cles = {cle_matricule(ligne["matricule"]) for _, ligne in valides}
+    emails_eleves = {email_eleve(m) for m in cles}
+    matricules_pris = {
+        cle_matricule(m) for m in
+        db.session.scalars(select(Eleve.matricule).where(func.lower(Eleve.matricule).in_(cles)))
+    } if cles else set()
+    emails_pris = set(
+        db.session.scalars(select(Utilisateur.email).where(Utilisateur.email.in_(emails_eleves)))
+    ) if emails_eleves else set()
+
+    emails_parents = {email_parent(ligne["parent_telephone"]) for _, ligne in valides}
+    parents_existants = dict(
+        db.session.execute(
+            select(Utilisateur.email, Utilisateur.id).where(Utilisateur.email.in_(emails_parents))
+        ).all()
+    ) if emails_parents else {}
+
+    retenues = []
+    vus = set()
+    for numero, ligne in valides:
+        erreurs = []
+        if ligne["classe_id"] not in niveaux:
+            erreurs.append("Classe introuvable")
+        cle = cle_matricule(ligne["matricule"])
+        if cle in matricules_pris or email_eleve(cle) in emails_pris:
+            erreurs.append("Un utilisateur élève avec ce matricule existe déjà")
+        if cle in vus:
+            erreurs.append("Matricule en double dans le fichier (majuscules et minuscules confondues)")
+        vus.add(cle)
+
+        if erreurs:
+            rejeter(numero, ligne, erreurs)
+        else:
+            retenues.append(ligne)
+
+    rapport["erreurs"].sort(key=lambda erreur: erreur["ligne"])
+    if not retenues:
+        return rapport
+
+    # 3. Insertions groupées : nouveaux parents (dédoublonnés) + utilisateurs élèves
+    mdp_parent = mot_de_passe_par_defaut("parent")
+    mdp_eleve = mot_de_passe_par_defaut("eleve")
+
+    nouveaux_parents = {}
+    for ligne in retenues:
+        email = email_parent(ligne["parent_telephone"])
+        if email not in parents_existants and email not in nouveaux_parents:
+            nouveaux_parents[email] = {
+                "email": email,
+                "nom": ligne["parent_nom"],
+                "prenom": ligne["parent_prenom"],
+                "telephone": ligne["parent_telephone"],
+                "role": RoleUtilisateur.PARENT,
+                "mot_de_passe": mdp_parent,
+                "mot_de_passe_provisoire": True,
+            }
+
+    utilisateurs = list(nouveaux_parents.values()) + [
+        {
+            "email": email_eleve(ligne["matricule"]),
+            "nom": ligne["nom"],
+            "prenom": ligne["prenom"],
+            "role": RoleUtilisateur.ELEVE,
+            "mot_de_passe": mdp_eleve,
+            "mot_de_passe_provisoire": True,
+        }
+        for ligne in retenues
+    ]
+    db.session.execute(insert(Utilisateur), utilisateurs)
+
+    emails = [u["email"] for u in utilisateurs]
+    ids = dict(db.session.execute(select(Utilisateur.email, Utilisateur.id).where(Utilisateur.email.in_(emails))).all())
+    ids.update(parents_existants)
+
+    eleves = [
+        {
+            "nom": ligne["nom"],
+            "prenom": ligne["prenom"],
+            "sexe": ligne["sexe"],
+            "matricule": ligne["matricule"],
+            "date_naissance": ligne["date_naissance"],
+            "adresse": ligne["adresse"],
+            "classe_id": ligne["classe_id"],
+            "utilisateur_id": ids[email_eleve(ligne["matricule"])],
+            "parent_id": ids[email_parent(ligne["parent_telephone"])],
+        }
+        for ligne in retenues
+    ]
+    db.session.execute(insert(Eleve), eleves)
+
+    # Les insertions groupées ne passent pas par le flush : compteurs mis à jour ici
+    deltas = []
+    for eleve in eleves:
+        deltas += deltas_eleve(eleve, 1, niveaux)
+    appliquer_deltas(db.session.connection(), deltas)
+    synchroniser_du(db.session.connection(), select(Eleve.id).where(Eleve.matricule.in_([e["matricule"] for e in eleves])))
+
+    db.session.commit()
+    rapport["importes"] = len(eleves)
+    return rapport
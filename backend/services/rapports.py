@@ -0,0 +1,306 @@
+"""
+Rapports financiers : recettes (paiements encaissés) par mois, période,
+méthode et classe ; dépenses par type et par mois ; solde net.
+
+Les agrégats sont calculés en SQL (GROUP BY sur les colonnes de date
+indexées, mois extrait avec EXTRACT). Les mois clos entièrement couverts par
+la plage demandée sont mis en cache dans rapports_mensuels et ne sont plus
+recalculés ; le mois en cours et les mois partiellement couverts sont
+toujours calculés à la volée.
+
+Toute écriture de Paiement ou de Depense qui touche un mois clos (ou le
+changement de classe d'un élève ayant des paiements) incrémente la version
+du mois dans versions_rapports_mensuels et supprime son cache, dans la même
+transaction (écouteur after_flush). Un rapport relit la version de chaque
+mois avant d'agréger, puis la relit sous verrou (SELECT ... FOR UPDATE) au
+moment d'écrire le cache : si une écriture a été validée entre-temps, ou est
+encore en cours, le mois n'est pas mis en cache. Sans cela, des agrégats
+calculés avant la validation d'un paiement seraient stockés après
+l'invalidation et resteraient faux indéfiniment pour un mois clos.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from flask import g, has_request_context
+from sqlalchemy import and_, delete, event, extract, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import db
+from models.depense import Depense
+from models.eleve import Eleve
+from models.paiement import Paiement
+from models.rapport_mensuel import RapportMensuel
+from models.version_rapport_mensuel import VersionRapportMensuel
+from services.echeances import STATUTS_NON_ENCAISSES
+
+TOTAL = "total"
+CHAMPS_PAIEMENT = ("date_paiement", "montant", "methode", "periode", "statut", "eleve_id")
+CHAMPS_DEPENSE = ("date", "montant", "type")
+
+cache = RapportMensuel.__table__
+versions = VersionRapportMensuel.__table__
+
+
+# ---------------------------------------------------------------------------
+# Mois
+# ---------------------------------------------------------------------------
+
+def _cle_mois(annee, mois):
+    return f"{int(annee):04d}-{int(mois):02d}"
+
+
+def _debut_mois(jour):
+    return jour.replace(day=1)
+
+
+def _fin_mois(jour):
+    return (jour.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _mois_de(debut, fin):
+    """Liste des (cle, premier jour, dernier jour) des mois qui intersectent [debut, fin]."""
+    resultat = []
+    courant = _debut_mois(debut)
+    while courant <= fin:
+        resultat.append((courant.strftime("%Y-%m"), courant, _fin_mois(courant)))
+        courant = _fin_mois(courant) + timedelta(days=1)
+    return resultat
+
+
+# ---------------------------------------------------------------------------
+# Calcul SQL
+# ---------------------------------------------------------------------------
+
+def _encaisse():
+    return func.coalesce(Paiement.statut, "").notin_(STATUTS_NON_ENCAISSES)
+
+
+def _agreger(debut, fin):
+    """{mois: [(categorie, cle, nombre, montant)]} pour les écritures de [debut, fin]."""
+    resultats = defaultdict(list)
+
+    annee_p, mois_p = extract("year", Paiement.date_paiement), extract("month", Paiement.date_paiement)
+    filtre_p = and_(Paiement.date_paiement.between(debut, fin), _encaisse())
+    dimensions_p = (
+        ("recettes", None),
+        ("recettes_methode", func.coalesce(Paiement.methode, "inconnue")),
+        ("recettes_periode", Paiement.periode),
+        ("recettes_classe", Eleve.classe_id),
+    )
+    for categorie, colonne in dimensions_p:
+        colonnes = [annee_p, mois_p] + ([colonne] if colonne is not None else [])
+        requete = select(*colonnes, func.count(Paiement.id), func.sum(Paiement.montant)).where(filtre_p)
+        if categorie == "recettes_classe":
+            requete = requete.join(Eleve, Eleve.id == Paiement.eleve_id)
+        for ligne in db.session.execute(requete.group_by(*colonnes)):
+            cle = TOTAL if colonne is None else str(ligne[2])
+            resultats[_cle_mois(ligne[0], ligne[1])].append((categorie, cle, ligne[-2], float(ligne[-1] or 0)))
+
+    annee_d, mois_d = extract("year", Depense.date), extract("month", Depense.date)
+    for categorie, colonne in (("depenses", None), ("depenses_type", Depense.type)):
+        colonnes = [annee_d, mois_d] + ([colonne] if colonne is not None else [])
+        requete = (
+            select(*colonnes, func.count(Depense.id), func.sum(Depense.montant))
+            .where(Depense.date.between(debut, fin))
+            .group_by(*colonnes)
+        )
+        for ligne in db.session.execute(requete):
+            cle = TOTAL if colonne is None else str(ligne[2])
+            resultats[_cle_mois(ligne[0], ligne[1])].append((categorie, cle, ligne[-2], float(ligne[-1] or 0)))
+
+    return resultats
+
+
+def _lire_cache(mois):
+    lignes = db.session.execute(
+        select(cache.c.mois, cache.c.categorie, cache.c.cle, cache.c.nombre, cache.c.montant)
+        .where(cache.c.mois.in_(mois))
+    )
+    resultats = defaultdict(list)
+    for ligne in lignes:
+        resultats[ligne.mois].append((ligne.categorie, ligne.cle, ligne.nombre, ligne.montant))
+    return resultats
+
+
+def _lire_versions(connexion, mois, verrouiller=False):
+    requete = select(versions.c.mois, versions.c.version).where(versions.c.mois.in_(mois))
+    if verrouiller:
+        requete = requete.with_for_update()
+    return dict(connexion.execute(requete).all())
+
+
+def _ecrire_cache(agregats, mois, versions_lues):
+    """
+    Met en cache les mois dont la version n'a pas bougé depuis `versions_lues`
+    (lues dans la même transaction que les agrégats, avant de les calculer).
+    """
+    with db.engine.begin() as connexion:
+        # Le verrou attend la fin d'une écriture en cours sur ces mois
+        actuelles = _lire_versions(connexion, mois, verrouiller=True)
+        a_jour = [cle for cle in mois if actuelles.get(cle, 0) == versions_lues.get(cle, 0)]
+        _inserer_cache(connexion, agregats, a_jour)
+
+
+def _inserer_cache(connexion, agregats, mois):
+    lignes = []
+    for cle_mois in mois:
+        valeurs = agregats.get(cle_mois, [])
+        categories = {categorie for categorie, *_ in valeurs}
+        # Les totaux servent de marqueur « mois calculé », même sans écriture
+        complements = [(c, TOTAL, 0, 0.0) for c in ("recettes", "depenses") if c not in categories]
+        lignes += [
+            {"mois": cle_mois, "categorie": categorie, "cle": cle, "nombre": nombre, "montant": montant}
+            for categorie, cle, nombre, montant in valeurs + complements
+        ]
+    if not lignes:
+        return
+    try:
+        with connexion.begin_nested():
+            connexion.execute(cache.insert(), lignes)
+    except IntegrityError:
+        pass    # mois déjà mis en cache par une requête concurrente : mêmes valeurs
+
+
+def rapport_financier(debut, fin):
+    """Agrégats par mois de [debut, fin], depuis le cache pour les mois clos entièrement couverts."""
+    premier_jour_courant = _debut_mois(date.today())
+    mois = _mois_de(debut, fin)
+
+    clos = [cle for cle, premier, dernier in mois if debut <= premier and dernier <= fin and dernier < premier_jour_courant]
+    par_mois = _lire_cache(clos)
+
+    manquants = [cle for cle in clos if cle not in par_mois]
+    if manquants:
+        # Ce qui est mis en cache ne sera plus recalculé : on lit le primaire, pas une réplique en retard
+        if has_request_context():
+            g.lecture_primaire = True
+        bornes = [(premier, dernier) for cle, premier, dernier in mois if cle in manquants]
+        versions_lues = _lire_versions(db.session, manquants)
+        calcules = _agreger(bornes[0][0], bornes[-1][1])
+        _ecrire_cache(calcules, manquants, versions_lues)
+        for cle in manquants:
+            par_mois[cle] = calcules.get(cle, [])
+
+    # Mois en cours et mois partiellement couverts : toujours à la volée
+    a_la_volee = [(max(debut, premier), min(fin, dernier)) for cle, premier, dernier in mois if cle not in clos]
+    for debut_partiel, fin_partiel in a_la_volee:
+        par_mois.update(_agreger(debut_partiel, fin_partiel))
+
+    for cle, _, _ in mois:
+        par_mois.setdefault(cle, [])
+    return par_mois
+
+
+def synthese(par_mois):
+    """Cumule les agrégats mensuels en réponse JSON."""
+    cumuls = defaultdict(lambda: defaultdict(lambda: {"nombre": 0, "montant": 0.0}))
+    mensuel = {cle_mois: {"recettes": 0.0, "depenses": 0.0} for cle_mois in par_mois}
+
+    for cle_mois, valeurs in par_mois.items():
+        for categorie, cle, nombre, montant in valeurs:
+            cumuls[categorie][cle]["nombre"] += nombre
+            cumuls[categorie][cle]["montant"] += montant
+            if cle == TOTAL:
+                mensuel[cle_mois][categorie] += montant
+
+    def repartition(categorie):
+        return sorted(
+            ({"cle": cle, **valeurs} for cle, valeurs in cumuls[categorie].items()),
+            key=lambda r: r["montant"], reverse=True
+        )
+
+    recettes = cumuls["recettes"][TOTAL]["montant"]
+    depenses = cumuls["depenses"][TOTAL]["montant"]
+    return {
+        "recettes": recettes,
+        "depenses": depenses,
+        "solde_net": recettes - depenses,
+        "recettes_par_methode": repartition("recettes_methode"),
+        "recettes_par_periode": repartition("recettes_periode"),
+        "recettes_par_classe": repartition("recettes_classe"),
+        "depenses_par_type": repartition("depenses_type"),
+        "par_mois": [
+            {"mois": cle_mois, **valeurs, "solde_net": valeurs["recettes"] - valeurs["depenses"]}
+            for cle_mois, valeurs in sorted(mensuel.items())
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Invalidation du cache des mois clos
+# ---------------------------------------------------------------------------
+
+def _mois_date(valeur):
+    return (valeur or date.today()).strftime("%Y-%m")
+
+
+def _valeur_precedente(objet, champ):
+    historique = inspect(objet).attrs[champ].history
+    return historique.deleted[0] if historique.deleted else getattr(objet, champ)
+
+
+def _a_change(objet, champs):
+    etat = inspect(objet)
+    return any(etat.attrs[champ].history.has_changes() for champ in champs)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalider_mois(session, flush_context):
+    mois = set()
+    eleves_changes = []
+
+    for objet in session.new:
+        if isinstance(objet, Paiement):
+            mois.add(_mois_date(objet.date_paiement))
+        elif isinstance(objet, Depense):
+            mois.add(_mois_date(objet.date))
+    for objet in session.deleted:
+        if isinstance(objet, Paiement):
+            mois.add(_mois_date(_valeur_precedente(objet, "date_paiement")))
+        elif isinstance(objet, Depense):
+            mois.add(_mois_date(_valeur_precedente(objet, "date")))
+    for objet in session.dirty:
+        if isinstance(objet, Paiement) and _a_change(objet, CHAMPS_PAIEMENT):
+            mois |= {_mois_date(_valeur_precedente(objet, "date_paiement")), _mois_date(objet.date_paiement)}
+        elif isinstance(objet, Depense) and _a_change(objet, CHAMPS_DEPENSE):
+            mois |= {_mois_date(_valeur_precedente(objet, "date")), _mois_date(objet.date)}
+        elif isinstance(objet, Eleve) and _a_change(objet, ("classe_id",)):
+            eleves_changes.append(objet.id)
+
+    mois.discard(date.today().strftime("%Y-%m"))   # le mois en cours n'est jamais en cache
+    if not (mois or eleves_changes):
+        return
+
+    connexion = session.connection()
+    if eleves_changes:
+        # Recettes par classe : les mois où ces élèves ont payé sont à recalculer
+        premier, dernier = connexion.execute(
+            select(func.min(Paiement.date_paiement), func.max(Paiement.date_paiement))
+            .where(Paiement.eleve_id.in_(eleves_changes))
+        ).one()
+        if premier:
+            mois |= {cle for cle, _, _ in _mois_de(premier, dernier)}
+            mois.discard(date.today().strftime("%Y-%m"))
+    if not mois:
+        return
+
+    # Version d'abord : son verrou de ligne fait attendre un rapport qui voudrait
+    # mettre ces mois en cache avant la fin de cette transaction
+    _incrementer_versions(connexion, sorted(mois))
+    connexion.execute(delete(cache).where(cache.c.mois.in_(mois)))
+
+
+def _incrementer_versions(connexion, mois):
+    connexion.execute(
+        versions.update().where(versions.c.mois.in_(mois)).values(version=versions.c.version + 1)
+    )
+    for cle in set(mois) - set(_lire_versions(connexion, mois)):
+        try:
+            with connexion.begin_nested():
+                connexion.execute(versions.insert().values(mois=cle, version=1))
+        except IntegrityError:
+            # Ligne créée par une écriture concurrente sur le même mois
+            connexion.execute(
+                versions.update().where(versions.c.mois == cle).values(version=versions.c.version + 1)
+            )
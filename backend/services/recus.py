@@ -0,0 +1,92 @@
+"""
+Numérotation des reçus de paiement côté serveur : PREFIXE-AAAA-000123.
+
+Chaque processus réserve les numéros par blocs de RECU_TAILLE_BLOC (20 par
+défaut) dans la table sequences_recus : une transaction courte, sur une
+connexion séparée de celle de la requête, avance le compteur de la ligne
+(préfixe, année) d'un bloc par un UPDATE relatif (qui pose le verrou de
+ligne), relit la nouvelle valeur et valide aussitôt. Les numéros du bloc
+sont ensuite distribués en mémoire sous un verrou : la ligne n'est
+verrouillée qu'une fois par bloc, pas à chaque paiement, et deux caissiers
+ne peuvent jamais obtenir le même numéro.
+
+Les numéros sont uniques et croissants au sein d'un processus, mais la
+séquence globale peut avoir des trous : numéros restants d'un bloc quand
+le processus s'arrête, paiement annulé après attribution du numéro.
+RECU_TAILLE_BLOC=1 limite les trous au second cas, au prix d'un verrou par
+paiement.
+
+Un numéro saisi par le client ne peut pas emprunter la forme des numéros du
+serveur (numero_reserve) : il entrerait en collision avec une attribution
+ultérieure de la séquence.
+"""
+import os
+import re
+import threading
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models.sequence_recu import SequenceRecu
+
+PREFIXE_PAR_DEFAUT = os.getenv("RECU_PREFIXE", "REC")
+TAILLE_BLOC = int(os.getenv("RECU_TAILLE_BLOC", "20"))
+
+sequences = SequenceRecu.__table__
+_FORMAT_SERVEUR = re.compile(rf"{re.escape(PREFIXE_PAR_DEFAUT)}-\d{{4}}-\d+", re.IGNORECASE)
+
+
+class NumerotationIndisponible(RuntimeError):
+    pass
+
+
+def numero_reserve(recu):
+    """Vrai si `recu` a la forme des numéros attribués par le serveur (REC-AAAA-000123)."""
+    return isinstance(recu, str) and _FORMAT_SERVEUR.fullmatch(recu.strip()) is not None
+
+
+class AllocateurRecus:
+    def __init__(self, taille_bloc):
+        self.taille_bloc = max(1, taille_bloc)
+        self._blocs = {}   # (prefixe, annee) -> [prochain, fin (exclue)]
+        self._verrou = threading.Lock()
+
+    def _reserver_bloc(self, prefixe, annee):
+        """Réserve [debut, debut + taille_bloc) dans une transaction indépendante."""
+        ligne = (sequences.c.prefixe == prefixe, sequences.c.annee == annee)
+        for _ in range(2):
+            try:
+                with db.engine.begin() as connexion:
+                    # L'UPDATE relatif pose le verrou avant la lecture : deux processus
+                    # ne peuvent pas lire la même valeur puis la réécrire
+                    avance = connexion.execute(
+                        sequences.update().where(*ligne).values(prochain=sequences.c.prochain + self.taille_bloc)
+                    )
+                    if avance.rowcount == 0:
+                        connexion.execute(sequences.insert().values(
+                            prefixe=prefixe, annee=annee, prochain=1 + self.taille_bloc
+                        ))
+                        return 1
+                    prochain = connexion.execute(select(sequences.c.prochain).where(*ligne)).scalar()
+                    return prochain - self.taille_bloc
+            except IntegrityError:
+                # Un autre processus a créé la ligne de l'année en même temps : on relit
+                continue
+        raise NumerotationIndisponible("Impossible de réserver un bloc de numéros de reçu")
+
+    def suivant(self, prefixe=PREFIXE_PAR_DEFAUT, annee=None):
+        annee = annee or date.today().year
+        cle = (prefixe, annee)
+        with self._verrou:
+            bloc = self._blocs.get(cle)
+            if bloc is None or bloc[0] >= bloc[1]:
+                debut = self._reserver_bloc(prefixe, annee)
+                bloc = self._blocs[cle] = [debut, debut + self.taille_bloc]
+            numero = bloc[0]
+            bloc[0] += 1
+        return f"{prefixe}-{annee}-{numero:06d}"
+
+
+allocateur_recus = AllocateurRecus(TAILLE_BLOC)
@@ -0,0 +1,108 @@
+"""
+Liste des jetons JWT révoqués (déconnexion).
+
+Le contrôle effectué par le blocklist loader de JWTManager à chaque requête
+@jwt_required() est une recherche dans un dict en mémoire (jti -> expiration).
+Les entrées sont évincées dès que le jeton aurait de toute façon expiré (tas
+trié par expiration).
+
+Avec JWT_REVOCATION_SQL=1 (défaut), chaque révocation est aussi écrite dans
+la table jetons_revoques et chaque worker relit les révocations récentes au
+plus toutes les JWT_REVOCATION_SYNC secondes : une déconnexion faite sur un
+autre worker est prise en compte après ce délai au maximum.
+"""
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from database import db
+from models.jeton_revoque import JetonRevoque
+
+jetons = JetonRevoque.__table__
+
+
+def _maintenant_utc():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RegistreRevocations:
+    def __init__(self, persistance=True, intervalle_sync=5.0):
+        self.persistance = persistance
+        self.intervalle_sync = intervalle_sync
+        self._revoques = {}       # jti -> expiration (timestamp)
+        self._expirations = []    # tas (expiration, jti)
+        self._verrou = threading.Lock()
+        self._prochaine_sync = 0.0
+        self._derniere_revocation_lue = None
+
+    def _ajouter(self, jti, expiration):
+        with self._verrou:
+            if jti not in self._revoques:
+                self._revoques[jti] = expiration
+                heapq.heappush(self._expirations, (expiration, jti))
+
+    def _evincer(self, maintenant):
+        with self._verrou:
+            while self._expirations and self._expirations[0][0] <= maintenant:
+                _, jti = heapq.heappop(self._expirations)
+                self._revoques.pop(jti, None)
+
+    def revoquer(self, jti, expiration, utilisateur_id=None):
+        """expiration : timestamp `exp` du jeton."""
+        self._ajouter(jti, expiration)
+        if not self.persistance:
+            return
+        with db.engine.begin() as connexion:
+            deja = connexion.execute(select(jetons.c.jti).where(jetons.c.jti == jti)).first()
+            if not deja:
+                connexion.execute(jetons.insert().values(
+                    jti=jti,
+                    utilisateur_id=utilisateur_id,
+                    expiration=datetime.fromtimestamp(expiration, timezone.utc).replace(tzinfo=None),
+                    date_revocation=_maintenant_utc()
+                ))
+
+    def est_revoque(self, jti):
+        maintenant = time.time()
+        if self._expirations and self._expirations[0][0] <= maintenant:
+            self._evincer(maintenant)
+        if self.persistance and time.monotonic() >= self._prochaine_sync:
+            self.synchroniser()
+        return jti in self._revoques
+
+    def synchroniser(self):
+        """Charge les révocations faites par les autres workers et purge les lignes expirées."""
+        self._prochaine_sync = time.monotonic() + self.intervalle_sync
+        maintenant = _maintenant_utc()
+        requete = select(jetons.c.jti, jetons.c.expiration, jetons.c.date_revocation).where(
+            jetons.c.expiration > maintenant
+        )
+        if self._derniere_revocation_lue is not None:
+            # Marge pour les horloges légèrement décalées entre workers
+            requete = requete.where(
+                jetons.c.date_revocation >= self._derniere_revocation_lue - timedelta(seconds=self.intervalle_sync)
+            )
+
+        with db.engine.begin() as connexion:
+            for jti, expiration, date_revocation in connexion.execute(requete):
+                self._ajouter(jti, expiration.replace(tzinfo=timezone.utc).timestamp())
+                if self._derniere_revocation_lue is None or date_revocation > self._derniere_revocation_lue:
+                    self._derniere_revocation_lue = date_revocation
+            if self._derniere_revocation_lue is None:
+                self._derniere_revocation_lue = maintenant
+            connexion.execute(delete(jetons).where(jetons.c.expiration <= maintenant))
+
+
+registre_revocations = RegistreRevocations(
+    persistance=os.getenv("JWT_REVOCATION_SQL", "1").lower() in ("1", "true", "oui"),
+    intervalle_sync=float(os.getenv("JWT_REVOCATION_SYNC", 5)),
+)
+
+
+def jeton_revoque(jwt_header, jwt_payload):
+    """Callback du token_in_blocklist_loader de JWTManager."""
+    return registre_revocations.est_revoque(jwt_payload["jti"])
@@ -0,0 +1,111 @@
+"""
+Solveur d'emploi du temps (fonctions pures, sans accès base : exécutables
+dans un pool de processus).
+
+Problème (dict sérialisable) :
+    jours    : ["Lundi", ...]
+    plages   : [(debut_minutes, fin_minutes), ...]         plages horaires d'une journée
+    besoins  : [(classe_id, matiere_id, minutes), ...]      volume hebdomadaire à placer
+    qualifies: {matiere_id: [enseignant_id, ...]}
+    salles   : {classe_id: salle}
+    occupes  : [(jour_index, plage_index, type_ressource, valeur), ...]   déjà pris (autres classes)
+
+Heuristique : affectation d'un enseignant par (classe, matière) en équilibrant
+les charges, puis placement glouton des séances les plus contraintes d'abord,
+en étalant chaque matière sur la semaine. Redémarrages aléatoires jusqu'à
+l'échéance ; la meilleure solution (moins de minutes non placées) est gardée.
+"""
+import random
+import time
+from collections import defaultdict
+
+
+def _affecter_enseignants(probleme, rng):
+    charges = defaultdict(int)
+    affectation = {}
+    # Les matières avec le moins d'enseignants qualifiés d'abord
+    besoins = sorted(
+        probleme["besoins"],
+        key=lambda b: (len(probleme["qualifies"].get(b[1], [])), -b[2], rng.random())
+    )
+    for classe_id, matiere_id, minutes in besoins:
+        candidats = probleme["qualifies"].get(matiere_id, [])
+        if not candidats:
+            continue
+        enseignant_id = min(candidats, key=lambda e: (charges[e], rng.random()))
+        affectation[(classe_id, matiere_id)] = enseignant_id
+        charges[enseignant_id] += minutes
+    return affectation
+
+
+def _essai(probleme, rng):
+    jours, plages = probleme["jours"], probleme["plages"]
+    occupes = {tuple(o) for o in probleme["occupes"]}
+    affectation = _affecter_enseignants(probleme, rng)
+
+    # Séances à placer : une entrée par (classe, matière), découpée au fil des plages
+    restants = {}
+    for classe_id, matiere_id, minutes in probleme["besoins"]:
+        restants[(classe_id, matiere_id)] = restants.get((classe_id, matiere_id), 0) + minutes
+
+    par_jour = defaultdict(int)   # (classe, matiere, jour) -> séances ce jour-là
+    creneaux = []
+    toutes_plages = [(j, p) for j in range(len(jours)) for p in range(len(plages))]
+
+    # Ordre : enseignants les plus chargés / matières les plus lourdes d'abord
+    ordre = sorted(restants, key=lambda cle: (-restants[cle], rng.random()))
+    progression = True
+    while progression:
+        progression = False
+        for cle in ordre:
+            if restants[cle] <= 0 or cle not in affectation:
+                continue
+            classe_id, matiere_id = cle
+            enseignant_id = affectation[cle]
+            salle = probleme["salles"].get(classe_id)
+
+            libres = [
+                (j, p) for j, p in toutes_plages
+                if (j, p, "classe", classe_id) not in occupes
+                and (j, p, "enseignant", enseignant_id) not in occupes
+                and (salle is None or (j, p, "salle", salle) not in occupes)
+            ]
+            if not libres:
+                continue
+            # Étaler la matière sur la semaine, puis hasard
+            j, p = min(libres, key=lambda jp: (par_jour[(classe_id, matiere_id, jp[0])], rng.random()))
+
+            occupes.add((j, p, "classe", classe_id))
+            occupes.add((j, p, "enseignant", enseignant_id))
+            if salle is not None:
+                occupes.add((j, p, "salle", salle))
+            par_jour[(classe_id, matiere_id, j)] += 1
+            debut, fin = plages[p]
+            restants[cle] -= fin - debut
+            creneaux.append((j, p, classe_id, enseignant_id, matiere_id))
+            progression = True
+
+    non_places = [
+        (classe_id, matiere_id, minutes, (classe_id, matiere_id) in affectation)
+        for (classe_id, matiere_id), minutes in restants.items() if minutes > 0
+    ]
+    return creneaux, non_places
+
+
+def resoudre(probleme, graine, echeance, essais_max=50):
+    """
+    Lance des essais aléatoires jusqu'à `echeance` (time.time()) ou `essais_max`.
+    Retourne (creneaux, non_places, nombre_essais) pour la meilleure solution.
+    """
+    rng = random.Random(graine)
+    meilleure = None
+    essais = 0
+    while essais < essais_max and (meilleure is None or time.time() < echeance):
+        creneaux, non_places = _essai(probleme, rng)
+        essais += 1
+        manque = sum(minutes for _, _, minutes, _ in non_places)
+        if meilleure is None or manque < meilleure[0]:
+            meilleure = (manque, creneaux, non_places)
+        if manque == 0:
+            break
+    return meilleure[1], meilleure[2], essais
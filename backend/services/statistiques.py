@@ -0,0 +1,225 @@
+"""
+Compteurs pré-agrégés du tableau de bord.
+
+Chaque insertion / modification / suppression d'Eleve, Paiement ou Depense
+produit des deltas (nombre, montant) appliqués dans la même transaction
+par un écouteur after_flush : la lecture des statistiques devient une simple
+lecture de la table statistiques_compteurs.
+"""
+from collections import defaultdict
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.classe import Classe
+from models.depense import Depense
+from models.eleve import Eleve
+from models.paiement import Paiement
+from models.statistique import StatistiqueCompteur
+
+TOTAL = "total"
+STATUT_REGLE = "réglé"
+
+CHAMPS_ELEVE = ("sexe", "classe_id")
+CHAMPS_PAIEMENT = ("montant", "periode", "methode", "statut")
+CHAMPS_DEPENSE = ("montant", "type", "date")
+
+compteurs = StatistiqueCompteur.__table__
+
+
+# ---------------------------------------------------------------------------
+# Deltas par entité
+# ---------------------------------------------------------------------------
+
+def deltas_eleve(etat, signe, niveaux):
+    """etat : dict(sexe, classe_id) ; niveaux : {classe_id: niveau}."""
+    deltas = [
+        ("eleves", TOTAL, signe, 0),
+        ("eleves_sexe", etat["sexe"], signe, 0),
+        ("eleves_classe", str(etat["classe_id"]), signe, 0),
+    ]
+    niveau = niveaux.get(etat["classe_id"])
+    if niveau is not None:
+        deltas.append(("eleves_niveau", niveau, signe, 0))
+    return deltas
+
+
+def deltas_paiement(etat, signe):
+    montant = float(etat["montant"] or 0) * signe
+    statut = etat["statut"] or STATUT_REGLE
+    deltas = [
+        ("paiements", TOTAL, signe, montant),
+        ("paiements_periode", etat["periode"], signe, montant),
+        ("paiements_methode", etat["methode"] or "inconnue", signe, montant),
+        ("paiements_statut", statut, signe, montant),
+    ]
+    if statut != STATUT_REGLE:
+        deltas.append(("paiements_en_attente", TOTAL, signe, montant))
+    return deltas
+
+
+def deltas_depense(etat, signe):
+    montant = float(etat["montant"] or 0) * signe
+    deltas = [
+        ("depenses", TOTAL, signe, montant),
+        ("depenses_type", etat["type"], signe, montant),
+    ]
+    if etat["date"] is not None:
+        deltas.append(("depenses_mois", etat["date"].strftime("%Y-%m"), signe, montant))
+    return deltas
+
+
+def appliquer_deltas(connexion, deltas):
+    """Agrège puis applique les deltas (categorie, cle, nombre, montant) sur la connexion donnée."""
+    cumul = defaultdict(lambda: [0, 0.0])
+    for categorie, cle, nombre, montant in deltas:
+        cumul[(categorie, str(cle))][0] += nombre
+        cumul[(categorie, str(cle))][1] += montant
+
+    for (categorie, cle), (nombre, montant) in cumul.items():
+        if nombre == 0 and montant == 0:
+            continue
+        resultat = connexion.execute(
+            compteurs.update()
+            .where(compteurs.c.categorie == categorie, compteurs.c.cle == cle)
+            .values(nombre=compteurs.c.nombre + nombre, montant=compteurs.c.montant + montant)
+        )
+        if resultat.rowcount == 0:
+            connexion.execute(
+                compteurs.insert().values(categorie=categorie, cle=cle, nombre=nombre, montant=montant)
+            )
+
+
+def niveaux_des_classes(connexion, classe_ids):
+    classe_ids = {i for i in classe_ids if i is not None}
+    if not classe_ids:
+        return {}
+    lignes = connexion.execute(select(Classe.id, Classe.niveau).where(Classe.id.in_(classe_ids)))
+    return {int(classe_id): niveau for classe_id, niveau in lignes}
+
+
+# ---------------------------------------------------------------------------
+# Écouteur de session
+# ---------------------------------------------------------------------------
+
+def _etat_actuel(objet, champs):
+    return {champ: getattr(objet, champ) for champ in champs}
+
+
+def _etat_precedent(objet, champs):
+    etat = inspect(objet)
+    valeurs = {}
+    for champ in champs:
+        historique = etat.attrs[champ].history
+        valeurs[champ] = historique.deleted[0] if historique.deleted else getattr(objet, champ)
+    return valeurs
+
+
+def _a_change(objet, champs):
+    etat = inspect(objet)
+    return any(etat.attrs[champ].history.has_changes() for champ in champs)
+
+
+def _normaliser_eleve(etat):
+    etat["classe_id"] = int(etat["classe_id"]) if etat["classe_id"] is not None else None
+    return etat
+
+
+@event.listens_for(Session, "after_flush")
+def _mettre_a_jour_compteurs(session, flush_context):
+    eleves = []     # (etat, signe)
+    deltas = []
+
+    for objet in session.new:
+        if isinstance(objet, Eleve):
+            eleves.append((_normaliser_eleve(_etat_actuel(objet, CHAMPS_ELEVE)), 1))
+        elif isinstance(objet, Paiement):
+            deltas += deltas_paiement(_etat_actuel(objet, CHAMPS_PAIEMENT), 1)
+        elif isinstance(objet, Depense):
+            deltas += deltas_depense(_etat_actuel(objet, CHAMPS_DEPENSE), 1)
+
+    for objet in session.deleted:
+        if isinstance(objet, Eleve):
+            eleves.append((_normaliser_eleve(_etat_precedent(objet, CHAMPS_ELEVE)), -1))
+        elif isinstance(objet, Paiement):
+            deltas += deltas_paiement(_etat_precedent(objet, CHAMPS_PAIEMENT), -1)
+        elif isinstance(objet, Depense):
+            deltas += deltas_depense(_etat_precedent(objet, CHAMPS_DEPENSE), -1)
+
+    changements_niveau = []
+    for objet in session.dirty:
+        if isinstance(objet, Eleve) and _a_change(objet, CHAMPS_ELEVE):
+            eleves.append((_normaliser_eleve(_etat_precedent(objet, CHAMPS_ELEVE)), -1))
+            eleves.append((_normaliser_eleve(_etat_actuel(objet, CHAMPS_ELEVE)), 1))
+        elif isinstance(objet, Paiement) and _a_change(objet, CHAMPS_PAIEMENT):
+            deltas += deltas_paiement(_etat_precedent(objet, CHAMPS_PAIEMENT), -1)
+            deltas += deltas_paiement(_etat_actuel(objet, CHAMPS_PAIEMENT), 1)
+        elif isinstance(objet, Depense) and _a_change(objet, CHAMPS_DEPENSE):
+            deltas += deltas_depense(_etat_precedent(objet, CHAMPS_DEPENSE), -1)
+            deltas += deltas_depense(_etat_actuel(objet, CHAMPS_DEPENSE), 1)
+        elif isinstance(objet, Classe) and _a_change(objet, ("niveau",)):
+            changements_niveau.append((objet.id, _etat_precedent(objet, ("niveau",))["niveau"], objet.niveau))
+
+    if not (eleves or deltas or changements_niveau):
+        return
+
+    connexion = session.connection()
+
+    if eleves:
+        niveaux = niveaux_des_classes(connexion, [etat["classe_id"] for etat, _ in eleves])
+        for etat, signe in eleves:
+            deltas += deltas_eleve(etat, signe, niveaux)
+
+    # Une classe qui change de niveau déplace tous ses élèves d'un compteur à l'autre
+    for classe_id, ancien, nouveau in changements_niveau:
+        effectif = connexion.execute(
+            select(func.count(Eleve.id)).where(Eleve.classe_id == classe_id)
+        ).scalar()
+        deltas += [("eleves_niveau", ancien, -effectif, 0), ("eleves_niveau", nouveau, effectif, 0)]
+
+    appliquer_deltas(connexion, deltas)
+
+
+# ---------------------------------------------------------------------------
+# Recalcul complet et lecture
+# ---------------------------------------------------------------------------
+
+def recalculer_statistiques():
+    """Reconstruit tous les compteurs à partir des tables sources (initialisation ou réparation)."""
+    session = db.session
+    deltas = []
+
+    for sexe, nombre in session.query(Eleve.sexe, func.count(Eleve.id)).group_by(Eleve.sexe):
+        deltas += [("eleves", TOTAL, nombre, 0), ("eleves_sexe", sexe, nombre, 0)]
+    for classe_id, nombre in session.query(Eleve.classe_id, func.count(Eleve.id)).group_by(Eleve.classe_id):
+        deltas.append(("eleves_classe", str(classe_id), nombre, 0))
+    for niveau, nombre in (
+        session.query(Classe.niveau, func.count(Eleve.id)).join(Eleve, Eleve.classe_id == Classe.id).group_by(Classe.niveau)
+    ):
+        deltas.append(("eleves_niveau", niveau, nombre, 0))
+
+    for periode, methode, statut, nombre, montant in session.query(
+        Paiement.periode, Paiement.methode, Paiement.statut, func.count(Paiement.id), func.sum(Paiement.montant)
+    ).group_by(Paiement.periode, Paiement.methode, Paiement.statut):
+        etat = {"montant": 1, "periode": periode, "methode": methode, "statut": statut}
+        deltas += [(c, k, nombre, (montant or 0) * m) for c, k, _, m in deltas_paiement(etat, 1)]
+
+    for type_depense, date, nombre, montant in session.query(
+        Depense.type, Depense.date, func.count(Depense.id), func.sum(Depense.montant)
+    ).group_by(Depense.type, Depense.date):
+        etat = {"montant": 1, "type": type_depense, "date": date}
+        deltas += [(c, k, nombre, (montant or 0) * m) for c, k, _, m in deltas_depense(etat, 1)]
+
+    connexion = session.connection()
+    connexion.execute(compteurs.delete())
+    appliquer_deltas(connexion, deltas)
+    session.commit()
+
+
+def lire_statistiques():
+    """Une seule lecture de la table de compteurs, regroupée par catégorie."""
+    resultat = defaultdict(dict)
+    for compteur in StatistiqueCompteur.query.all():
+        resultat[compteur.categorie][compteur.cle] = {"nombre": compteur.nombre, "montant": compteur.montant}
+    return resultat
@@ -0,0 +1,119 @@
+"""
+Benchmark des index de filtrage (migration e927871a6183).
+
+Peuple une école réaliste (par défaut 50 classes, 2 000 élèves, une année
+scolaire d'appel), mesure la latence des requêtes filtrées des routes avec
+les index, puis sans eux, et affiche les deux colonnes.
+
+    cd backend && python -m tests.benchmark_index [--classes 50] [--eleves 2000] [--jours 180]
+
+La base est vidée puis recréée : elle se choisit avec BENCHMARK_DATABASE_URL
+(SQLite temporaire par défaut), jamais avec la DATABASE_URL de l'application.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+_dossier = tempfile.mkdtemp(prefix="ecole-benchmark-")
+os.environ["DATABASE_URL"] = os.getenv("BENCHMARK_DATABASE_URL") or f"sqlite:///{os.path.join(_dossier, 'benchmark.db')}"
+os.environ["DB_REPLICA_URIS"] = ""
+
+from sqlalchemy import select, text  # noqa: E402
+
+from app import app  # noqa: E402
+from database import db  # noqa: E402
+from models.depense import Depense  # noqa: E402
+from models.eleve import Eleve  # noqa: E402
+from models.emploi_du_temps import EmploiDuTemps  # noqa: E402
+from models.enums import RoleUtilisateur  # noqa: E402
+from models.note import Note  # noqa: E402
+from models.paiement import Paiement  # noqa: E402
+from models.presence import Presence  # noqa: E402
+from models.utilisateur import Utilisateur  # noqa: E402
+from tests.donnees import peupler_ecole  # noqa: E402
+from tests.plans import index_utilises  # noqa: E402
+
+# Index ajoutés par la migration e927871a6183
+INDEX_MESURES = {
+    "ix_presences_classe_id_date", "ix_presences_eleve_id_date", "ix_presences_professeur_id_date",
+    "ix_presences_date", "ix_notes_eleve_id_matiere_id_periode", "ix_notes_matiere_id_periode",
+    "ix_notes_enseignant_id", "ix_paiements_eleve_id_periode", "ix_paiements_periode_statut",
+    "ix_paiements_statut", "ix_paiements_date_paiement", "ix_emplois_du_temps_classe_id_jour",
+    "ix_emplois_du_temps_enseignant_id_jour", "ix_depenses_date", "ix_depenses_type_date",
+    "ix_utilisateurs_role", "ix_eleves_classe_id",
+}
+DEBUT = date(2024, 9, 2)
+
+
+def requetes(ids):
+    classe_id, eleve_id = ids["classe_ids"][len(ids["classe_ids"]) // 2], ids["eleve_ids"][len(ids["eleve_ids"]) // 2]
+    mois = (DEBUT + timedelta(days=30), DEBUT + timedelta(days=60))
+    return {
+        "appel d'une classe (jour)": select(Presence).where(Presence.classe_id == classe_id, Presence.date == mois[0]),
+        "présences d'une classe (mois)": select(Presence).where(Presence.classe_id == classe_id, Presence.date.between(*mois)),
+        "présences d'un élève (mois)": select(Presence).where(Presence.eleve_id == eleve_id, Presence.date.between(*mois)),
+        "notes élève/matière/période": select(Note).where(
+            Note.eleve_id == eleve_id, Note.matiere_id == ids["matiere_ids"][0], Note.periode == "T1"),
+        "paiements d'un élève": select(Paiement).where(Paiement.eleve_id == eleve_id, Paiement.periode == "Octobre 2024"),
+        "impayés d'une période": select(Paiement).where(Paiement.periode == "Octobre 2024", Paiement.statut == "en attente"),
+        "emploi du temps d'une classe": select(EmploiDuTemps).where(
+            EmploiDuTemps.classe_id == classe_id, EmploiDuTemps.jour == "Lundi"),
+        "dépenses d'un type (mois)": select(Depense).where(Depense.type == "salaire", Depense.date.between(*mois)),
+        "enseignants": select(Utilisateur).where(Utilisateur.role == RoleUtilisateur.ENSEIGNANT),
+        "élèves d'une classe": select(Eleve).where(Eleve.classe_id == classe_id),
+    }
+
+
+def mesurer(requete, repetitions):
+    """Latence médiane en millisecondes."""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        db.session.execute(requete).all()
+        durees.append((time.perf_counter() - debut) * 1000)
+        db.session.expunge_all()
+    return sorted(durees)[len(durees) // 2]
+
+
+def supprimer_index():
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in INDEX_MESURES:
+                index.drop(db.engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--classes", type=int, default=50)
+    parser.add_argument("--eleves", type=int, default=2000)
+    parser.add_argument("--jours", type=int, default=180, help="jours d'appel (ouvrés)")
+    parser.add_argument("--repetitions", type=int, default=20)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"Base : {db.engine.url.render_as_string(hide_password=True)}")
+        db.drop_all()
+        db.create_all()
+        debut = time.perf_counter()
+        ids = peupler_ecole(nb_classes=args.classes, eleves_par_classe=max(1, args.eleves // args.classes),
+                            notes_par_eleve=12, jours_presence=args.jours, debut=DEBUT)
+        print(f"Peuplement : {time.perf_counter() - debut:.1f} s, "
+              f"{db.session.scalar(select(db.func.count(Presence.id)))} présences")
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+        mesures = requetes(ids)
+        avec = {nom: (mesurer(r, args.repetitions), sorted(index_utilises(r))) for nom, r in mesures.items()}
+        db.session.remove()
+        supprimer_index()
+        sans = {nom: mesurer(r, args.repetitions) for nom, r in mesures.items()}
+
+        print(f"\n{'requête':<32} {'sans index':>12} {'avec index':>12}  index utilisé")
+        for nom, (duree, index) in avec.items():
+            print(f"{nom:<32} {sans[nom]:>10.2f}ms {duree:>10.2f}ms  {', '.join(index) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Configuration commune des tests : l'application tourne sur une base SQLite
+temporaire (DATABASE_URL est lu par database.init_app), recréée à chaque test.
+
+Lancement, depuis backend/ :  python -m pytest -q
+"""
+import os
+import tempfile
+
+import pytest
+
+_dossier = tempfile.mkdtemp(prefix="ecole-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_dossier, 'principale.db')}"
+os.environ["DB_REPLICA_URIS"] = ""
+os.environ.pop("AUTH_LIMITEUR_REDIS_URL", None)
+os.environ["GENERATEUR_PROCESSUS"] = "1"
+# Comme derrière un reverse proxy : adresse client lue dans X-Forwarded-For (dernier saut)
+os.environ["PROXIES_DE_CONFIANCE"] = "1"
+# Synchronisation périodique de la liste de révocation : une fois par test (fixture app)
+os.environ["JWT_REVOCATION_SYNC"] = "3600"
+os.environ.setdefault("JWT_SECRET_KEY", "secret-de-test-suffisamment-long-pour-hs256")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import app as application  # noqa: E402
+from database import db  # noqa: E402
+from services.cache_reponses import cache_reponses  # noqa: E402
+from services.authentification import StockageMemoire, cache_roles, limiteur_compte, limiteur_ip  # noqa: E402
+from services.revocation import registre_revocations  # noqa: E402
+
+
+class CompteurRequetes:
+    """Compte les requêtes SQL émises sur le moteur principal pendant le bloc `with`."""
+
+    def __init__(self, moteur):
+        self.moteur = moteur
+        self.requetes = []
+        self.parametres = []
+
+    def _noter(self, connexion, curseur, instruction, parametres, contexte, executemany):
+        self.requetes.append(instruction)
+        self.parametres.append(parametres)
+
+    def __enter__(self):
+        registre_revocations.synchroniser()
+        event.listen(self.moteur, "before_cursor_execute", self._noter)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.moteur, "before_cursor_execute", self._noter)
+
+    @property
+    def nombre(self):
+        return len(self.requetes)
+
+
+@pytest.fixture
+def app():
+    application.config["TESTING"] = True
+    with application.app_context():
+        db.drop_all()
+        db.create_all()
+        cache_reponses.invalider(list(cache_reponses._generations) + ["classes", "matieres", "enseignants", "emplois"])
+        cache_roles.invalider()
+        registre_revocations.synchroniser()
+        # Seaux de connexion neufs : chaque test dispose de tout son quota
+        limiteur_ip.stockage = limiteur_compte.stockage = StockageMemoire()
+        yield application
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def entetes(app):
+    """En-têtes d'un administrateur authentifié (id 1, créé par peupler_ecole)."""
+    jeton = create_access_token(identity="1", additional_claims={"role": "admin"})
+    return {"Authorization": f"Bearer {jeton}"}
+
+
+@pytest.fixture
+def connecter(client):
+    """POST /api/auth/login ; renvoie la réponse."""
+    return lambda email, mot_de_passe: client.post(
+        "/api/auth/login", json={"email": email, "mot_de_passe": mot_de_passe}
+    )
+
+
+@pytest.fixture
+def compter_requetes(app):
+    return lambda: CompteurRequetes(db.engine)
@@ -0,0 +1,131 @@
+"""
+Jeu de données d'une école complète, inséré directement en base (sans passer
+par les routes). Utilisé par les tests et par le benchmark des index.
+"""
+from datetime import date, time, timedelta
+
+from sqlalchemy import insert
+
+from database import db
+from models.classe import Classe
+from models.depense import Depense
+from models.eleve import Eleve
+from models.emploi_du_temps import EmploiDuTemps
+from models.enums import RoleUtilisateur
+from models.enseignant import Enseignant
+from models.matiere import Matiere
+from models.note import Note
+from models.paiement import Paiement
+from models.presence import Presence
+from models.utilisateur import Utilisateur
+
+# Les comptes de test n'ont pas besoin d'un vrai hachage (lent) : personne ne s'y connecte
+MOT_DE_PASSE_FACTICE = "non-utilise"
+JOURS = ("Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi")
+PERIODES = ("Octobre 2024", "Novembre 2024", "Décembre 2024")
+METHODES = ("espèces", "Orange Money", "Wave")
+TYPES_DEPENSE = ("fourniture", "salaire", "entretien", "électricité", "transport")
+
+
+def _jours_ouvres(debut, nombre):
+    jours, courant = [], debut
+    while len(jours) < nombre:
+        if courant.weekday() < 5:
+            jours.append(courant)
+        courant += timedelta(days=1)
+    return jours
+
+
+def peupler_ecole(nb_classes=2, eleves_par_classe=5, notes_par_eleve=2, jours_presence=2,
+                  debut=date(2024, 10, 1)):
+    """Crée un administrateur (id 1), des enseignants, classes, élèves, notes,
+    présences, paiements et dépenses. Les lignes volumineuses sont insérées en
+    masse ; les compteurs et agrégats sont ensuite recalculés.
+    Renvoie les identifiants utiles aux tests."""
+    from services.assiduite import recalculer_agregat
+    from services.echeances import recalculer_echeances
+    from services.statistiques import recalculer_statistiques
+
+    session = db.session
+    admin = Utilisateur(email="admin@ecole.sn", nom="Admin", prenom="Ecole",
+                        role=RoleUtilisateur.ADMIN, mot_de_passe=MOT_DE_PASSE_FACTICE)
+    session.add(admin)
+
+    matieres = [Matiere(nom=f"Matière {i}", code=f"MAT{i}") for i in range(4)]
+    session.add_all(matieres)
+    session.flush()
+
+    enseignants = []
+    for i in range(nb_classes):
+        compte = Utilisateur(email=f"prof{i}@ecole.sn", nom="Prof", prenom=str(i),
+                             role=RoleUtilisateur.ENSEIGNANT, mot_de_passe=MOT_DE_PASSE_FACTICE)
+        enseignants.append(Enseignant(nom="Prof", prenom=str(i), matricule=f"ENS{i:04d}",
+                                      utilisateur=compte, matieres=matieres[:2]))
+    session.add_all(enseignants)
+    session.flush()
+
+    classes = [
+        Classe(nom=f"Classe {i}", salle=f"S{i}", niveau=("6e", "5e", "4e", "3e")[i % 4],
+               annee_scolaire="2024-2025", enseignant_principal_id=enseignants[i].id)
+        for i in range(nb_classes)
+    ]
+    session.add_all(classes)
+    session.flush()
+
+    eleves = []
+    for i, classe in enumerate(classes):
+        for j in range(eleves_par_classe):
+            n = i * eleves_par_classe + j
+            parent = Utilisateur(email=f"parent{n}@ecole.sn", nom=f"Parent{n}", prenom="P",
+                                 role=RoleUtilisateur.PARENT, mot_de_passe=MOT_DE_PASSE_FACTICE)
+            compte = Utilisateur(email=f"eleve{n}@ecole.sn", nom=f"Nom{n}", prenom=f"Prenom{n}",
+                                 role=RoleUtilisateur.ELEVE, mot_de_passe=MOT_DE_PASSE_FACTICE)
+            eleves.append(Eleve(nom=f"Nom{n}", prenom=f"Prenom{n}", matricule=f"MAT{n:05d}",
+                                sexe="MF"[n % 2], classe=classe, utilisateur=compte, parent=parent))
+    session.add_all(eleves)
+    session.flush()
+
+    for i, classe in enumerate(classes):
+        for k, jour in enumerate(JOURS):
+            session.add(EmploiDuTemps(jour=jour, heure_debut=time(8 + k % 2), heure_fin=time(10 + k % 2),
+                                      classe_id=classe.id, enseignant_id=enseignants[i].id,
+                                      matiere_id=matieres[k % 2].id))
+
+    jours = _jours_ouvres(debut, jours_presence)
+    notes, presences, paiements, depenses = [], [], [], []
+    for n, eleve in enumerate(eleves):
+        professeur_id = enseignants[classes.index(eleve.classe)].id
+        for k in range(notes_par_eleve):
+            notes.append({"valeur": 8 + (n + k) % 12, "type": f"devoir {k // 2 + 1}", "periode": "T1",
+                          "eleve_id": eleve.id, "matiere_id": matieres[k % 2].id,
+                          "enseignant_id": professeur_id})
+        for k, jour in enumerate(jours):
+            presences.append({"eleve_id": eleve.id, "classe_id": eleve.classe_id,
+                              "professeur_id": professeur_id, "date": jour,
+                              "statut": "absent" if (n + k) % 7 == 0 else "present",
+                              "justifiee": False})
+        paiements.append({"eleve_id": eleve.id, "montant": 10000, "periode": PERIODES[n % len(PERIODES)],
+                          "methode": METHODES[n % len(METHODES)],
+                          "statut": "en attente" if n % 5 == 0 else "réglé", "recu": f"REC-T-{n:06d}",
+                          "date_paiement": debut + timedelta(days=n % 20)})
+    for k, jour in enumerate(jours):
+        depenses.append({"libelle": f"Dépense {k}", "montant": 5000 + 1000 * (k % 3),
+                         "type": TYPES_DEPENSE[k % len(TYPES_DEPENSE)], "date": jour})
+
+    for modele, lignes in ((Note, notes), (Presence, presences), (Paiement, paiements), (Depense, depenses)):
+        for i in range(0, len(lignes), 5000):
+            session.execute(insert(modele), lignes[i:i + 5000])
+    session.commit()
+
+    recalculer_statistiques()
+    recalculer_agregat()
+    recalculer_echeances()
+
+    return {
+        "admin_id": admin.id,
+        "classe_ids": [c.id for c in classes],
+        "eleve_ids": [e.id for e in eleves],
+        "enseignant_ids": [e.id for e in enseignants],
+        "matiere_ids": [m.id for m in matieres],
+        "parent_ids": [e.parent_id for e in eleves],
+    }
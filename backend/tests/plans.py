@@ -0,0 +1,28 @@
+"""Lecture du plan d'exécution d'une requête (SQLite ou MySQL)."""
+from database import db
+
+
+def plan_sql(sql, parametres=()):
+    """Plan d'une instruction SQL déjà compilée (par exemple capturée pendant une requête HTTP)."""
+    connexion = db.session.connection()
+    if db.engine.dialect.name == "sqlite":
+        lignes = connexion.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parametres).all()
+        return "\n".join(ligne[-1] for ligne in lignes)
+    lignes = connexion.exec_driver_sql("EXPLAIN " + sql, parametres).mappings().all()
+    return "\n".join(f"{ligne['table']} key={ligne['key']} type={ligne['type']}" for ligne in lignes)
+
+
+def plan_execution(requete):
+    """Plan choisi par la base pour une requête SQLAlchemy (une ligne par étape)."""
+    dialecte = db.engine.dialect
+    return plan_sql(str(requete.compile(dialect=dialecte, compile_kwargs={"literal_binds": True})))
+
+
+def noms_index(plan):
+    mots = plan.replace("=", " ").replace("(", " ").split()
+    return {mot for mot in mots if mot.startswith("ix_")}
+
+
+def index_utilises(requete):
+    """Noms des index apparaissant dans le plan."""
+    return noms_index(plan_execution(requete))
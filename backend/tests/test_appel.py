@@ -0,0 +1,104 @@
+"""Appel d'une classe (POST /api/presences/appel) : normalisation des lignes et renvois du même appel."""
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import routes.Presence_route as presence_route
+from database import db
+from models.presence import Presence
+from models.presence_journaliere import PresenceJournaliere
+from tests.donnees import peupler_ecole
+
+JOUR = "2024-11-04"
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole(jours_presence=0)
+
+
+def _corps(ecole, lignes):
+    return {"classe_id": ecole["classe_ids"][0], "professeur_id": ecole["enseignant_ids"][0],
+            "date": JOUR, "presences": lignes}
+
+
+def _lignes(ecole, statut="present"):
+    # Les 5 élèves de la première classe
+    return [{"eleve_id": eleve_id, "statut": statut} for eleve_id in ecole["eleve_ids"][:5]]
+
+
+def _nombre_presences():
+    return db.session.scalar(select(func.count(Presence.id)))
+
+
+def _total_agrege():
+    return db.session.scalar(select(func.coalesce(func.sum(PresenceJournaliere.total), 0)))
+
+
+def test_identifiants_en_texte(client, entetes, ecole):
+    lignes = [{"eleve_id": str(ligne["eleve_id"]), "statut": "absent"} for ligne in _lignes(ecole)]
+    corps = {**_corps(ecole, lignes), "classe_id": str(ecole["classe_ids"][0])}
+
+    reponse = client.post("/api/presences/appel", headers=entetes, json=corps)
+
+    assert reponse.status_code == 201, reponse.get_json()
+    assert reponse.get_json()["crees"] == 5
+    assert _nombre_presences() == 5
+
+
+@pytest.mark.parametrize("ligne", [
+    {"eleve_id": [1], "statut": "present"},
+    {"eleve_id": 1, "statut": ["present"]},
+    {"eleve_id": "abc", "statut": "present"},
+    "1",
+])
+def test_lignes_invalides(client, entetes, ecole, ligne):
+    reponse = client.post("/api/presences/appel", headers=entetes, json=_corps(ecole, [ligne]))
+    assert reponse.status_code == 400, reponse.get_json()
+
+
+def test_meme_eleve_en_entier_et_en_texte(client, entetes, ecole):
+    eleve_id = ecole["eleve_ids"][0]
+    lignes = [{"eleve_id": eleve_id, "statut": "present"}, {"eleve_id": str(eleve_id), "statut": "absent"}]
+
+    reponse = client.post("/api/presences/appel", headers=entetes, json=_corps(ecole, lignes))
+
+    assert reponse.status_code == 400
+    assert "plusieurs fois" in reponse.get_json()["error"]
+
+
+def test_appel_renvoye(client, entetes, ecole):
+    assert client.post("/api/presences/appel", headers=entetes, json=_corps(ecole, _lignes(ecole))).status_code == 201
+
+    reponse = client.post("/api/presences/appel", headers=entetes, json=_corps(ecole, _lignes(ecole, "retard")))
+
+    assert reponse.status_code == 200, reponse.get_json()
+    assert (reponse.get_json()["crees"], reponse.get_json()["mis_a_jour"]) == (0, 5)
+    assert _nombre_presences() == 5 and _total_agrege() == 5
+    assert set(db.session.scalars(select(Presence.statut))) == {"retard"}
+
+
+def test_appel_renvoye_en_parallele(client, entetes, ecole, monkeypatch):
+    inserer = presence_route.insert
+    premier = []
+
+    def inserer_apres_un_renvoi(modele):
+        # Le même appel, renvoyé par une autre requête, est validé juste avant notre insertion
+        if not premier:
+            premier.append(True)
+            with Session(db.engine) as autre:
+                autre.add_all(Presence(eleve_id=ligne["eleve_id"], classe_id=ecole["classe_ids"][0],
+                                       professeur_id=ecole["enseignant_ids"][0], date=date(2024, 11, 4),
+                                       statut="present") for ligne in _lignes(ecole))
+                autre.commit()
+        return inserer(modele)
+
+    monkeypatch.setattr(presence_route, "insert", inserer_apres_un_renvoi)
+    reponse = client.post("/api/presences/appel", headers=entetes, json=_corps(ecole, _lignes(ecole, "absent")))
+
+    assert reponse.status_code == 200, reponse.get_json()
+    assert (reponse.get_json()["crees"], reponse.get_json()["mis_a_jour"]) == (0, 5)
+    assert _nombre_presences() == 5 and _total_agrege() == 5
+    assert set(db.session.scalars(select(Presence.statut))) == {"absent"}
@@ -0,0 +1,60 @@
+"""Séries d'absences consécutives : un jour compte une fois, quel que soit le nombre de séances."""
+from datetime import date
+
+import pytest
+
+from database import db
+from models.presence import Presence
+from services.assiduite import series_absences
+from tests.donnees import peupler_ecole
+
+LUNDI, MARDI, MERCREDI, JEUDI = (date(2024, 11, j) for j in (4, 5, 6, 7))
+NOVEMBRE = (date(2024, 11, 1), date(2024, 11, 30))
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole(nb_classes=3, jours_presence=0)
+
+
+def _appel(ecole, eleve_id, jour, *statuts):
+    """Une présence par séance du jour ; une séance par classe (une présence par élève, classe et jour)."""
+    for classe_id, enseignant_id, statut in zip(ecole["classe_ids"], ecole["enseignant_ids"], statuts):
+        db.session.add(Presence(eleve_id=eleve_id, classe_id=classe_id,
+                                professeur_id=enseignant_id, date=jour, statut=statut))
+    db.session.commit()
+
+
+def test_plusieurs_seances_un_seul_jour(ecole):
+    eleve_id = ecole["eleve_ids"][0]
+    _appel(ecole, eleve_id, LUNDI, "absent", "absent", "absent")
+    _appel(ecole, eleve_id, MARDI, "present", "present")
+
+    assert series_absences(*NOVEMBRE, seuil=2) == []
+    assert series_absences(*NOVEMBRE, seuil=1) == [
+        {"eleve_id": eleve_id, "debut": "2024-11-04", "fin": "2024-11-04", "jours": 1}
+    ]
+
+
+def test_jour_absent_si_une_seance_absente(ecole):
+    eleve_id = ecole["eleve_ids"][0]
+    _appel(ecole, eleve_id, LUNDI, "present", "absent")
+    _appel(ecole, eleve_id, MARDI, "absent", "absent")
+    _appel(ecole, eleve_id, MERCREDI, "absent")
+    _appel(ecole, eleve_id, JEUDI, "present")
+
+    assert series_absences(*NOVEMBRE, seuil=3) == [
+        {"eleve_id": eleve_id, "debut": "2024-11-04", "fin": "2024-11-06", "jours": 3}
+    ]
+
+
+def test_jour_present_coupe_la_serie(ecole):
+    eleve_id = ecole["eleve_ids"][0]
+    _appel(ecole, eleve_id, LUNDI, "absent")
+    _appel(ecole, eleve_id, MARDI, "present")
+    _appel(ecole, eleve_id, MERCREDI, "absent", "absent")
+    _appel(ecole, eleve_id, JEUDI, "absent")
+
+    assert series_absences(*NOVEMBRE, seuil=2) == [
+        {"eleve_id": eleve_id, "debut": "2024-11-06", "fin": "2024-11-07", "jours": 2}
+    ]
@@ -0,0 +1,90 @@
+"""
+Conflits d'emploi du temps : validation de POST /api/emplois/verifier, et
+contrôle en base avant enregistrement quand l'index en mémoire est périmé
+(créneaux écrits par un autre worker, sans invalidation dans ce processus).
+"""
+from datetime import time
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from database import db
+from models.emploi_du_temps import EmploiDuTemps
+from tests.donnees import peupler_ecole
+
+
+@pytest.fixture
+def ecole(app):
+    # Classe i, enseignant i : le lundi de 08:00 à 10:00
+    return peupler_ecole()
+
+
+def _lundi(ecole, classe=0):
+    return db.session.scalar(select(EmploiDuTemps.id).where(
+        EmploiDuTemps.classe_id == ecole["classe_ids"][classe], EmploiDuTemps.jour == "Lundi"
+    ))
+
+
+def _creneau(ecole, debut, fin, classe=0, enseignant=0, **extra):
+    return {"jour": "Lundi", "heure_debut": debut, "heure_fin": fin, "classe_id": ecole["classe_ids"][classe],
+            "enseignant_id": ecole["enseignant_ids"][enseignant], "matiere_id": ecole["matiere_ids"][0], **extra}
+
+
+def _verifier(client, entetes, *creneaux):
+    return client.post("/api/emplois/verifier", headers=entetes, json={"creneaux": list(creneaux)})
+
+
+@pytest.mark.parametrize("conversion", [int, str])
+def test_deplacement_id_entier_ou_texte(client, entetes, ecole, conversion):
+    reponse = _verifier(client, entetes, _creneau(ecole, "09:00", "11:00", id=conversion(_lundi(ecole))))
+
+    assert reponse.status_code == 200
+    assert reponse.get_json() == {"valide": True, "conflits": []}
+
+
+@pytest.mark.parametrize("extra", [{"id": [1]}, {"id": "onze"}, {"jour": 1}, {"jour": " "}])
+def test_creneau_invalide(client, entetes, ecole, extra):
+    assert _verifier(client, entetes, {**_creneau(ecole, "09:00", "11:00"), **extra}).status_code == 400
+
+
+def test_creneau_ecrit_par_un_autre_worker(client, entetes, ecole):
+    assert _verifier(client, entetes, _creneau(ecole, "14:00", "15:00", enseignant=1)).get_json()["valide"]
+
+    # Autre worker : écriture hors de la session de ce processus, index non invalidé
+    with db.engine.begin() as connexion:
+        connexion.execute(insert(EmploiDuTemps).values(
+            jour="Lundi", heure_debut=time(14), heure_fin=time(16), classe_id=ecole["classe_ids"][1],
+            enseignant_id=ecole["enseignant_ids"][1], matiere_id=ecole["matiere_ids"][0]
+        ))
+
+    reponse = client.post("/api/emplois", headers=entetes, json=_creneau(ecole, "15:00", "16:00", enseignant=1))
+
+    assert reponse.status_code == 409, reponse.get_json()
+    assert {c["ressource"] for c in reponse.get_json()["conflits"]} == {"enseignant"}
+    # L'index divergent a été invalidé : la vérification voit maintenant le créneau
+    assert not _verifier(client, entetes, _creneau(ecole, "15:00", "16:00", enseignant=1)).get_json()["valide"]
+
+
+def test_creneau_supprime_par_un_autre_worker(client, entetes, ecole):
+    assert not _verifier(client, entetes, _creneau(ecole, "08:00", "10:00")).get_json()["valide"]
+
+    with db.engine.begin() as connexion:
+        connexion.execute(delete(EmploiDuTemps).where(EmploiDuTemps.id == _lundi(ecole)))
+
+    reponse = client.post("/api/emplois", headers=entetes, json=_creneau(ecole, "08:00", "10:00"))
+    assert reponse.status_code == 201, reponse.get_json()
+
+
+def test_modification_controlee_en_base(client, entetes, ecole):
+    _verifier(client, entetes, _creneau(ecole, "14:00", "15:00"))
+    with db.engine.begin() as connexion:
+        connexion.execute(insert(EmploiDuTemps).values(
+            jour="lundi ", heure_debut=time(14), heure_fin=time(15), classe_id=ecole["classe_ids"][0],
+            enseignant_id=ecole["enseignant_ids"][1], matiere_id=ecole["matiere_ids"][0]
+        ))
+
+    reponse = client.put(f"/api/emplois/{_lundi(ecole)}", headers=entetes,
+                         json={"heure_debut": "13:00", "heure_fin": "15:00"})
+
+    assert reponse.status_code == 409, reponse.get_json()
+    assert {c["ressource"] for c in reponse.get_json()["conflits"]} == {"classe", "salle"}
@@ -0,0 +1,81 @@
+"""Chemin de connexion : coût de vérification identique pour tous les comptes, limitation."""
+import pytest
+
+import models.utilisateur as module_utilisateur
+from database import db
+from models.enums import RoleUtilisateur
+from models.utilisateur import Utilisateur
+from services.authentification import limiteur_ip, verificateur
+from tests.donnees import peupler_ecole
+
+
+@pytest.fixture
+def comptes(app):
+    peupler_ecole()
+    defaut = Utilisateur(email="defaut@ecole.sn", nom="D", prenom="D", role=RoleUtilisateur.PARENT)
+    defaut.set_default_password("parent")
+    hache = Utilisateur(email="hache@ecole.sn", nom="H", prenom="H", role=RoleUtilisateur.PARENT)
+    hache.set_password("un-secret")
+    db.session.add_all([defaut, hache])
+    db.session.commit()
+
+
+@pytest.fixture
+def hachages_verifies(monkeypatch):
+    """Compte les vérifications de hachage lentes (werkzeug check_password_hash)."""
+    appels = []
+    original = module_utilisateur.check_password_hash
+
+    def compter(hachage, mot_de_passe):
+        appels.append(hachage)
+        return original(hachage, mot_de_passe)
+
+    monkeypatch.setattr(module_utilisateur, "check_password_hash", compter)
+    return appels
+
+
+@pytest.mark.parametrize("email,mot_de_passe,attendu", [
+    ("inconnu@ecole.sn", "parent123", 401),
+    ("defaut@ecole.sn", "mauvais", 401),
+    ("defaut@ecole.sn", "parent123", 200),
+    ("hache@ecole.sn", "mauvais", 401),
+    ("hache@ecole.sn", "un-secret", 200),
+])
+def test_un_hachage_lent_par_tentative(comptes, connecter, hachages_verifies, email, mot_de_passe, attendu):
+    reponse = connecter(email, mot_de_passe)
+
+    assert reponse.status_code == attendu
+    assert len(hachages_verifies) == 1
+    assert hachages_verifies[0].startswith(("scrypt:", "pbkdf2:"))
+
+
+def test_marqueur_verifie_contre_le_hachage_par_defaut(comptes):
+    stocke = db.session.query(Utilisateur.mot_de_passe).filter_by(email="defaut@ecole.sn").scalar()
+
+    assert stocke == "defaut$parent"
+    assert verificateur.verifier(stocke, "parent123")
+    assert not verificateur.verifier(stocke, "eleve1234")
+    assert not verificateur.verifier("defaut$inconnu", "parent123")
+
+
+def test_limite_par_compte(comptes, connecter):
+    statuts = [connecter("hache@ecole.sn", "mauvais").status_code for _ in range(6)]
+
+    assert statuts[:5] == [401] * 5
+    assert statuts[5] == 429
+    assert connecter("hache@ecole.sn", "un-secret").status_code == 429
+
+
+def test_limite_ip_par_client_derriere_proxy(comptes, client, monkeypatch):
+    monkeypatch.setattr(limiteur_ip, "capacite", 2)
+    monkeypatch.setattr(limiteur_ip, "debit", 1e-6)
+
+    def connecter_depuis(adresse, numero):
+        return client.post("/api/auth/login", headers={"X-Forwarded-For": adresse},
+                           json={"email": f"inconnu{numero}@ecole.sn", "mot_de_passe": "x"}).status_code
+
+    assert [connecter_depuis("10.0.0.1", n) for n in range(3)] == [401, 401, 429]
+    # Autre client derrière le même proxy : son propre seau
+    assert connecter_depuis("10.0.0.2", 3) == 401
+    # Adresse ajoutée par le client : seul le saut écrit par le proxy de confiance compte
+    assert connecter_depuis("10.0.0.2, 10.0.0.1", 4) == 429
@@ -0,0 +1,87 @@
+"""
+Échéances et retards de paiement : le retard d'un élève est son solde net sur
+les mois échus (une avance compense un mois dû) ; seuls l'administration et
+la comptabilité modifient les tarifs.
+"""
+from datetime import date
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from database import db
+from models.enums import RoleUtilisateur
+from models.paiement import Paiement
+from models.utilisateur import Utilisateur
+from services.authentification import claims_utilisateur
+from tests.donnees import MOT_DE_PASSE_FACTICE, peupler_ecole
+
+TARIF = {"niveau": "6e", "annee_scolaire": "2024-2025", "montant": 10000, "mois": ["2024-10", "2024-11"]}
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole(nb_classes=1)
+
+
+def _entetes(utilisateur):
+    jeton = create_access_token(identity=str(utilisateur.id), additional_claims=claims_utilisateur(utilisateur))
+    return {"Authorization": f"Bearer {jeton}"}
+
+
+def _entetes_role(role):
+    utilisateur = db.session.query(Utilisateur).filter_by(role=role).first()
+    if utilisateur is None:
+        utilisateur = Utilisateur(email=f"{role.value}@ecole.sn", nom="X", prenom="X",
+                                  role=role, mot_de_passe=MOT_DE_PASSE_FACTICE)
+        db.session.add(utilisateur)
+        db.session.commit()
+    return _entetes(utilisateur)
+
+
+def _retards(client, mois="2024-11"):
+    reponse = client.get(f"/api/paiements/retards?mois={mois}", headers=_entetes_role(RoleUtilisateur.ADMIN))
+    assert reponse.status_code == 200, reponse.get_json()
+    return {r["eleve_id"]: r for r in reponse.get_json()["retards"]}
+
+
+def _payer(eleve_id, montant, periode):
+    db.session.add(Paiement(eleve_id=eleve_id, montant=montant, periode=periode, methode="Espèces",
+                            statut="réglé", date_paiement=date(2024, 11, 5)))
+    db.session.commit()
+
+
+def test_avance_compense_les_mois_dus(client, ecole):
+    assert client.post("/api/tarifs", json=TARIF, headers=_entetes_role(RoleUtilisateur.ADMIN)).status_code == 201
+    # peupler_ecole : l'élève 1 a réglé 10 000 sur novembre, l'élève 2 sur décembre
+    _, novembre, decembre = ecole["eleve_ids"][:3]
+
+    retards = _retards(client)
+    assert retards[novembre]["montant_du"] == 10000
+    assert (retards[novembre]["mois_impayes"], retards[novembre]["depuis"]) == (1, "2024-10")
+    # Décembre n'est pas échu en novembre : le paiement ne compte pas encore
+    assert (retards[decembre]["montant_du"], retards[decembre]["mois_impayes"]) == (20000, 2)
+
+    _payer(novembre, 10000, "Novembre 2024")    # trop-perçu sur novembre (solde -10 000)
+    reponse = client.get(f"/api/eleves/{novembre}/compte", headers=_entetes_role(RoleUtilisateur.ADMIN))
+    assert reponse.get_json()["solde"] == 0
+    assert novembre not in _retards(client)
+
+    _payer(decembre, 15000, "Octobre 2024")
+    assert (_retards(client)[decembre]["montant_du"], _retards(client)[decembre]["mois_impayes"]) == (5000, 1)
+
+
+@pytest.mark.parametrize("role,attendu", [
+    (RoleUtilisateur.PARENT, 403),
+    (RoleUtilisateur.ELEVE, 403),
+    (RoleUtilisateur.ENSEIGNANT, 403),
+    (RoleUtilisateur.COMPTABLE, 201),
+])
+def test_ecriture_des_tarifs_reservee(client, ecole, role, attendu):
+    reponse = client.post("/api/tarifs", json=TARIF, headers=_entetes_role(RoleUtilisateur.ADMIN))
+    tarif_id = reponse.get_json()["tarifs"][0]["id"]
+    entetes = _entetes_role(role)
+
+    assert client.post("/api/tarifs", json={**TARIF, "mois": "2024-12"}, headers=entetes).status_code == attendu
+    modifie = 200 if attendu == 201 else attendu
+    assert client.put(f"/api/tarifs/{tarif_id}", json={"montant": 12000}, headers=entetes).status_code == modifie
+    assert client.delete(f"/api/tarifs/{tarif_id}", headers=entetes).status_code == modifie
@@ -0,0 +1,73 @@
+"""
+Filtres de GET /api/presences : résultats exacts, et plan de la requête
+réellement émise par la route (EXPLAIN) appuyé sur un index ix_presences_*.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from database import db
+from models.presence import Presence
+from tests.donnees import peupler_ecole
+from tests.plans import noms_index, plan_sql
+
+DEBUT, FIN = date(2024, 10, 7), date(2024, 10, 18)
+
+
+@pytest.fixture
+def ecole(app):
+    # Assez de classes pour qu'un IN sur deux d'entre elles soit plus sélectif que l'intervalle de dates seul
+    ids = peupler_ecole(nb_classes=20, eleves_par_classe=5, notes_par_eleve=0, jours_presence=30)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return ids
+
+
+def _requete_presences(client, entetes, compter_requetes, parametres):
+    with compter_requetes() as compteur:
+        reponse = client.get(f"/api/presences?limite=200&{parametres}", headers=entetes)
+    assert reponse.status_code == 200, reponse.get_json()
+    sql, valeurs = next(
+        (sql, valeurs) for sql, valeurs in zip(compteur.requetes, compteur.parametres) if "FROM presences" in sql
+    )
+    return reponse.get_json()["presences"], plan_sql(sql, valeurs)
+
+
+@pytest.mark.parametrize("filtres,index_attendus", [
+    ("classe_id={c1},{c2}&date_debut=2024-10-07&date_fin=2024-10-18", {"ix_presences_classe_id_date"}),
+    ("classe_id={c1}&classe_id={c2}&date_debut=2024-10-07&date_fin=2024-10-18&statut=absent",
+     {"ix_presences_classe_id_date"}),
+    ("eleve_id={e1},{e2}&date_debut=2024-10-07&date_fin=2024-10-18", {"ix_presences_eleve_id_date"}),
+    ("professeur_id={p1}&date_debut=2024-10-07&date_fin=2024-10-18&justifiee=false",
+     {"ix_presences_professeur_id_date"}),
+    ("date_debut=2024-10-07&date_fin=2024-10-08&statut=absent,retard", {"ix_presences_date"}),
+])
+def test_plan_utilise_un_index(client, entetes, compter_requetes, ecole, filtres, index_attendus):
+    filtres = filtres.format(
+        c1=ecole["classe_ids"][0], c2=ecole["classe_ids"][1],
+        e1=ecole["eleve_ids"][0], e2=ecole["eleve_ids"][1], p1=ecole["enseignant_ids"][0],
+    )
+    _, plan = _requete_presences(client, entetes, compter_requetes, filtres)
+
+    assert noms_index(plan) & index_attendus, plan
+    assert "SCAN presences" not in plan.splitlines(), plan
+
+
+def test_resultats_des_filtres(client, entetes, compter_requetes, ecole):
+    c1, c2 = ecole["classe_ids"][:2]
+    presences, _ = _requete_presences(
+        client, entetes, compter_requetes, f"classe_id={c1},{c2}&date_debut=2024-10-07&date_fin=2024-10-18&statut=absent"
+    )
+
+    attendues = db.session.query(Presence.id).filter(
+        Presence.classe_id.in_([c1, c2]), Presence.date.between(DEBUT, FIN), Presence.statut == "absent"
+    ).all()
+    assert sorted(p["id"] for p in presences) == sorted(i for (i,) in attendues)
+    assert presences and all(p["classe"]["id"] in (c1, c2) and p["statut"] == "absent" for p in presences)
+    assert all("2024-10-07" <= p["date"] <= "2024-10-18" for p in presences)
+
+
+@pytest.mark.parametrize("parametres", ["classe_id=abc", "statut=inconnu", "date_debut=07/10/2024"])
+def test_filtres_invalides(client, entetes, ecole, parametres):
+    assert client.get(f"/api/presences?{parametres}", headers=entetes).status_code == 400
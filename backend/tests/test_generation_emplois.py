@@ -0,0 +1,85 @@
+"""Codes d'erreur de POST /api/emplois/generer, pool de processus partagé."""
+import threading
+
+import pytest
+
+from services import generateur_emplois
+from tests.donnees import peupler_ecole
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole()
+
+
+def _corps(ecole, **extra):
+    return {
+        "classes": [{"classe_id": ecole["classe_ids"][0], "besoins": {str(ecole["matiere_ids"][0]): 2}}],
+        "duree_max": 1,
+        **extra,
+    }
+
+
+def test_generation(client, entetes, ecole):
+    reponse = client.post("/api/emplois/generer", headers=entetes, json=_corps(ecole))
+
+    assert reponse.status_code == 200, reponse.get_json()
+    assert reponse.get_json()["complet"]
+
+
+def test_classe_introuvable(client, entetes, ecole):
+    corps = _corps(ecole)
+    corps["classes"][0]["classe_id"] = 9999
+
+    reponse = client.post("/api/emplois/generer", headers=entetes, json=corps)
+
+    assert reponse.status_code == 404
+    assert "9999" in reponse.get_json()["error"]
+
+
+@pytest.mark.parametrize("extra", [
+    {"jours": "Lundi"},
+    {"jours": [1, 2]},
+    {"jours": []},
+    {"duree_max": "vite"},
+    {"duree_max": "nan"},
+    {"duree_max": 0},
+    {"plages": [["09:00", "08:00"]]},
+    {"plages": [["8h", "9h"]]},
+])
+def test_parametres_invalides(client, entetes, ecole, extra):
+    reponse = client.post("/api/emplois/generer", headers=entetes, json=_corps(ecole, **extra))
+    assert reponse.status_code == 400, reponse.get_json()
+
+
+def test_plages_qui_se_chevauchent(client, entetes, ecole):
+    reponse = client.post("/api/emplois/generer", headers=entetes, json=_corps(
+        ecole, plages=[["09:00", "11:00"], ["08:00", "10:00"], ["14:00", "15:00"]], enregistrer=True
+    ))
+
+    assert reponse.status_code == 400, reponse.get_json()
+    assert reponse.get_json()["plages"] == ["08:00-10:00 / 09:00-11:00"]
+
+
+def test_generations_simultanees_bornees(client, entetes, ecole, monkeypatch):
+    places = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(generateur_emplois, "_places", places)
+    places.acquire()   # une génération déjà en cours
+
+    reponse = client.post("/api/emplois/generer", headers=entetes, json=_corps(ecole))
+
+    assert reponse.status_code == 503
+    assert reponse.headers["Retry-After"]
+
+
+def test_pool_de_processus_partage(app, ecole):
+    probleme = generateur_emplois.preparer_probleme(
+        {ecole["classe_ids"][0]: {ecole["matiere_ids"][0]: 2}}, generateur_emplois.JOURS_PAR_DEFAUT,
+        generateur_emplois.PLAGES_PAR_DEFAUT
+    )
+    creneaux, non_places, _ = generateur_emplois.chercher(probleme, 5, processus=2)
+    pool = generateur_emplois._pool
+    generateur_emplois.chercher(probleme, 5, processus=2)
+
+    assert creneaux and not non_places
+    assert generateur_emplois._pool is pool
@@ -0,0 +1,33 @@
+"""Import en masse d'élèves : matricules comparés sans tenir compte de la casse."""
+import pytest
+
+from tests.donnees import peupler_ecole
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole()
+
+
+def _ligne(ecole, matricule, telephone="770000001"):
+    return {"nom": "Diop", "prenom": "Awa", "sexe": "F", "matricule": matricule,
+            "classe_id": ecole["classe_ids"][0], "parent_nom": "Diop", "parent_prenom": "Moussa",
+            "parent_telephone": telephone}
+
+
+def test_doublon_de_casse_dans_le_fichier(client, entetes, ecole):
+    reponse = client.post("/api/eleves/import", headers=entetes,
+                          json=[_ligne(ecole, "abc9"), _ligne(ecole, "ABC9", "770000002")])
+
+    assert reponse.status_code == 201, reponse.get_json()
+    rapport = reponse.get_json()
+    assert rapport["importes"] == 1
+    assert [(e["ligne"], e["matricule"]) for e in rapport["erreurs"]] == [(2, "ABC9")]
+
+
+def test_matricule_existant_en_autre_casse(client, entetes, ecole):
+    # peupler_ecole crée le matricule MAT00000
+    reponse = client.post("/api/eleves/import", headers=entetes, json=[_ligne(ecole, "mat00000")])
+
+    assert reponse.status_code == 400, reponse.get_json()
+    assert reponse.get_json()["erreurs"][0]["erreurs"] == ["Un utilisateur élève avec ce matricule existe déjà"]
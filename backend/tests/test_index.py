@@ -0,0 +1,62 @@
+"""
+Les filtres des routes utilisent les index composites (migration
+e927871a6183) plutôt qu'un parcours complet de la table.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import select, text
+
+from database import db
+from models.depense import Depense
+from models.eleve import Eleve
+from models.emploi_du_temps import EmploiDuTemps
+from models.enums import RoleUtilisateur
+from models.note import Note
+from models.paiement import Paiement
+from models.presence import Presence
+from models.utilisateur import Utilisateur
+from tests.donnees import peupler_ecole
+from tests.plans import index_utilises, plan_execution
+
+OCTOBRE = (date(2024, 10, 1), date(2024, 10, 31))
+
+CAS = [
+    ("presences d'un élève", select(Presence).where(Presence.eleve_id == 3, Presence.date.between(*OCTOBRE)),
+     {"ix_presences_eleve_id_date"}),
+    ("appel d'une classe", select(Presence).where(Presence.classe_id == 2, Presence.date == OCTOBRE[0]),
+     {"ix_presences_classe_id_date"}),
+    ("notes élève / matière / période",
+     select(Note).where(Note.eleve_id == 3, Note.matiere_id == 1, Note.periode == "T1"),
+     {"ix_notes_eleve_id_matiere_id_periode"}),
+    ("notes d'une matière", select(Note).where(Note.matiere_id == 1, Note.periode == "T1"),
+     {"ix_notes_matiere_id_periode", "ix_notes_eleve_id_matiere_id_periode"}),
+    ("paiements d'un élève", select(Paiement).where(Paiement.eleve_id == 3, Paiement.periode == "Octobre 2024"),
+     {"ix_paiements_eleve_id_periode"}),
+    ("impayés d'une période", select(Paiement).where(Paiement.periode == "Octobre 2024", Paiement.statut == "en attente"),
+     {"ix_paiements_periode_statut", "ix_paiements_statut"}),
+    ("emploi du temps d'une classe", select(EmploiDuTemps).where(EmploiDuTemps.classe_id == 2, EmploiDuTemps.jour == "Lundi"),
+     {"ix_emplois_du_temps_classe_id_jour"}),
+    ("dépenses d'un type sur un mois", select(Depense).where(Depense.type == "salaire", Depense.date.between(*OCTOBRE)),
+     {"ix_depenses_type_date"}),
+    ("dépenses d'un mois", select(Depense).where(Depense.date.between(*OCTOBRE)),
+     {"ix_depenses_date", "ix_depenses_type_date"}),
+    ("utilisateurs par rôle", select(Utilisateur).where(Utilisateur.role == RoleUtilisateur.ENSEIGNANT),
+     {"ix_utilisateurs_role"}),
+    ("élèves d'une classe", select(Eleve).where(Eleve.classe_id == 2),
+     {"ix_eleves_classe_id", "ix_eleves_classe_id_nom"}),
+]
+
+
+@pytest.fixture
+def ecole(app):
+    peupler_ecole(nb_classes=8, eleves_par_classe=20, notes_par_eleve=4, jours_presence=20)
+    # Statistiques à jour, comme sur une base en production
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("nom,requete,attendus", CAS, ids=[cas[0] for cas in CAS])
+def test_filtre_utilise_un_index(ecole, nom, requete, attendus):
+    utilises = index_utilises(requete)
+    assert utilises & attendus, f"{nom} : plan sans index attendu\n{plan_execution(requete)}"
@@ -0,0 +1,84 @@
+"""Comptes créés avec un mot de passe par défaut : hachage différé, accès restreint, expiration."""
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import decode_token
+
+from database import db
+from models.enums import RoleUtilisateur
+from models.utilisateur import Utilisateur
+from tests.donnees import peupler_ecole
+
+EMAIL = "nouveau.prof@ecole.sn"
+
+
+@pytest.fixture
+def compte(app):
+    peupler_ecole()
+    utilisateur = Utilisateur(email=EMAIL, nom="Nouveau", prenom="Prof", role=RoleUtilisateur.ENSEIGNANT)
+    utilisateur.set_default_password("enseignant")
+    db.session.add(utilisateur)
+    db.session.commit()
+    return utilisateur.id
+
+
+def _entetes(reponse):
+    return {"Authorization": f"Bearer {reponse.get_json()['access_token']}"}
+
+
+def test_creation_sans_hachage(compte):
+    utilisateur = db.session.get(Utilisateur, compte)
+    assert utilisateur.mot_de_passe == "defaut$enseignant"
+    assert utilisateur.mot_de_passe_provisoire
+
+
+def test_premiere_connexion_hache_le_mot_de_passe(compte, connecter):
+    reponse = connecter(EMAIL, "test1234")
+
+    assert reponse.status_code == 200
+    assert decode_token(reponse.get_json()["access_token"])["mot_de_passe_par_defaut"] is True
+    db.session.expire_all()
+    utilisateur = db.session.get(Utilisateur, compte)
+    assert not utilisateur.mot_de_passe.startswith("defaut$")
+    assert utilisateur.mot_de_passe_provisoire
+    assert utilisateur.check_password("test1234")
+    # La seconde connexion passe par le hachage stocké
+    assert connecter(EMAIL, "test1234").status_code == 200
+    assert connecter(EMAIL, "mauvais").status_code == 401
+
+
+def test_acces_limite_au_changement_de_mot_de_passe(client, compte, connecter):
+    entetes = _entetes(connecter(EMAIL, "test1234"))
+
+    assert client.get("/api/classes", headers=entetes).status_code == 403
+    assert client.get("/api/eleves", headers=entetes).status_code == 403
+    assert client.get("/api/auth/moi", headers=entetes).status_code == 200
+
+    reponse = client.put("/api/auth/utilisateurs/motdepasse", headers=entetes, json={
+        "ancien_mot_de_passe": "test1234", "nouveau_mot_de_passe": "un-vrai-secret"
+    })
+    assert reponse.status_code == 200
+    assert client.get("/api/classes", headers=_entetes(reponse)).status_code == 200
+
+    db.session.expire_all()
+    assert not db.session.get(Utilisateur, compte).mot_de_passe_provisoire
+    assert connecter(EMAIL, "test1234").status_code == 401
+    assert client.get("/api/classes", headers=_entetes(connecter(EMAIL, "un-vrai-secret"))).status_code == 200
+
+
+def test_nouveau_mot_de_passe_different(client, compte, connecter):
+    entetes = _entetes(connecter(EMAIL, "test1234"))
+    reponse = client.put("/api/auth/utilisateurs/motdepasse", headers=entetes, json={
+        "ancien_mot_de_passe": "test1234", "nouveau_mot_de_passe": "test1234"
+    })
+    assert reponse.status_code == 400
+
+
+def test_mot_de_passe_provisoire_expire(compte, connecter, monkeypatch):
+    monkeypatch.setenv("AUTH_PROVISOIRE_JOURS", "30")
+    utilisateur = db.session.get(Utilisateur, compte)
+    utilisateur.date_creation = datetime.utcnow() - timedelta(days=31)
+    db.session.commit()
+
+    assert connecter(EMAIL, "test1234").status_code == 403
+    assert connecter(EMAIL, "mauvais").status_code == 401
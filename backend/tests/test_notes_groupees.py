@@ -0,0 +1,93 @@
+"""Saisie groupée des notes d'une classe (POST /api/notes/batch)."""
+import pytest
+from sqlalchemy.orm import Session
+
+import routes.note_routes as note_routes
+from database import db
+from models.note import Note
+from tests.donnees import peupler_ecole
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole(notes_par_eleve=0)
+
+
+def _saisie(ids, notes):
+    return {
+        "classe_id": ids["classe_ids"][0], "matiere_id": ids["matiere_ids"][0],
+        "type": "devoir 1", "periode": "T1", "notes": notes,
+    }
+
+
+def test_identifiants_en_texte(client, entetes, ecole):
+    eleve_id = ecole["eleve_ids"][0]
+    reponse = client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, [
+        {"eleve_id": str(eleve_id), "valeur": "14.5"},
+    ]))
+
+    assert reponse.status_code == 201, reponse.get_json()
+    assert db.session.query(Note.valeur).filter_by(eleve_id=eleve_id).scalar() == 14.5
+
+
+def test_doublon_texte_et_entier(client, entetes, ecole):
+    eleve_id = ecole["eleve_ids"][0]
+    reponse = client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, [
+        {"eleve_id": eleve_id, "valeur": 12}, {"eleve_id": str(eleve_id), "valeur": 15},
+    ]))
+
+    assert reponse.status_code == 400
+    assert "plusieurs fois" in reponse.get_json()["error"]
+
+
+@pytest.mark.parametrize("eleve_id", ["abc", None, [1], "1.5"])
+def test_identifiant_invalide(client, entetes, ecole, eleve_id):
+    reponse = client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, [
+        {"eleve_id": eleve_id, "valeur": 12},
+    ]))
+    assert reponse.status_code == 400
+
+
+def test_resaisie_met_a_jour(client, entetes, ecole):
+    notes = [{"eleve_id": eleve_id, "valeur": 10} for eleve_id in ecole["eleve_ids"][:5]]
+    assert client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, notes)).status_code == 201
+
+    notes[0]["valeur"] = 18
+    reponse = client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, notes))
+
+    assert reponse.status_code == 200
+    assert reponse.get_json()["mises_a_jour"] == 5
+    assert db.session.query(Note).count() == 5
+
+
+@pytest.mark.parametrize("valeur", ["nan", "inf", "-Infinity", None, "douze"])
+def test_valeur_non_finie(client, entetes, ecole, valeur):
+    reponse = client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, [
+        {"eleve_id": ecole["eleve_ids"][0], "valeur": valeur},
+    ]))
+    assert reponse.status_code == 400
+    assert db.session.query(Note).count() == 0
+
+
+def test_resaisie_concurrente(client, entetes, ecole, monkeypatch):
+    eleve_ids = ecole["eleve_ids"][:5]
+    ecrire = note_routes.inserer_ou_mettre_a_jour
+
+    def ecrire_apres_un_renvoi(*args, **kwargs):
+        # La même saisie, renvoyée par une autre requête, est validée juste avant la nôtre
+        with Session(db.engine) as autre:
+            autre.add_all(Note(valeur=10, type="devoir 1", periode="T1", eleve_id=eleve_id,
+                               matiere_id=ecole["matiere_ids"][0], enseignant_id=ecole["enseignant_ids"][0])
+                          for eleve_id in eleve_ids)
+            autre.commit()
+        return ecrire(*args, **kwargs)
+
+    monkeypatch.setattr(note_routes, "inserer_ou_mettre_a_jour", ecrire_apres_un_renvoi)
+    reponse = client.post("/api/notes/batch", headers=entetes, json=_saisie(ecole, [
+        {"eleve_id": eleve_id, "valeur": 16} for eleve_id in eleve_ids
+    ]))
+
+    assert reponse.status_code == 201, reponse.get_json()
+    notes = db.session.query(Note.valeur, Note.enseignant_id).all()
+    # Aucun doublon ; l'enseignant déjà saisi est conservé (absent de cette saisie)
+    assert notes == [(16, ecole["enseignant_ids"][0])] * 5
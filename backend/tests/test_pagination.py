@@ -0,0 +1,39 @@
+"""Parcours complet des listes paginées par curseur : chaque ligne une fois, dans l'ordre."""
+import pytest
+
+from tests.donnees import peupler_ecole
+
+LISTES = [
+    ("/api/notes", "notes"),
+    ("/api/presences", "presences"),
+    ("/api/paiements", "paiements"),
+    ("/api/depenses", "depenses"),
+    ("/api/eleves", "eleves"),
+]
+
+
+def _parcourir(client, entetes, url, cle, limite):
+    lignes, curseur = [], None
+    while True:
+        parametres = f"?limite={limite}" + (f"&curseur={curseur}" if curseur else "")
+        corps = client.get(url + parametres, headers=entetes).get_json()
+        lignes += corps[cle]
+        curseur = corps["next_cursor"]
+        if not curseur:
+            return lignes
+
+
+@pytest.mark.parametrize("url,cle", LISTES)
+def test_parcours_complet(client, entetes, url, cle):
+    peupler_ecole(nb_classes=3, eleves_par_classe=7, jours_presence=8)
+    complet = client.get(url + "?limite=200", headers=entetes).get_json()[cle]
+
+    pages = _parcourir(client, entetes, url, cle, limite=7)
+
+    assert [ligne["id"] for ligne in pages] == [ligne["id"] for ligne in complet]
+    assert len({ligne["id"] for ligne in pages}) == len(pages)
+
+
+def test_curseur_invalide(client, entetes):
+    peupler_ecole()
+    assert client.get("/api/depenses?curseur=nimporte-quoi", headers=entetes).status_code == 400
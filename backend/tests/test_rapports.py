@@ -0,0 +1,78 @@
+"""
+Cache des rapports financiers (rapports_mensuels) : un mois clos est calculé
+une fois puis relu, et toute écriture sur ce mois l'invalide — y compris
+quand elle est validée pendant qu'un rapport calcule ses agrégats.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import db
+from models.paiement import Paiement
+from models.rapport_mensuel import RapportMensuel
+from models.version_rapport_mensuel import VersionRapportMensuel
+from services import rapports
+from tests.donnees import peupler_ecole
+
+OCTOBRE = "date_debut=2024-10-01&date_fin=2024-10-31"
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole()
+
+
+def _recettes(client, entetes):
+    reponse = client.get(f"/api/rapports/finances?{OCTOBRE}", headers=entetes)
+    assert reponse.status_code == 200, reponse.get_json()
+    return reponse.get_json()["recettes"]
+
+
+def _lignes_en_cache():
+    return db.session.scalar(select(func.count()).select_from(RapportMensuel).where(RapportMensuel.mois == "2024-10"))
+
+
+def _version():
+    return db.session.scalar(select(VersionRapportMensuel.version).where(VersionRapportMensuel.mois == "2024-10"))
+
+
+def _payer(session, eleve_id, montant):
+    session.add(Paiement(eleve_id=eleve_id, montant=montant, periode="Octobre", methode="Espèces",
+                         statut="réglé", date_paiement=date(2024, 10, 15)))
+    session.commit()
+
+
+def test_ecriture_invalide_le_mois(client, entetes, ecole):
+    recettes = _recettes(client, entetes)
+    assert _lignes_en_cache() > 0 and _version() is None
+
+    _payer(db.session, ecole["eleve_ids"][0], 2500)
+    assert _lignes_en_cache() == 0 and _version() == 1
+
+    assert _recettes(client, entetes) == recettes + 2500
+    assert _lignes_en_cache() > 0
+
+
+def test_paiement_valide_pendant_le_calcul(client, entetes, ecole, monkeypatch):
+    recettes = _recettes(client, entetes)
+    _payer(db.session, ecole["eleve_ids"][0], 1000)   # vide le cache
+    agreger = rapports._agreger
+
+    def agreger_puis_payer(debut, fin):
+        resultat = agreger(debut, fin)
+        # Paiement validé par une autre requête après le calcul, avant l'écriture du cache
+        with Session(db.engine) as autre:
+            _payer(autre, ecole["eleve_ids"][1], 4000)
+        return resultat
+
+    monkeypatch.setattr(rapports, "_agreger", agreger_puis_payer)
+    assert _recettes(client, entetes) == recettes + 1000    # calculé avant le second paiement
+    assert _lignes_en_cache() == 0                          # ... donc pas mis en cache
+    assert _version() == 2
+
+    monkeypatch.setattr(rapports, "_agreger", agreger)
+    assert _recettes(client, entetes) == recettes + 5000
+    assert _lignes_en_cache() > 0
+    assert _recettes(client, entetes) == recettes + 5000    # relu depuis le cache
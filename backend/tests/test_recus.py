@@ -0,0 +1,134 @@
+"""
+Numérotation des reçus sous concurrence : plusieurs allocateurs (un par
+processus simulé), chacun servi par plusieurs threads, tirent des numéros en
+même temps sur la même base. Aucun numéro ne doit être distribué deux fois,
+et chaque bloc réservé en base doit être servi d'un seul tenant par un seul
+allocateur. Côté route, un client ne peut pas saisir un numéro de la forme
+réservée au serveur, et une séquence indisponible répond 503.
+"""
+import threading
+from collections import defaultdict
+
+import pytest
+from sqlalchemy import select
+
+from database import db
+from models.sequence_recu import SequenceRecu
+from services import recus
+from services.recus import AllocateurRecus, NumerotationIndisponible
+from tests.donnees import peupler_ecole
+
+PROCESSUS = 3
+THREADS_PAR_PROCESSUS = 4
+NUMEROS_PAR_THREAD = 30
+ANNEE = 2024
+
+
+def _numero(recu):
+    prefixe, annee, numero = recu.split("-")
+    assert (prefixe, annee) == ("REC", str(ANNEE))
+    return int(numero)
+
+
+def _tirer_en_parallele(app, allocateurs):
+    """Retourne {(processus, thread): [numéros dans l'ordre d'obtention]}."""
+    tirages = defaultdict(list)
+    erreurs = []
+    depart = threading.Barrier(len(allocateurs) * THREADS_PAR_PROCESSUS)
+
+    def travailler(p, t):
+        try:
+            with app.app_context():
+                depart.wait()
+                for _ in range(NUMEROS_PAR_THREAD):
+                    tirages[(p, t)].append(_numero(allocateurs[p].suivant("REC", ANNEE)))
+        except Exception as e:  # remonté dans le thread principal
+            erreurs.append(e)
+
+    threads = [
+        threading.Thread(target=travailler, args=(p, t))
+        for p in range(len(allocateurs)) for t in range(THREADS_PAR_PROCESSUS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erreurs, erreurs
+    return tirages
+
+
+@pytest.mark.parametrize("taille_bloc", [1, 7, 20])
+def test_numeros_uniques_et_contigus_par_bloc(app, taille_bloc):
+    allocateurs = [AllocateurRecus(taille_bloc) for _ in range(PROCESSUS)]
+    tirages = _tirer_en_parallele(app, allocateurs)
+
+    tous = [n for numeros in tirages.values() for n in numeros]
+    assert len(tous) == PROCESSUS * THREADS_PAR_PROCESSUS * NUMEROS_PAR_THREAD
+    assert len(set(tous)) == len(tous)
+
+    # Croissants dans chaque thread (distribution en mémoire sous verrou)
+    for numeros in tirages.values():
+        assert numeros == sorted(numeros)
+
+    # Blocs [1 + k*taille, (k+1)*taille] : un seul allocateur par bloc, et les
+    # numéros qu'il a servis sont contigus depuis le début du bloc
+    par_bloc = defaultdict(lambda: defaultdict(list))
+    for (p, _), numeros in tirages.items():
+        for n in numeros:
+            par_bloc[(n - 1) // taille_bloc][p].append(n)
+    for bloc, par_processus in par_bloc.items():
+        assert len(par_processus) == 1, f"bloc {bloc} partagé entre {sorted(par_processus)}"
+        (numeros,) = par_processus.values()
+        debut = 1 + bloc * taille_bloc
+        assert sorted(numeros) == list(range(debut, debut + len(numeros)))
+
+    # Compteur en base : juste après le dernier bloc réservé
+    prochain = db.session.scalar(
+        select(SequenceRecu.prochain).where(SequenceRecu.prefixe == "REC", SequenceRecu.annee == ANNEE)
+    )
+    assert prochain == (max(par_bloc) + 1) * taille_bloc + 1
+
+
+def test_sequences_independantes_par_annee(app):
+    allocateur = AllocateurRecus(5)
+    assert allocateur.suivant("REC", 2024) == "REC-2024-000001"
+    assert allocateur.suivant("REC", 2025) == "REC-2025-000001"
+    assert allocateur.suivant("FAC", 2024) == "FAC-2024-000001"
+    assert allocateur.suivant("REC", 2024) == "REC-2024-000002"
+
+    # Un autre processus commence au bloc suivant
+    assert AllocateurRecus(5).suivant("REC", 2024) == "REC-2024-000006"
+
+
+def _payer(client, entetes, eleve_id, **champs):
+    return client.post("/api/paiements", headers=entetes,
+                       json={"eleve_id": eleve_id, "montant": 5000, "periode": "Octobre 2024", **champs})
+
+
+def test_numero_client_hors_format_serveur(client, entetes):
+    eleve_id = peupler_ecole(nb_classes=1)["eleve_ids"][0]
+
+    for recu in ("REC-2031-000001", " rec-2031-1 "):
+        reponse = _payer(client, entetes, eleve_id, recu=recu)
+        assert reponse.status_code == 400, recu
+    assert _payer(client, entetes, eleve_id, recu="CAISSE-2031-17").status_code == 201
+
+    paiement = _payer(client, entetes, eleve_id).get_json()["paiement"]
+    assert recus.numero_reserve(paiement["recu"])
+    modifier = lambda recu: client.put(f"/api/paiements/{paiement['id']}", headers=entetes, json={"recu": recu})
+    assert modifier(paiement["recu"]).status_code == 200     # inchangé : accepté
+    assert modifier("REC-2031-000002").status_code == 400
+
+
+def test_sequence_indisponible_503(client, entetes, monkeypatch):
+    eleve_id = peupler_ecole(nb_classes=1)["eleve_ids"][0]
+
+    def echouer(prefixe, annee):
+        raise NumerotationIndisponible("Impossible de réserver un bloc de numéros de reçu")
+
+    monkeypatch.setattr(recus.allocateur_recus, "_blocs", {})
+    monkeypatch.setattr(recus.allocateur_recus, "_reserver_bloc", echouer)
+    reponse = _payer(client, entetes, eleve_id)
+    assert reponse.status_code == 503
+    assert reponse.headers["Retry-After"] == "1"
+    assert "error" in reponse.get_json()
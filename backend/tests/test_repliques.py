@@ -0,0 +1,127 @@
+"""
+Routage des lectures (SessionRoutee) entre une base principale et des
+répliques, chacune dans son propre fichier SQLite : chaque base contient une
+matière à son nom, ce qui montre où chaque lecture a été servie.
+"""
+import pytest
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from sqlalchemy import select
+
+import database
+from database import db, lecture_primaire
+from models.matiere import Matiere
+
+
+def _lire():
+    return sorted(db.session.execute(select(Matiere.nom)).scalars())
+
+
+@pytest.fixture
+def application(tmp_path):
+    app = Flask(__name__)
+    uris = {nom: f"sqlite:///{tmp_path / nom}.db" for nom in ("principale", "replique_0", "replique_1")}
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=uris["principale"],
+        SQLALCHEMY_BINDS={"replique_0": uris["replique_0"], "replique_1": uris["replique_1"]},
+        DB_REPLIQUES=["replique_0"],
+        JWT_SECRET_KEY="secret-de-test-suffisamment-long-pour-hs256",
+    )
+    db.init_app(app)
+    JWTManager(app)
+
+    @app.route("/matieres")
+    @jwt_required(optional=True)
+    def lister():
+        return jsonify(_lire())
+
+    @app.route("/matieres/frais")
+    @jwt_required(optional=True)
+    @lecture_primaire
+    def lister_frais():
+        return jsonify(_lire())
+
+    @app.route("/matieres", methods=["POST"])
+    @jwt_required()
+    def ajouter():
+        db.session.add(Matiere(nom="ajoutee", code="AJ"))
+        db.session.commit()
+        return jsonify(_lire()), 201
+
+    @app.route("/matieres/ecrire-puis-lire")
+    @jwt_required(optional=True)
+    def ecrire_puis_lire():
+        # GET qui écrit : la suite de la requête doit relire sur la principale
+        db.session.add(Matiere(nom="pendant-get", code="PG"))
+        db.session.flush()
+        lu = _lire()
+        db.session.rollback()
+        return jsonify(lu)
+
+    with app.app_context():
+        for nom in uris:
+            moteur = db.engine if nom == "principale" else db.engines[nom]
+            db.metadata.create_all(moteur, tables=[Matiere.__table__])
+            with moteur.begin() as connexion:
+                connexion.execute(Matiere.__table__.insert().values(nom=nom, code=nom))
+
+    database._collants.clear()
+    yield app
+    database._collants.clear()
+    # init_app a déclaré une metadata par bind : l'application des autres tests n'en a pas
+    for nom in app.config["SQLALCHEMY_BINDS"]:
+        db.metadatas.pop(nom, None)
+
+
+@pytest.fixture
+def client(application):
+    return application.test_client()
+
+
+def _entetes(application, utilisateur_id):
+    with application.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity=str(utilisateur_id))}"}
+
+
+def test_get_servi_par_la_replique(client):
+    assert client.get("/matieres").get_json() == ["replique_0"]
+
+
+def test_ecriture_sur_la_principale(application, client):
+    assert client.post("/matieres", headers=_entetes(application, 7)).get_json() == ["ajoutee", "principale"]
+    assert client.get("/matieres").get_json() == ["replique_0"]
+
+
+def test_lire_ses_ecritures(application, client, monkeypatch):
+    monkeypatch.setenv("DB_STICKY_SECONDS", "60")
+    auteur, autre = _entetes(application, 7), _entetes(application, 8)
+
+    client.post("/matieres", headers=auteur)
+
+    assert client.get("/matieres", headers=auteur).get_json() == ["ajoutee", "principale"]
+    assert client.get("/matieres", headers=autre).get_json() == ["replique_0"]
+
+
+def test_fin_de_la_periode_collante(application, client, monkeypatch):
+    monkeypatch.setenv("DB_STICKY_SECONDS", "0")
+    auteur = _entetes(application, 7)
+
+    client.post("/matieres", headers=auteur)
+
+    assert client.get("/matieres", headers=auteur).get_json() == ["replique_0"]
+
+
+def test_lecture_primaire(client):
+    assert client.get("/matieres/frais").get_json() == ["principale"]
+
+
+def test_get_qui_ecrit_relit_la_principale(client):
+    assert client.get("/matieres/ecrire-puis-lire").get_json() == ["pendant-get", "principale"]
+
+
+def test_tourniquet_entre_repliques(application, client):
+    application.config["DB_REPLIQUES"] = ["replique_0", "replique_1"]
+
+    servies = {client.get("/matieres").get_json()[0] for _ in range(4)}
+
+    assert servies == {"replique_0", "replique_1"}
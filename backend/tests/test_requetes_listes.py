@@ -0,0 +1,56 @@
+"""
+Le nombre de requêtes SQL d'un endpoint de liste ne doit pas dépendre du
+nombre de lignes renvoyées (pas de N+1 dans les to_dict()).
+"""
+import pytest
+
+from database import db
+from tests.donnees import peupler_ecole
+
+PETITE_ECOLE = {"nb_classes": 2, "eleves_par_classe": 3}
+GRANDE_ECOLE = {"nb_classes": 6, "eleves_par_classe": 15}
+
+ENDPOINTS = [
+    "/api/eleves?limite=200",
+    "/api/notes?limite=200",
+    "/api/presences?limite=200",
+    "/api/paiements?limite=200",
+    "/api/depenses?limite=200",
+    "/api/classes",
+    "/api/enseignants",
+    "/api/emplois",
+    "/api/emplois/classe/{classe_id}",
+    "/api/parents/{parent_id}/enfants",
+    "/api/eleves/{eleve_id}",
+]
+
+
+def _requetes_pour(client, entetes, compter_requetes, url, taille):
+    db.drop_all()
+    db.create_all()
+    ids = peupler_ecole(**taille)
+    db.session.remove()
+    url = url.format(classe_id=ids["classe_ids"][0], parent_id=ids["parent_ids"][0], eleve_id=ids["eleve_ids"][0])
+
+    with compter_requetes() as compteur:
+        reponse = client.get(url, headers=entetes)
+    assert reponse.status_code == 200, reponse.get_json()
+    return compteur.nombre, reponse.get_json()
+
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_nombre_de_requetes_constant(client, entetes, compter_requetes, url):
+    petite, _ = _requetes_pour(client, entetes, compter_requetes, url, PETITE_ECOLE)
+    grande, corps = _requetes_pour(client, entetes, compter_requetes, url, GRANDE_ECOLE)
+
+    assert corps, "réponse vide : le test ne mesurerait rien"
+    assert grande == petite, f"{url} : {petite} requêtes pour la petite école, {grande} pour la grande"
+
+
+def test_liste_eleves_bornee(client, entetes, compter_requetes):
+    _, corps = _requetes_pour(client, entetes, compter_requetes, "/api/eleves?limite=200", GRANDE_ECOLE)
+    nombre, _ = _requetes_pour(client, entetes, compter_requetes, "/api/eleves?limite=200", GRANDE_ECOLE)
+
+    assert len(corps["eleves"]) == 90
+    # élèves + classes + enseignants principaux (+ utilisateurs) + matières + parents
+    assert nombre <= 6
@@ -0,0 +1,65 @@
+"""
+Agrégats tenus par upsert (utils.upsert) : une ligne créée par une autre
+transaction entre la lecture et l'écriture est mise à jour, pas dupliquée.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+import services.assiduite as assiduite
+import services.echeances as echeances
+from database import db
+from models.echeance import Echeance
+from models.presence_journaliere import PresenceJournaliere
+from tests.donnees import peupler_ecole
+
+JOUR = date(2024, 11, 4)
+
+
+@pytest.fixture
+def ecole(app):
+    return peupler_ecole(jours_presence=0)
+
+
+def _ecrire_d_abord(module, monkeypatch, ecriture_concurrente):
+    """L'écriture concurrente est validée juste avant l'upsert du module."""
+    upsert = module.inserer_ou_mettre_a_jour
+
+    def apres_concurrente(*args, **kwargs):
+        with db.engine.begin() as autre:
+            ecriture_concurrente(autre)
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(module, "inserer_ou_mettre_a_jour", apres_concurrente)
+
+
+def test_premier_appel_du_jour_simultane(ecole, monkeypatch):
+    classe_id, professeur_id = ecole["classe_ids"][0], ecole["enseignant_ids"][0]
+
+    def etat(statut):
+        return {"date": JOUR, "classe_id": classe_id, "professeur_id": professeur_id, "statut": statut, "justifiee": False}
+
+    # Autre appel du même jour : une présence, une absence
+    _ecrire_d_abord(assiduite, monkeypatch, lambda autre: autre.execute(assiduite.journalier.insert().values(
+        date=JOUR, classe_id=classe_id, professeur_id=professeur_id,
+        total=2, presents=1, absents=1, absences_justifiees=0, retards=0, renvois=0
+    )))
+    with db.engine.begin() as connexion:
+        assiduite.appliquer_presences(connexion, [(etat("absent"), 1), (etat("retard"), 1)])
+
+    lignes = db.session.execute(select(PresenceJournaliere)).scalars().all()
+    assert [(l.total, l.presents, l.absents, l.retards) for l in lignes] == [(4, 1, 2, 1)]
+
+
+def test_avance_sur_un_mois_sans_tarif(ecole, monkeypatch):
+    eleve_id = ecole["eleve_ids"][0]
+
+    _ecrire_d_abord(echeances, monkeypatch, lambda autre: autre.execute(
+        echeances.echeances.insert().values(eleve_id=eleve_id, mois="2031-01", du=0, paye=1000, solde=-1000)
+    ))
+    with db.engine.begin() as connexion:
+        echeances.appliquer_paiements(connexion, [(eleve_id, "2031-01", 2500), (eleve_id, "2031-01", 500)])
+
+    lignes = db.session.execute(select(Echeance).where(Echeance.mois == "2031-01")).scalars().all()
+    assert [(l.eleve_id, l.paye, l.solde) for l in lignes] == [(eleve_id, 4000, -4000)]
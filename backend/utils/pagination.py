@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+LIMITE_PAR_DEFAUT = 50
+LIMITE_MAX = 200
+
+
+class CurseurInvalide(ValueError):
+    pass
+
+
+def _vers_json(valeur):
+    if isinstance(valeur, (date, datetime)):
+        return valeur.isoformat()
+    return valeur
+
+
+def _depuis_json(valeur, colonne):
+    if valeur is None:
+        return None
+    type_python = colonne.type.python_type
+    if type_python is datetime:
+        return datetime.fromisoformat(valeur)
+    if type_python is date:
+        return date.fromisoformat(valeur)
+    return type_python(valeur)
+
+
+def encoder_curseur(valeur_tri, identifiant):
+    """Curseur opaque : base64 url-safe de [valeur_tri, id]."""
+    brut = json.dumps([_vers_json(valeur_tri), identifiant], separators=(",", ":"))
+    return base64.urlsafe_b64encode(brut.encode()).decode().rstrip("=")
+
+
+def decoder_curseur(curseur, colonne_tri):
+    try:
+        remplissage = "=" * (-len(curseur) % 4)
+        valeur, identifiant = json.loads(base64.urlsafe_b64decode(curseur + remplissage))
+        return _depuis_json(valeur, colonne_tri), int(identifiant)
+    except (ValueError, TypeError):
+        raise CurseurInvalide("Curseur de pagination invalide")
+
+
+def parametres_curseur():
+    """Lit ?curseur= et ?limite= (bornée à LIMITE_MAX) dans la requête courante."""
+    curseur = request.args.get('curseur') or None
+    limite = request.args.get('limite', LIMITE_PAR_DEFAUT, type=int)
+    return curseur, max(1, min(limite, LIMITE_MAX))
+
+
+def paginer_par_curseur(query, colonne_tri, colonne_id, curseur=None, limite=LIMITE_PAR_DEFAUT, descendant=True):
+    """
+    Pagination par clé (keyset) sur (colonne_tri, id) : chaque page coûte un
+    parcours d'index borné, quelle que soit sa profondeur (pas d'OFFSET).
+    La colonne de tri doit être NOT NULL : une ligne à valeur NULL ne
+    vérifie aucune comparaison du curseur et n'apparaîtrait dans aucune page.
+
+    Retourne (objets, next_cursor) ; next_cursor vaut None sur la dernière page.
+    """
+    tri_sur_id = colonne_tri is colonne_id
+
+    if curseur:
+        valeur, dernier_id = decoder_curseur(curseur, colonne_tri)
+        if tri_sur_id:
+            condition = colonne_id < dernier_id if descendant else colonne_id > dernier_id
+        elif descendant:
+            condition = or_(colonne_tri < valeur, and_(colonne_tri == valeur, colonne_id < dernier_id))
+        else:
+            condition = or_(colonne_tri > valeur, and_(colonne_tri == valeur, colonne_id > dernier_id))
+        query = query.filter(condition)
+
+    if tri_sur_id:
+        ordre = [colonne_id.desc() if descendant else colonne_id.asc()]
+    else:
+        ordre = [colonne_tri.desc(), colonne_id.desc()] if descendant else [colonne_tri.asc(), colonne_id.asc()]
+
+    objets = query.order_by(*ordre).limit(limite + 1).all()
+
+    next_cursor = None
+    if len(objets) > limite:
+        objets = objets[:limite]
+        dernier = objets[-1]
+        next_cursor = encoder_curseur(getattr(dernier, colonne_tri.key), getattr(dernier, colonne_id.key))
+
+    return objets, next_cursor
@@ -0,0 +1,70 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from models.classe import Classe
+from models.eleve import Eleve
+from models.emploi_du_temps import EmploiDuTemps
+from models.enseignant import Enseignant
+from models.note import Note
+from models.paiement import Paiement
+from models.presence import Presence
+
+
+# Relations lues par Enseignant.to_dict() : utilisateur + matières
+def _enseignant(chemin):
+    return chemin.options(
+        joinedload(Enseignant.utilisateur),
+        selectinload(Enseignant.matieres)
+    )
+
+
+# Relations lues par Classe.to_dict() : enseignant principal complet
+def _classe(chemin):
+    return chemin.options(
+        _enseignant(selectinload(Classe.enseignant_principal))
+    )
+
+
+# 📦 Relations à charger par profil de sérialisation (un profil = un to_dict())
+# Chaque profil charge tout ce que le to_dict() correspondant parcourt,
+# en un nombre fixe de requêtes quel que soit le nombre de lignes.
+CHARGEMENTS = {
+    "enseignant": lambda: [
+        joinedload(Enseignant.utilisateur),
+        selectinload(Enseignant.matieres)
+    ],
+    "classe": lambda: [
+        _enseignant(selectinload(Classe.enseignant_principal))
+    ],
+    "eleve": lambda: [
+        _classe(selectinload(Eleve.classe)),
+        selectinload(Eleve.parent)
+    ],
+    "note": lambda: [
+        joinedload(Note.eleve),
+        joinedload(Note.matiere),
+        joinedload(Note.enseignant)
+    ],
+    "presence": lambda: [
+        joinedload(Presence.eleve),
+        joinedload(Presence.classe),
+        joinedload(Presence.professeur)
+    ],
+    "paiement": lambda: [
+        joinedload(Paiement.eleve)
+    ],
+    "emploi": lambda: [
+        _classe(selectinload(EmploiDuTemps.classe)),
+        _enseignant(selectinload(EmploiDuTemps.enseignant)),
+        selectinload(EmploiDuTemps.matiere)
+    ],
+}
+
+
+def avec_relations(query, profil):
+    """Ajoute à la requête le chargement anticipé des relations du profil."""
+    return query.options(*CHARGEMENTS[profil]())
+
+
+def serialiser(query, profil):
+    """Exécute la requête avec ses relations préchargées et renvoie les to_dict()."""
+    return [objet.to_dict() for objet in avec_relations(query, profil).all()]
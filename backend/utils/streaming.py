@@ -0,0 +1,46 @@
+from flask import Response, current_app, request, stream_with_context
+
+TAILLE_LOT = 500
+MIME_NDJSON = "application/x-ndjson"
+
+
+def streaming_demande():
+    """Mode streaming demandé via ?stream=1 ou l'en-tête Accept: application/x-ndjson."""
+    return (
+        request.args.get('stream', '').lower() in ('1', 'true', 'ndjson')
+        or request.accept_mimetypes.best == MIME_NDJSON
+    )
+
+
+def _ndjson_demande():
+    return request.args.get('stream', '').lower() == 'ndjson' or request.accept_mimetypes.best == MIME_NDJSON
+
+
+def reponse_streamee(query, taille_lot=TAILLE_LOT):
+    """
+    Envoie le résultat de la requête au fil de l'eau, sans matérialiser la liste :
+    les lignes sont lues par lots (yield_per, curseur côté serveur sous MySQL)
+    et sérialisées une à une.
+
+    - NDJSON (un objet JSON par ligne) si Accept: application/x-ndjson ou ?stream=ndjson
+    - sinon un tableau JSON envoyé par morceaux (?stream=1)
+    """
+    dumps = current_app.json.dumps
+    lignes = query.yield_per(taille_lot)
+
+    if _ndjson_demande():
+        def generer():
+            for objet in lignes:
+                yield dumps(objet.to_dict()) + "\n"
+
+        return Response(stream_with_context(generer()), mimetype=MIME_NDJSON)
+
+    def generer():
+        yield "["
+        premier = True
+        for objet in lignes:
+            yield ("" if premier else ",") + dumps(objet.to_dict())
+            premier = False
+        yield "]"
+
+    return Response(stream_with_context(generer()), mimetype="application/json")
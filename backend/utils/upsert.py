@@ -0,0 +1,37 @@
+"""
+Insertion avec mise à jour en cas de conflit sur une clé unique, en une
+seule instruction SQL : ON DUPLICATE KEY UPDATE (MySQL / MariaDB) ou
+ON CONFLICT ... DO UPDATE (SQLite, PostgreSQL).
+
+Contrairement à un UPDATE suivi d'un INSERT quand aucune ligne n'a été
+touchée, deux transactions qui écrivent la même clé en même temps ne
+peuvent pas insérer deux fois : la seconde met à jour la ligne de la
+première (après avoir attendu son verrou).
+"""
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+_INSERT_PAR_DIALECTE = {
+    "mysql": mysql.insert,
+    "mariadb": mysql.insert,
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def inserer_ou_mettre_a_jour(connexion, table, lignes, cles, mise_a_jour):
+    """
+    Insère `lignes` (un dict ou une liste de dict) dans `table`. Une ligne dont
+    la clé unique `cles` (noms de colonnes) existe déjà est mise à jour avec
+    mise_a_jour(proposee) : un dict {colonne: expression}, où proposee.<colonne>
+    est la valeur que l'on tentait d'insérer et table.c.<colonne> la valeur en base.
+    """
+    dialecte = connexion.dialect.name
+    if dialecte not in _INSERT_PAR_DIALECTE:
+        raise NotImplementedError(f"Upsert non pris en charge pour le dialecte {dialecte}")
+
+    instruction = _INSERT_PAR_DIALECTE[dialecte](table)
+    if dialecte in ("mysql", "mariadb"):
+        instruction = instruction.on_duplicate_key_update(mise_a_jour(instruction.inserted))
+    else:
+        instruction = instruction.on_conflict_do_update(index_elements=cles, set_=mise_a_jour(instruction.excluded))
+    return connexion.execute(instruction, lignes)